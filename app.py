@@ -1,15 +1,33 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import os
 import requests
 from dotenv import load_dotenv
 import json
 import re
+import sqlite3
+import zlib
+import atexit
+import hashlib
 import random
-from datetime import datetime
+import copy
+import threading
+import time
+import asyncio
+import bisect
+import cProfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from pathlib import Path
+import numpy as np
 import google.generativeai as genai
-from llmPrompts import get_question_prompt, get_evaluation_prompt, format_evaluation_context
+from google.api_core import exceptions as google_exceptions
+from llmPrompts import (
+    get_question_prompt, get_evaluation_prompt, format_evaluation_context,
+    get_batch_evaluation_prompt, format_batch_evaluation_context
+)
 
 load_dotenv()
 
@@ -28,13 +46,108 @@ genai.configure(api_key=GEMINI_API_KEY)
 GEMINI_MODEL = 'gemini-1.5-flash'  # Using flash for faster responses
 GEMINI_MAX_TOKENS = 200  # Conservative limit for JSON responses
 GEMINI_TIMEOUT = 30
+# Maximum in-flight Gemini requests per execution mode (threads / event loop)
+GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', '16'))
+# Process-wide request pacing (token bucket); 0 disables the limit
+GEMINI_RPS = float(os.getenv('GEMINI_RPS', '10'))
+GEMINI_BURST = int(os.getenv('GEMINI_BURST', '10'))
+# Retries back off exponentially with full jitter, capped at GEMINI_BACKOFF_MAX seconds
+GEMINI_MAX_RETRIES = int(os.getenv('GEMINI_MAX_RETRIES', '3'))
+GEMINI_BACKOFF_BASE = float(os.getenv('GEMINI_BACKOFF_BASE', '1.0'))
+GEMINI_BACKOFF_MAX = float(os.getenv('GEMINI_BACKOFF_MAX', '30'))
+# Prompt prefix caching: send the static instructions of each prompt (llmPrompts.py) to the
+# backend once as cached content and only the per-call context with each request
+PROMPT_PREFIX_CACHE = os.getenv('PROMPT_PREFIX_CACHE', '0') == '1'
+PROMPT_CACHE_TTL = int(os.getenv('PROMPT_CACHE_TTL', '3600'))  # seconds a cached prefix lives on the backend
+# Circuit breaker: open after this many failed calls in a row, probe again after the timeout
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv('CIRCUIT_RESET_TIMEOUT', '30'))  # seconds
+
+# LLM backend: 'gemini' (Google API) or 'mock' (local stand-in, see mockGeminiServer.py)
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'gemini')
+MOCK_LLM_URL = os.getenv('MOCK_LLM_URL', 'http://127.0.0.1:8765')
+
+# Evaluation cache: one LLM round trip per distinct (question, answer, role)
+EVAL_CACHE_SIZE = int(os.getenv('EVAL_CACHE_SIZE', '1024'))
+EVAL_CACHE_TTL = float(os.getenv('EVAL_CACHE_TTL', '3600'))  # seconds
+
+# Background scoring: answers are evaluated off the request thread
+EVAL_WORKERS = int(os.getenv('EVAL_WORKERS', '4'))
+EVAL_WAIT_TIMEOUT = float(os.getenv('EVAL_WAIT_TIMEOUT', '20'))  # seconds feedback waits for scores
+EVAL_BATCH_SIZE = int(os.getenv('EVAL_BATCH_SIZE', '10'))  # answers scored per batch request
+
+# Speculative work while the candidate is answering: the next question draws are prepared as
+# soon as a question is sent, and follow-up questions are generated alongside the evaluation
+# that decides on them. Unneeded results are cancelled or discarded.
+SPECULATE = os.getenv('SPECULATE', '0') == '1'
+SPECULATIVE_WORKERS = int(os.getenv('SPECULATIVE_WORKERS', '2'))
 
 # Create data directory if it doesn't exist
 DATA_DIR = Path("data")
 DATA_DIR.mkdir(exist_ok=True)
 
-# Interview state management
-interview_sessions = {}
+# Session store: 'memory' (single process) or 'sqlite' (shared by several worker processes)
+SESSION_STORE = os.getenv('SESSION_STORE', 'memory')
+SESSION_DB_PATH = os.getenv('SESSION_DB_PATH', str(DATA_DIR / 'sessions.sqlite3'))
+# In-memory store bounds: evicted sessions are saved and spilled to disk, then reloaded on demand
+SESSION_MAX_LIVE = int(os.getenv('SESSION_MAX_LIVE', '1000'))
+SESSION_IDLE_TIMEOUT = float(os.getenv('SESSION_IDLE_TIMEOUT', '1800'))  # seconds
+SESSION_SPILL_DIR = DATA_DIR / 'spill'
+# Journal mode: append each turn to data/<session_id>.jsonl instead of rewriting the session file
+SESSION_JOURNAL = os.getenv('SESSION_JOURNAL', '0') == '1'
+
+# Question bank file, re-read when it changes
+QUESTIONS_PATH = Path(os.getenv('QUESTIONS_PATH', Path(__file__).with_name('questions.json')))
+QUESTIONS_RELOAD_INTERVAL = float(os.getenv('QUESTIONS_RELOAD_INTERVAL', '5'))  # seconds between file checks
+QUESTION_BANK_VERSIONS = 4  # old bank versions kept for sessions still using them
+# Roles offered to candidates and difficulties questions are drawn from; a bank file missing any is rejected
+INTERVIEW_ROLES = ('engineer', 'sales', 'retail')
+QUESTION_DIFFICULTIES = ('medium', 'hard')
+QUESTION_VECTOR_DIM = 512  # hashed word n-gram features per question
+QUESTION_CANDIDATES = 32  # unused questions compared against the session per draw
+QUESTION_CONTEXT_ANSWERS = 2  # recent answers the next question should differ from
+
+# Word lists for the answer heuristics
+HEURISTICS_PATH = Path(os.getenv('HEURISTICS_PATH', Path(__file__).with_name('heuristics.json')))
+
+# Local fast-path scorer (trainFastScorer.py): answers it scores at or above the
+# confidence threshold skip the LLM evaluation; no model file means every answer goes to the LLM.
+# Kept out of DATA_DIR, which holds only session files
+FAST_SCORER_PATH = Path(os.getenv('FAST_SCORER_PATH', Path(__file__).with_name('models') / 'fast_scorer.json'))
+FAST_SCORER_THRESHOLD = float(os.getenv('FAST_SCORER_THRESHOLD', '0.9'))
+
+# Include the computed answer features in /api/chat responses
+CHAT_DEBUG = os.getenv('CHAT_DEBUG', '0') == '1'
+
+# Request timing: per-stage durations go out in a Server-Timing header; a JSON log line
+# is printed for every request when REQUEST_LOG is on, otherwise only for slow ones
+REQUEST_LOG = os.getenv('REQUEST_LOG', '0') == '1'
+SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', '1000'))
+# Profiling: a sampled share of chat requests (or those sent with 'X-Profile: 1' when
+# PROFILE_ALLOW_HEADER is on) run under cProfile and leave a .prof file in PROFILE_DIR
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_ALLOW_HEADER = os.getenv('PROFILE_ALLOW_HEADER', '0') == '1'
+PROFILE_DIR = Path(os.getenv('PROFILE_DIR', DATA_DIR / 'profiles'))
+
+# Parsed session files kept for GET /api/session/<id>
+SESSION_DOC_CACHE_SIZE = int(os.getenv('SESSION_DOC_CACHE_SIZE', '256'))
+
+# Session catalog: SQLite index of stored session files for /api/sessions
+CATALOG_DB_PATH = os.getenv('CATALOG_DB_PATH')  # default: <DATA_DIR>/catalog.sqlite3
+CATALOG_RESCAN_INTERVAL = float(os.getenv('CATALOG_RESCAN_INTERVAL', '300'))  # seconds between background scans
+CATALOG_MAX_PAGE = 200
+
+# Write-behind persistence: session files are written by a background worker
+PERSIST_MAX_BACKLOG = int(os.getenv('PERSIST_MAX_BACKLOG', '1000'))  # sessions waiting to be written
+PERSIST_BATCH_SIZE = int(os.getenv('PERSIST_BATCH_SIZE', '50'))
+PERSIST_FLUSH_INTERVAL = float(os.getenv('PERSIST_FLUSH_INTERVAL', '0.05'))  # seconds to let saves coalesce
+PERSIST_BACKPRESSURE_TIMEOUT = float(os.getenv('PERSIST_BACKPRESSURE_TIMEOUT', '5'))
+
+# Outstanding background evaluations: session_id -> {turn_index: Future}
+scoring_pool = ThreadPoolExecutor(max_workers=EVAL_WORKERS, thread_name_prefix='scoring')
+pending_evaluations = {}
+pending_evaluations_lock = threading.Lock()
+speculative_pool = ThreadPoolExecutor(max_workers=SPECULATIVE_WORKERS, thread_name_prefix='speculative')
 
 # Evaluation schema
 EVALUATION_SCHEMA = {
@@ -45,103 +158,1146 @@ EVALUATION_SCHEMA = {
     "feedback": []
 }
 
-class QuestionBank:
-    """Curated question bank with difficulty buckets"""
+class MetricsRegistry:
+    """Counters, gauges and histograms served by /metrics in the Prometheus text format.
+
+    Metrics are declared once with describe() and updated with keyword labels.
+    An update is one dict operation under a lock, cheap enough for hot paths.
+    Collectors registered with add_collector() supply gauges that are read
+    from existing objects at scrape time.
+    """
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+    SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536)
+    
     def __init__(self):
-        self.questions = {
-            'engineer': {
-                'easy': [
-                    "Tell me about yourself and your experience with software development.",
-                    "What programming languages are you most comfortable with?",
-                    "Describe your experience with version control systems like Git."
-                ],
-                'medium': [
-                    "Describe a challenging project you worked on and how you solved it.",
-                    "How do you approach debugging a complex issue?",
-                    "What's your approach to code review and collaboration?",
-                    "How do you stay updated with new technologies?"
-                ],
-                'hard': [
-                    "Design a scalable system architecture for handling 1 million requests per second.",
-                    "Explain how you would optimize a slow database query affecting production.",
-                    "Describe a time when you had to make a critical technical decision under pressure.",
-                    "How would you handle a security vulnerability discovered in production code?"
-                ]
-            },
-            'sales': {
-                'easy': [
-                    "Tell me about yourself and your sales experience.",
-                    "How do you approach building relationships with new clients?",
-                    "What motivates you in a sales role?"
-                ],
-                'medium': [
-                    "Describe a time when you closed a difficult sale.",
-                    "How do you handle rejection in sales?",
-                    "What's your strategy for identifying potential customers?",
-                    "How do you prioritize your leads and manage your sales pipeline?"
-                ],
-                'hard': [
-                    "Describe a situation where you had to overcome a major customer objection that seemed insurmountable.",
-                    "How would you approach a client who has been with a competitor for 10 years?",
-                    "Explain your strategy for negotiating a complex multi-year enterprise deal.",
-                    "How do you handle a situation where a client threatens to leave due to pricing?"
-                ]
-            },
-            'retail': {
-                'easy': [
-                    "Tell me about yourself and why you're interested in retail.",
-                    "How would you handle a difficult or angry customer?",
-                    "What does excellent customer service mean to you?"
-                ],
-                'medium': [
-                    "Describe your experience with cash handling and point-of-sale systems.",
-                    "How do you stay motivated during slow periods?",
-                    "How do you approach upselling products to customers?",
-                    "Describe a time when you had to work as part of a team."
-                ],
-                'hard': [
-                    "What would you do if you noticed a customer shoplifting?",
-                    "Describe how you would handle a situation where multiple customers need assistance simultaneously.",
-                    "How would you deal with a product return request that doesn't meet store policy?",
-                    "Explain your approach to handling inventory discrepancies during a busy holiday season."
-                ]
+        self._lock = threading.Lock()
+        self._metrics = OrderedDict()  # name -> (type, help, buckets, {label items: value})
+        self._collectors = []
+    
+    def describe(self, name: str, metric_type: str, help_text: str, buckets: tuple = None):
+        with self._lock:
+            self._metrics.setdefault(name, (metric_type, help_text, buckets, {}))
+    
+    def add_collector(self, collect):
+        """collect() returns [(name, type, help, [(labels dict, value)])]"""
+        self._collectors.append(collect)
+    
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            values = self._metrics[name][3]
+            values[key] = values.get(key, 0) + amount
+    
+    def observe(self, name: str, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            _, _, buckets, values = self._metrics[name]
+            entry = values.get(key)
+            if entry is None:
+                entry = values[key] = [[0] * len(buckets), 0.0, 0]
+            index = bisect.bisect_left(buckets, value)
+            if index < len(buckets):
+                entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+    
+    def value(self, name: str, **labels):
+        """Current counter value, or a histogram's observation count"""
+        with self._lock:
+            entry = self._metrics[name][3].get(tuple(sorted(labels.items())), 0)
+        return entry[2] if isinstance(entry, list) else entry
+    
+    @staticmethod
+    def _labels(items) -> str:
+        if not items:
+            return ''
+        escaped = (
+            (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for key, value in items
+        )
+        return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+    
+    @staticmethod
+    def _number(value) -> str:
+        return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+    
+    def render(self) -> str:
+        """All metrics in the text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            snapshot = [
+                (name, metric_type, help_text, buckets, [
+                    (key, [list(value[0]), value[1], value[2]] if isinstance(value, list) else value)
+                    for key, value in values.items()
+                ])
+                for name, (metric_type, help_text, buckets, values) in self._metrics.items()
+            ]
+        for name, metric_type, help_text, buckets, samples in snapshot:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for key, value in samples:
+                if metric_type != 'histogram':
+                    lines.append(f"{name}{self._labels(key)} {self._number(value)}")
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{self._labels(key + (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_bucket{self._labels(key + (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{self._labels(key)} {self._number(total)}")
+                lines.append(f"{name}_count{self._labels(key)} {count}")
+        
+        for collect in self._collectors:
+            try:
+                collected = collect()
+            except Exception as e:
+                print(f"Error collecting metrics: {e}")
+                continue
+            for name, metric_type, help_text, samples in collected:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{self._labels(tuple(sorted(labels.items())))} {self._number(value)}")
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+metrics.describe('llm_calls_total', 'counter', 'LLM calls by purpose and outcome (success, failure, circuit_open)')
+metrics.describe('llm_call_duration_seconds', 'histogram', 'LLM call latency including retries',
+                 MetricsRegistry.LATENCY_BUCKETS)
+metrics.describe('llm_retries_total', 'counter', 'LLM attempts retried, by reason (rate_limited, error)')
+metrics.describe('llm_parse_failures_total', 'counter', 'LLM responses that did not parse into a valid evaluation')
+metrics.describe('llm_fallbacks_total', 'counter', 'Evaluations not produced by the LLM, by kind (default, heuristics)')
+metrics.describe('llm_fast_path_total', 'counter', 'Answers scored by the local fast-path model')
+metrics.describe('llm_prompt_bytes', 'histogram', 'Prompt bytes sent per LLM call', MetricsRegistry.SIZE_BUCKETS)
+metrics.describe('llm_response_bytes', 'histogram', 'Response bytes per LLM call', MetricsRegistry.SIZE_BUCKETS)
+metrics.describe('llm_prompt_bytes_saved_total', 'counter', 'Prompt bytes not sent thanks to cached prefixes')
+metrics.describe('session_save_duration_seconds', 'histogram', 'Session persistence write time, by mode (file, journal)',
+                 MetricsRegistry.LATENCY_BUCKETS)
+metrics.describe('speculative_work_total', 'counter', 'Speculative work by kind (draw, followup) and outcome (used, discarded)')
+metrics.describe('request_stage_duration_seconds', 'histogram', 'Time spent in each stage of a request, by route and stage',
+                 MetricsRegistry.LATENCY_BUCKETS)
+
+class RequestTimer:
+    """Per-stage wall-clock timings of one request.
+
+    Stages are entered with timed_stage() anywhere below the request handler;
+    time in a stage entered more than once is summed, and stages may nest
+    (e.g. the follow-up LLM call is part of 'followup'). The result is sent
+    as a Server-Timing header and logged as one JSON line.
+    """
+    def __init__(self, route: str, **fields):
+        self.route = route
+        self.fields = fields
+        self.stages = OrderedDict()  # stage -> seconds
+        self.profile = None  # Path of the profile written for this request
+        self._started = time.perf_counter()
+    
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+    
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+    
+    def server_timing(self) -> str:
+        """Server-Timing header value, durations in milliseconds"""
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()]
+        entries.append(f"total;dur={self.total_ms():.1f}")
+        return ", ".join(entries)
+    
+    def headers(self) -> dict:
+        headers = {'Server-Timing': self.server_timing()}
+        if self.profile:
+            headers['X-Profile-File'] = self.profile.name
+        return headers
+    
+    def finish(self):
+        """Record the stage histograms and print the log line if it is due"""
+        for name, seconds in self.stages.items():
+            metrics.observe('request_stage_duration_seconds', seconds, route=self.route, stage=name)
+        total_ms = self.total_ms()
+        if REQUEST_LOG or total_ms >= SLOW_REQUEST_MS:
+            record = {
+                'event': 'request_timing',
+                'route': self.route,
+                **self.fields,
+                'total_ms': round(total_ms, 1),
+                'stages_ms': {name: round(seconds * 1000, 1) for name, seconds in self.stages.items()},
             }
+            if self.profile:
+                record['profile'] = str(self.profile)
+            print(json.dumps(record))
+
+class RequestProfiler:
+    """cProfile run over one request, dumped to PROFILE_DIR.
+
+    Only one request is profiled at a time (cProfile hooks the interpreter);
+    a request asking for a profile while another is running just isn't profiled.
+    The .prof files load in pstats, snakeviz or any other cProfile viewer.
+    """
+    _active = threading.Lock()
+    
+    def __init__(self, route: str, directory: Path = None):
+        self.route = route
+        self.directory = directory or PROFILE_DIR
+        self._profile = None
+    
+    def start(self) -> bool:
+        if not RequestProfiler._active.acquire(blocking=False):
+            return False
+        self._profile = cProfile.Profile()
+        try:
+            self._profile.enable()
+        except ValueError:
+            # Another profiler (e.g. the whole process under cProfile) is already running
+            self._profile = None
+            RequestProfiler._active.release()
+            return False
+        return True
+    
+    def stop(self):
+        """Write the profile and return its path (None if nothing was profiled)"""
+        if self._profile is None:
+            return None
+        self._profile.disable()
+        RequestProfiler._active.release()
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / f"{self.route}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.prof"
+            self._profile.dump_stats(str(path))
+            return path
+        except OSError as e:
+            print(f"Error writing profile: {e}")
+            return None
+        finally:
+            self._profile = None
+
+def should_profile(header_value: str = None) -> bool:
+    """Profile this request: forced by the X-Profile header (when allowed) or sampled"""
+    if PROFILE_ALLOW_HEADER and header_value == '1':
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+# Timer of the request running on this thread, if any
+_request_timers = threading.local()
+
+@contextmanager
+def timed_stage(name: str):
+    """Time a stage of the current request; a no-op outside timed requests (e.g. on worker threads)"""
+    timer = getattr(_request_timers, 'timer', None)
+    if timer is None:
+        yield
+        return
+    with timer.stage(name):
+        yield
+
+@contextmanager
+def request_timing(timer: RequestTimer, profile: bool = False):
+    """Bind timer to this thread for the block, profile it if asked, then finish it"""
+    profiler = RequestProfiler(timer.route) if profile else None
+    if profiler and not profiler.start():
+        profiler = None
+    previous = getattr(_request_timers, 'timer', None)
+    _request_timers.timer = timer
+    try:
+        yield timer
+    finally:
+        _request_timers.timer = previous
+        if profiler:
+            timer.profile = profiler.stop()
+        timer.finish()
+
+class EvaluationCache:
+    """Thread-safe LRU cache of answer evaluations with a time-to-live.
+
+    Keys are normalized (question, answer, role) triples so whitespace and case
+    differences share an entry. Concurrent lookups for the same key wait for the
+    first caller instead of issuing a second LLM request.
+    """
+    def __init__(self, max_size=EVAL_CACHE_SIZE, ttl=EVAL_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(question: str, answer: str, role: str) -> tuple:
+        """Normalize case and whitespace so equivalent inputs share an entry"""
+        def normalize(text):
+            return ' '.join((text or '').lower().split())
+        return (normalize(question), normalize(answer), normalize(role))
+    
+    def _lookup(self, key):
+        """Return a live entry (caller holds the lock)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if self.ttl and time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+    
+    def get(self, question: str, answer: str, role: str):
+        """Get a cached evaluation or None"""
+        key = self.make_key(question, answer, role)
+        with self._lock:
+            value = self._lookup(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return copy.deepcopy(value)
+    
+    def set(self, question: str, answer: str, role: str, value: dict):
+        """Store an evaluation, evicting the least recently used entries"""
+        key = self.make_key(question, answer, role)
+        with self._lock:
+            self._store(key, value)
+    
+    def _store(self, key, value):
+        self._entries[key] = (time.monotonic(), copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def get_or_compute(self, question: str, answer: str, role: str, compute):
+        """Return the cached evaluation, or call compute() exactly once per key.
+
+        Exceptions raised by compute() propagate and nothing is cached, so a
+        failed evaluation can be retried by the next caller.
+        """
+        key = self.make_key(question, answer, role)
+        while True:
+            with self._lock:
+                value = self._lookup(key)
+                if value is not None:
+                    self.hits += 1
+                    return copy.deepcopy(value)
+                pending = self._inflight.get(key)
+                if pending is None:
+                    self.misses += 1
+                    pending = self._inflight[key] = threading.Event()
+                    break
+            # Another thread is evaluating the same answer - wait and re-check
+            pending.wait()
+        
+        try:
+            value = compute()
+            with self._lock:
+                self._store(key, value)
+            return copy.deepcopy(value)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.set()
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self):
+        return len(self._entries)
+
+# Shared by every evaluation caller (follow-up decisions, turn scoring, feedback)
+evaluation_cache = EvaluationCache()
+
+# Running score totals per session. Each answered question record holds the
+# index of its answer turn (qa['answer_turn']) and that turn points back with
+# 'question_index', so evals landing on the turn update session['score_totals']
+# without scanning the history. session['eval_version'] changes with every
+# eval and keys the cached feedback summary.
+SCORE_DIMENSIONS = ('communication', 'technical', 'examples')
+score_totals_lock = threading.Lock()
+
+def _add_scores(totals: dict, eval_data: dict, sign: int):
+    scores = eval_data.get('scores', {})
+    for key in SCORE_DIMENSIONS:
+        totals[key] += sign * scores.get(key, 0)
+    totals['overall'] += sign * eval_data.get('overall', 0)
+    totals['count'] += sign
+
+def score_totals(session: dict) -> dict:
+    return session.setdefault('score_totals', dict.fromkeys(SCORE_DIMENSIONS + ('overall', 'count'), 0))
+
+def record_turn_eval(session: dict, turn_index: int, eval_data: dict):
+    """Attach an eval to its turn and update the running totals if the turn answers a question"""
+    with score_totals_lock:
+        event = session['conversation_history'][turn_index]
+        previous = event.get('eval')
+        event['eval'] = eval_data
+        if 'question_index' in event:
+            totals = score_totals(session)
+            if previous:
+                _add_scores(totals, previous, -1)
+            _add_scores(totals, eval_data, 1)
+        session['eval_version'] = session.get('eval_version', 0) + 1
+
+def answered_count(session: dict) -> int:
+    """Questions with an answer; counted once for sessions saved before the counter existed"""
+    if 'answered_count' not in session:
+        session['answered_count'] = sum(1 for qa in session.get('questions_asked', []) if qa.get('user_response'))
+    return session['answered_count']
+
+def record_answer(session: dict, question_index: int, turn_index: int):
+    """Link a question record to the history turn holding its answer"""
+    count = answered_count(session)
+    qa = session['questions_asked'][question_index]
+    event = session['conversation_history'][turn_index]
+    qa['user_response'] = event['content']
+    qa['timestamp'] = datetime.now().isoformat()
+    qa['answer_turn'] = turn_index
+    session['answered_count'] = count + 1
+    with score_totals_lock:
+        event['question_index'] = question_index
+        if event.get('eval'):
+            _add_scores(score_totals(session), event['eval'], 1)
+
+def link_answer_turns(session: dict):
+    """Link answers in sessions saved before qa['answer_turn'] existed, in conversation order"""
+    history = session.get('conversation_history', [])
+    position = 0
+    for question_index, qa in enumerate(session.get('questions_asked', [])):
+        if 'answer_turn' in qa:
+            position = max(position, qa['answer_turn'] + 1)
+            continue
+        if not qa.get('user_response'):
+            continue
+        turn_index = next((
+            index for index in range(position, len(history))
+            if history[index].get('role') == 'user' and history[index].get('content') == qa['user_response']
+        ), None)
+        if turn_index is None:
+            continue
+        qa['answer_turn'] = turn_index
+        position = turn_index + 1
+        with score_totals_lock:
+            history[turn_index]['question_index'] = question_index
+            if history[turn_index].get('eval'):
+                _add_scores(score_totals(session), history[turn_index]['eval'], 1)
+
+class SessionStore:
+    """Interface for live interview session storage.
+
+    Sessions are plain dicts. Callers get() a session, mutate it and put() it
+    back once the turn is complete. Evaluations finishing in the background go
+    through attach_eval() so they aren't lost to a concurrent put().
+    """
+    def get(self, session_id: str):
+        raise NotImplementedError
+    
+    def put(self, session_id: str, session: dict):
+        raise NotImplementedError
+    
+    def delete(self, session_id: str):
+        raise NotImplementedError
+    
+    def attach_eval(self, session_id: str, session: dict, turn_index: int, eval_data: dict):
+        """Record a turn's evaluation on the in-hand session and in the store"""
+        record_turn_eval(session, turn_index, eval_data)
+    
+    def peek(self, session_id: str):
+        """Read a session without counting it as activity"""
+        return self.get(session_id)
+    
+    def __contains__(self, session_id):
+        return self.get(session_id) is not None
+    
+    def stats(self) -> dict:
+        """Counters for /api/stats"""
+        return {'live': len(self)}
+    
+    def __getitem__(self, session_id):
+        session = self.get(session_id)
+        if session is None:
+            raise KeyError(session_id)
+        return session
+    
+    def __setitem__(self, session_id, session):
+        self.put(session_id, session)
+    
+    def __delitem__(self, session_id):
+        self.delete(session_id)
+    
+    def pop(self, session_id, default=None):
+        session = self.get(session_id)
+        if session is None:
+            return default
+        self.delete(session_id)
+        return session
+
+class InMemorySessionStore(SessionStore):
+    """Sessions held in this process; callers share the live dict.
+
+    At most max_live sessions are kept. The least recently used session is
+    evicted when the cap is exceeded, and any session idle for idle_timeout
+    seconds is evicted on the next access. Eviction persists the session and
+    spills the full state to spill_dir; a later get() reloads it transparently.
+    The disk writes happen outside the store lock, so lookups of other
+    sessions don't wait for them.
+    """
+    def __init__(self, max_live: int = SESSION_MAX_LIVE, idle_timeout: float = SESSION_IDLE_TIMEOUT,
+                 spill_dir: Path = None):
+        self.max_live = max_live
+        self.idle_timeout = idle_timeout
+        self.spill_dir = spill_dir or SESSION_SPILL_DIR
+        self._sessions = OrderedDict()  # session_id -> (last_access, session), oldest first
+        self._evicting = set()  # sessions being written out; still live until that finishes
+        self._lock = threading.RLock()
+        self.evictions = 0
+        self.reloads = 0
+    
+    def get(self, session_id: str):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                session = entry[1]
+                self._touch(session_id, session)
+                return session
+            session = self._reload(session_id)
+            if session is not None:
+                self._touch(session_id, session)
+        if session is not None:
+            self._evict()
+        return session
+    
+    def put(self, session_id: str, session: dict):
+        with self._lock:
+            self._touch(session_id, session)
+        self._evict()
+    
+    def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            spill_file = self._spill_file(session_id)
+            if spill_file.exists():
+                spill_file.unlink()
+    
+    def peek(self, session_id: str):
+        """Live session without refreshing its idle timer; None if not in memory"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            return entry[1] if entry is not None else None
+    
+    def attach_eval(self, session_id: str, session: dict, turn_index: int, eval_data: dict):
+        super().attach_eval(session_id, session, turn_index, eval_data)
+        with self._lock:
+            # Evicted while being scored: keep the spilled copy complete
+            if session_id not in self._sessions and self._spill_file(session_id).exists():
+                self._spill(session_id, session)
+    
+    def __contains__(self, session_id):
+        with self._lock:
+            return session_id in self._sessions or self._spill_file(session_id).exists()
+    
+    def __len__(self):
+        return len(self._sessions)
+    
+    def stats(self) -> dict:
+        return {'live': len(self._sessions), 'evictions': self.evictions, 'reloads': self.reloads}
+    
+    def _touch(self, session_id: str, session: dict):
+        self._sessions[session_id] = (time.monotonic(), session)
+        self._sessions.move_to_end(session_id)
+    
+    def _evict(self):
+        """Evict over-cap and idle sessions, oldest first (caller must not hold the lock).
+
+        Victims are picked under the lock, persisted and spilled without it, and
+        only then dropped from memory. A victim that was used or scored in the
+        meantime stays live and its spill file is removed.
+        """
+        with self._lock:
+            now = time.monotonic()
+            excess = len(self._sessions) - len(self._evicting) - self.max_live
+            victims = []
+            for session_id, (last_access, session) in self._sessions.items():
+                if session_id in self._evicting:
+                    continue
+                if excess <= 0 and now - last_access < self.idle_timeout:
+                    break
+                victims.append((session_id, last_access, session, session.get('eval_version', 0)))
+                excess -= 1
+            self._evicting.update(session_id for session_id, _, _, _ in victims)
+        if not victims:
+            return
+        
+        for session_id, _, session, _ in victims:
+            persist_session(session_id, session)
+            self._spill(session_id, session)
+        
+        with self._lock:
+            for session_id, last_access, session, eval_version in victims:
+                self._evicting.discard(session_id)
+                entry = self._sessions.get(session_id)
+                if entry is not None and entry[0] == last_access and session.get('eval_version', 0) == eval_version:
+                    del self._sessions[session_id]
+                    self.evictions += 1
+                    continue
+                # Used, scored or deleted while being written: the spilled copy is stale
+                spill_file = self._spill_file(session_id)
+                if spill_file.exists():
+                    spill_file.unlink()
+    
+    def _spill_file(self, session_id: str) -> Path:
+        return self.spill_dir / f"{session_id}.json"
+    
+    def _spill(self, session_id: str, session: dict):
+        try:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            with open(self._spill_file(session_id), 'w', encoding='utf-8') as f:
+                json.dump(session, f, separators=(',', ':'), ensure_ascii=False)
+        except Exception as e:
+            print(f"Error spilling session: {e}")
+    
+    def _reload(self, session_id: str):
+        spill_file = self._spill_file(session_id)
+        if not spill_file.exists():
+            return None
+        try:
+            with open(spill_file, 'r', encoding='utf-8') as f:
+                session = json.load(f)
+        except Exception as e:
+            print(f"Error reloading session: {e}")
+            return None
+        spill_file.unlink()
+        self.reloads += 1
+        return session
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in a SQLite database (WAL mode) shared by worker processes.
+
+    Each session is stored as compressed compact JSON and loaded only when a
+    request asks for it. Evaluations live in their own table and are merged on
+    load, so a background eval and a request saving the same session can't
+    overwrite each other.
+    """
+    def __init__(self, path: str = SESSION_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._connect().conn.execute("PRAGMA journal_mode=WAL")
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, data BLOB NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_evals ("
+                "session_id TEXT NOT NULL, turn_index INTEGER NOT NULL, data BLOB NOT NULL, "
+                "PRIMARY KEY (session_id, turn_index))"
+            )
+    
+    def _connect(self):
+        """One connection per thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return _Transaction(conn)
+    
+    @staticmethod
+    def _dump(data) -> bytes:
+        return zlib.compress(json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+    
+    @staticmethod
+    def _load(blob: bytes):
+        return json.loads(zlib.decompress(blob).decode('utf-8'))
+    
+    def get(self, session_id: str):
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                return None
+            evals = conn.execute(
+                "SELECT turn_index, data FROM session_evals WHERE session_id = ?", (session_id,)
+            ).fetchall()
+        session = self._load(row[0])
+        history = session.get('conversation_history', [])
+        for turn_index, blob in evals:
+            if turn_index < len(history):
+                eval_data = self._load(blob)
+                if history[turn_index].get('eval') != eval_data:
+                    record_turn_eval(session, turn_index, eval_data)
+        return session
+    
+    def put(self, session_id: str, session: dict):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, data, updated_at) VALUES (?, ?, ?)",
+                (session_id, self._dump(session), time.time())
+            )
+    
+    def delete(self, session_id: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM session_evals WHERE session_id = ?", (session_id,))
+    
+    def attach_eval(self, session_id: str, session: dict, turn_index: int, eval_data: dict):
+        super().attach_eval(session_id, session, turn_index, eval_data)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO session_evals (session_id, turn_index, data) VALUES (?, ?, ?)",
+                (session_id, turn_index, self._dump(eval_data))
+            )
+    
+    def __contains__(self, session_id):
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)).fetchone() is not None
+    
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+class _Transaction:
+    """Context manager running statements on a connection inside one transaction"""
+    def __init__(self, conn):
+        self.conn = conn
+    
+    def __enter__(self):
+        self.conn.execute("BEGIN")
+        return self.conn
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
+        return False
+
+def create_session_store(name: str = None) -> SessionStore:
+    """Build the configured session store"""
+    name = name or SESSION_STORE
+    if name == 'memory':
+        return InMemorySessionStore()
+    if name == 'sqlite':
+        return SQLiteSessionStore()
+    raise ValueError(f"Unknown session store: {name}")
+
+# Interview state management
+interview_sessions = create_session_store()
+
+class QuestionVectorizer:
+    """TF-IDF weighted hashed word uni/bigrams, L2-normalized, as float32 rows"""
+    TOKEN = re.compile(r"[a-z0-9']+")
+    
+    def __init__(self, texts: list, dim: int = QUESTION_VECTOR_DIM):
+        self.dim = dim
+        document_frequency = np.zeros(dim, dtype=np.float32)
+        self._features = []
+        for text in texts:
+            features = self._hash(text)
+            self._features.append(features)
+            document_frequency[np.unique(features)] += 1
+        self.idf = (np.log((len(texts) + 1) / (document_frequency + 1)) + 1).astype(np.float32)
+    
+    def _hash(self, text: str) -> np.ndarray:
+        words = self.TOKEN.findall(text.lower())
+        grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        return np.fromiter((zlib.crc32(gram.encode('utf-8')) % self.dim for gram in grams),
+                           dtype=np.int64, count=len(grams))
+    
+    def _rows(self, features_list: list) -> np.ndarray:
+        matrix = np.zeros((len(features_list), self.dim), dtype=np.float32)
+        for row, features in enumerate(features_list):
+            np.add.at(matrix[row], features, 1.0)
+        matrix *= self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+    
+    def fitted_rows(self) -> np.ndarray:
+        """Vectors of the texts the vectorizer was built from, in order"""
+        matrix = self._rows(self._features)
+        self._features = None
+        return matrix
+    
+    def transform(self, texts: list) -> np.ndarray:
+        return self._rows([self._hash(text) for text in texts])
+
+class QuestionBankSnapshot:
+    """One immutable version of the question bank, indexed for draws"""
+    def __init__(self, version: int, questions: dict):
+        self.version = version
+        self.questions = {
+            role: {difficulty: tuple(bucket) for difficulty, bucket in buckets.items()}
+            for role, buckets in questions.items()
+        }
+        # (role, difficulty) -> question text -> position in the bucket
+        self.positions = {
+            (role, difficulty): {question: index for index, question in enumerate(bucket)}
+            for role, buckets in self.questions.items()
+            for difficulty, bucket in buckets.items()
         }
+        # (role, difficulty) -> one normalized vector per question, in bucket order
+        keys = list(self.positions)
+        self.vectorizer = QuestionVectorizer([q for key in keys for q in self.questions[key[0]][key[1]]])
+        rows = self.vectorizer.fitted_rows()
+        self.vectors, start = {}, 0
+        for key in keys:
+            size = len(self.positions[key])
+            self.vectors[key] = rows[start:start + size]
+            start += size
     
-    def get_question(self, role, difficulty='medium', used_questions=None):
-        """Get a random question from the specified difficulty bucket"""
-        if used_questions is None:
-            used_questions = []
+    def context_vectors(self, role: str, texts: list) -> np.ndarray:
+        """Vectors for questions (looked up) and answers (hashed), one row per text in order"""
+        rows = np.zeros((len(texts), self.vectorizer.dim), dtype=np.float32)
+        missing = []
+        for row, text in enumerate(texts):
+            for difficulty in self.questions.get(role, {}):
+                index = self.positions[(role, difficulty)].get(text)
+                if index is not None:
+                    rows[row] = self.vectors[(role, difficulty)][index]
+                    break
+            else:
+                missing.append(row)
+        if missing:
+            rows[missing] = self.vectorizer.transform([texts[row] for row in missing])
+        return rows
+    
+    @staticmethod
+    def validate(questions, roles=INTERVIEW_ROLES, difficulties=QUESTION_DIFFICULTIES):
+        """Raise ValueError unless every bucket is a non-empty list of questions and each of
+        roles has a bucket for each of difficulties"""
+        if not isinstance(questions, dict) or not questions:
+            raise ValueError("Question bank must map roles to difficulty buckets")
+        missing = [role for role in roles if role not in questions]
+        if missing:
+            raise ValueError(f"Question bank is missing roles: {', '.join(missing)}")
+        for role, buckets in questions.items():
+            if not isinstance(buckets, dict) or not buckets:
+                raise ValueError(f"Role {role!r} must map difficulties to question lists")
+            missing = [difficulty for difficulty in difficulties if difficulty not in buckets] if role in roles else []
+            if missing:
+                raise ValueError(f"Role {role!r} is missing difficulties: {', '.join(missing)}")
+            for difficulty, bucket in buckets.items():
+                if not isinstance(bucket, list) or not bucket or \
+                        not all(isinstance(question, str) and question.strip() for question in bucket):
+                    raise ValueError(f"Bucket {role}/{difficulty} must be a non-empty list of questions")
+
+class QuestionDraft:
+    """A question draw prepared before the answer it depends on arrives.
+
+    Holds the sampled candidates and their similarity to each context text
+    (asked questions, earlier answers) known at the time; get_question()
+    only has to add the texts that arrived since. A draft is only valid for
+    the bank version and used questions it was sampled against.
+    """
+    def __init__(self, version: int, role: str, difficulty: str, used_questions: tuple,
+                 candidates: list, similarity: dict):
+        self.version = version
+        self.role = role
+        self.difficulty = difficulty
+        self.used_questions = used_questions
+        self.candidates = candidates
+        self.similarity = similarity  # context text -> similarity of each candidate
+    
+    def matches(self, version: int, role: str, difficulty: str, used_questions) -> bool:
+        return (self.version, self.role, self.difficulty, self.used_questions) == \
+            (version, role, difficulty, tuple(used_questions))
+
+class QuestionBank:
+    """Question bank with difficulty buckets, loaded from a JSON file.
+
+    The file is re-read when its mtime or size changes (checked at most every
+    reload_interval seconds, or on reload()). A reload builds a complete new
+    snapshot before swapping it in, so a bad file leaves the old bank in
+    place. Sessions stay on the snapshot they drew their first question from
+    while it is among the last keep_versions snapshots.
+    """
+    def __init__(self, path: Path = QUESTIONS_PATH, reload_interval: float = QUESTIONS_RELOAD_INTERVAL,
+                 keep_versions: int = QUESTION_BANK_VERSIONS, roles: tuple = INTERVIEW_ROLES,
+                 difficulties: tuple = QUESTION_DIFFICULTIES):
+        self.path = Path(path)
+        self.roles = roles
+        self.difficulties = difficulties
+        self.reload_interval = reload_interval
+        self.keep_versions = keep_versions
+        self._lock = threading.Lock()
+        self._snapshots = OrderedDict()  # version -> QuestionBankSnapshot, oldest first
+        self._current = None
+        self._file_state = None
+        self._checked_at = 0.0
+        self.reload()
+    
+    @property
+    def questions(self) -> dict:
+        return self._current.questions
+    
+    @property
+    def version(self) -> int:
+        return self._current.version
+    
+    def reload(self) -> bool:
+        """Load the file into a new snapshot; False (old bank kept) if it is invalid"""
+        with self._lock:
+            try:
+                stat = self.path.stat()
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    questions = json.load(f)
+                QuestionBankSnapshot.validate(questions, self.roles, self.difficulties)
+            except (OSError, ValueError) as e:
+                if self._current is None:
+                    raise
+                print(f"Error reloading question bank: {e}")
+                return False
+            version = self._current.version + 1 if self._current else 1
+            snapshot = QuestionBankSnapshot(version, questions)
+            self._snapshots[version] = snapshot
+            while len(self._snapshots) > self.keep_versions:
+                self._snapshots.popitem(last=False)
+            self._current = snapshot
+            self._file_state = (stat.st_mtime_ns, stat.st_size)
+            self._checked_at = time.monotonic()
+            return True
+    
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return
+        if (stat.st_mtime_ns, stat.st_size) != self._file_state:
+            self.reload()
+    
+    def _snapshot_for(self, session: dict):
+        if session is None:
+            return self._current
+        snapshot = self._snapshots.get(session.get('question_bank_version'), self._current)
+        session['question_bank_version'] = snapshot.version
+        return snapshot
+    
+    @timed_stage('question')
+    def get_question(self, role, difficulty='medium', used_questions=None, session=None,
+                     draft: QuestionDraft = None):
+        """Get a question from the specified difficulty bucket.
+
+        Up to QUESTION_CANDIDATES unused questions are sampled and the one least
+        similar to the questions already asked and the session's recent answers
+        is returned (one matrix product per draw). Used questions are skipped by
+        position, so a draw's cost doesn't grow with the bucket size. Pass the
+        session to keep it on one bank version across reloads, and a draft from
+        prepare_draw() to reuse its candidates (ignored if it no longer matches).
+        """
+        self._maybe_reload()
+        snapshot = self._snapshot_for(session)
+        bucket = snapshot.questions[role][difficulty]
+        positions = snapshot.positions[(role, difficulty)]
+        used_questions = list(used_questions or ())
+        used = {positions[q] for q in used_questions if q in positions}
         
-        available = [q for q in self.questions[role][difficulty] if q not in used_questions]
-        if not available:
+        if len(used) >= len(bucket):
             # If all questions used, reset
-            available = self.questions[role][difficulty]
+            return random.choice(bucket)
+        if draft is not None and draft.matches(snapshot.version, role, difficulty, used_questions):
+            candidates, known = draft.candidates, draft.similarity
+        else:
+            candidates, known = self._sample_unused(len(bucket), used), {}
         
-        return random.choice(available)
+        context = list(dict.fromkeys(used_questions + self._recent_answers(session)))
+        if len(candidates) == 1 or not context:
+            return bucket[random.choice(candidates)]
+        
+        columns = [known[text] for text in context if text in known]
+        missing = [text for text in context if text not in known]
+        if missing:
+            columns.extend(self._similarity(snapshot, role, difficulty, candidates, missing).values())
+        closest = np.max(columns, axis=0)
+        # Break ties between equally dissimilar candidates randomly
+        best = np.flatnonzero(closest <= closest.min() + 1e-6)
+        return bucket[candidates[random.choice(best)]]
+    
+    def prepare_draw(self, role: str, difficulty: str, used_questions: list, context: list,
+                     version: int = None):
+        """Sample the candidates of the next draw ahead of time (None if the bucket is used up).
+
+        Only reads the bank, so it can run on another thread; used_questions and
+        context are copies of the session's asked questions and recent answers.
+        """
+        snapshot = self._snapshots.get(version, self._current)
+        positions = snapshot.positions[(role, difficulty)]
+        used = {positions[q] for q in used_questions if q in positions}
+        if len(used) >= len(positions):
+            return None
+        candidates = self._sample_unused(len(positions), used)
+        context = list(dict.fromkeys(context))
+        similarity = self._similarity(snapshot, role, difficulty, candidates, context) if context else {}
+        return QuestionDraft(snapshot.version, role, difficulty, tuple(used_questions), candidates, similarity)
+    
+    @staticmethod
+    def _similarity(snapshot: QuestionBankSnapshot, role: str, difficulty: str, candidates: list,
+                    texts: list) -> dict:
+        """text -> cosine similarity of each candidate to it"""
+        matrix = snapshot.vectors[(role, difficulty)][candidates] @ snapshot.context_vectors(role, texts).T
+        return dict(zip(texts, matrix.T))
+    
+    @staticmethod
+    def _sample_unused(size: int, used: set) -> list:
+        """Up to QUESTION_CANDIDATES distinct unused positions"""
+        if size - len(used) <= QUESTION_CANDIDATES or len(used) * 2 > size:
+            unused = [index for index in range(size) if index not in used]
+            return random.sample(unused, min(QUESTION_CANDIDATES, len(unused)))
+        # Mostly unused: rejection sampling needs about two tries per candidate
+        candidates = set()
+        while len(candidates) < QUESTION_CANDIDATES:
+            index = random.randrange(size)
+            if index not in used:
+                candidates.add(index)
+        return list(candidates)
+    
+    @staticmethod
+    def _recent_answers(session: dict) -> list:
+        if not session:
+            return []
+        answers = [event['content'] for event in session.get('conversation_history', [])
+                   if event.get('role') == 'user' and event.get('content')]
+        return answers[-QUESTION_CONTEXT_ANSWERS:]
+
+class KeywordMatcher:
+    """Finds every keyword category in a text with one compiled regex.
+
+    categories maps a name to {"match": mode, "terms": [...]}. Mode "word"
+    matches whole words or phrases, "prefix" also matches words starting with
+    the term ("develop" matches "developer"), and "exact" compares the whole
+    stripped text. Matching is case-insensitive, starts at word boundaries and
+    tolerates extra whitespace inside phrases. Terms may be shared between
+    categories and may overlap in the text.
+    """
+    def __init__(self, categories: dict):
+        self.exact = {}  # category -> set of whole-text terms
+        self._terms = {}  # term -> [(category, whole_word)]
+        for category, spec in categories.items():
+            mode = spec.get('match', 'word')
+            if mode not in ('word', 'prefix', 'exact'):
+                raise ValueError(f"Unknown match mode for {category}: {mode}")
+            terms = [' '.join(term.lower().split()) for term in spec.get('terms', [])]
+            if mode == 'exact':
+                self.exact[category] = set(terms)
+                continue
+            for term in terms:
+                self._terms.setdefault(term, []).append((category, mode == 'word'))
+        self.categories = list(categories)
+        
+        # Shorter terms that are prefixes of a longer one share its match position
+        self._prefixes = {
+            term: sorted((other for other in self._terms if term.startswith(other)), key=len, reverse=True)
+            for term in self._terms
+        }
+        alternatives = sorted(self._terms, key=len, reverse=True)
+        pattern = '|'.join(r'\s+'.join(re.escape(word) for word in term.split()) for term in alternatives)
+        # Zero-width lookahead so overlapping matches are all found in one scan
+        self._regex = re.compile(rf'\b(?=({pattern}))') if alternatives else None
+    
+    @classmethod
+    def from_file(cls, path: Path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+    
+    def scan(self, text: str) -> dict:
+        """Map of category -> set of matched terms, for every category that hit"""
+        text_lower = (text or '').lower()
+        hits = {}
+        stripped = ' '.join(text_lower.split())
+        for category, terms in self.exact.items():
+            if stripped in terms:
+                hits.setdefault(category, set()).add(stripped)
+        if self._regex is None:
+            return hits
+        
+        for match in self._regex.finditer(text_lower):
+            matched = ' '.join(match.group(1).split())
+            start = match.start(1)
+            for term in self._prefixes[matched]:
+                end = start + self._span(text_lower, start, term)
+                at_word_end = end >= len(text_lower) or not (text_lower[end].isalnum() or text_lower[end] == '_')
+                for category, whole_word in self._terms[term]:
+                    if at_word_end or not whole_word:
+                        hits.setdefault(category, set()).add(term)
+        return hits
+    
+    @staticmethod
+    def _span(text: str, start: int, term: str) -> int:
+        """Length of term as it appears at start (phrases may contain runs of whitespace)"""
+        if ' ' not in term:
+            return len(term)
+        return re.match(r'\s+'.join(re.escape(word) for word in term.split()), text[start:]).end()
+
+keyword_matcher = KeywordMatcher.from_file(HEURISTICS_PATH)
+
+class AnswerFeatures:
+    """Heuristic features of one user message, computed once per turn.
+
+    chat_turn() builds this before doing anything else and every decision
+    point (off-topic and skip checks, role selection, follow-up decision,
+    answer analysis) reads from it instead of rescanning the text.
+    """
+    def __init__(self, text: str, matcher: KeywordMatcher = None):
+        text = text or ''
+        stripped = text.strip()
+        self.text = text
+        self.hits = (matcher or keyword_matcher).scan(text)
+        self.word_count = len(text.split())
+        self.has_digits = any(ch.isdigit() for ch in text)
+        self.has_letters = bool(re.search(r'[a-zA-Z]', text))
+        self.is_nonsense = (
+            len(stripped) < 3 or                                # too short
+            not self.has_letters or                              # only digits / special characters
+            (len(set(stripped)) < 3 and len(stripped) > 10) or  # repetitive characters
+            'nonsense' in self.hits                              # common nonsense patterns
+        )
+    
+    def has(self, category: str) -> bool:
+        return category in self.hits
+    
+    def has_role_keywords(self, role: str) -> bool:
+        return f"role:{role}" in self.hits
+    
+    @property
+    def is_off_topic_request(self) -> bool:
+        """An off-topic request with nothing interview-related in it"""
+        return 'off_topic_requests' in self.hits and 'interview_keywords' not in self.hits
+    
+    def selected_role(self):
+        """Role named in a role-selection message, or None"""
+        for role in INTERVIEW_ROLES:
+            if f"select:{role}" in self.hits:
+                return role
+        return None
+    
+    def to_dict(self) -> dict:
+        return {
+            'word_count': self.word_count,
+            'has_digits': self.has_digits,
+            'is_nonsense': self.is_nonsense,
+            'hits': {category: sorted(terms) for category, terms in sorted(self.hits.items())}
+        }
 
 class HeuristicsAnalyzer:
     """Simple heuristics layer for answer analysis"""
     
     @staticmethod
-    def analyze_answer(answer: str, role: str) -> dict:
+    def analyze_answer(answer: str, role: str, features: AnswerFeatures = None) -> dict:
         """Analyze answer using simple heuristics"""
-        answer_lower = answer.lower()
-        words = answer.split()
-        word_count = len(words)
-        
-        # Profanity detection (simple)
-        profanity_words = ['damn', 'hell', 'crap', 'stupid', 'idiot']  # Basic list
-        has_profanity = any(word in answer_lower for word in profanity_words)
+        features = features or AnswerFeatures(answer)
+        word_count = features.word_count
         
-        # Off-topic detection (check for common off-topic phrases)
-        off_topic_phrases = ['i don\'t know', 'i have no idea', 'not relevant', 'unrelated']
-        is_off_topic = any(phrase in answer_lower for phrase in off_topic_phrases)
+        # Profanity and off-topic phrases
+        has_profanity = features.has('profanity')
+        is_off_topic = features.has('off_topic')
         
         # Answer quality indicators
-        has_digits = bool(re.search(r'\d+', answer))
-        has_keywords = HeuristicsAnalyzer._check_role_keywords(answer_lower, role)
-        has_examples = any(word in answer_lower for word in ['example', 'instance', 'time when', 'situation', 'project'])
+        has_digits = features.has_digits
+        has_keywords = features.has_role_keywords(role)
+        has_examples = features.has('example_markers')
         
         # Length analysis
         is_too_short = word_count < 10
@@ -172,93 +1328,696 @@ class HeuristicsAnalyzer:
     @staticmethod
     def _check_role_keywords(answer: str, role: str) -> bool:
         """Check if answer contains role-relevant keywords"""
-        role_keywords = {
-            'engineer': ['code', 'programming', 'develop', 'debug', 'algorithm', 'system', 'software', 'project', 'api', 'database'],
-            'sales': ['customer', 'client', 'relationship', 'close', 'deal', 'revenue', 'target', 'pipeline', 'prospect', 'negotiation'],
-            'retail': ['customer', 'service', 'product', 'store', 'experience', 'satisfaction', 'help', 'assist', 'purchase', 'inventory']
-        }
-        keywords = role_keywords.get(role, [])
-        return any(keyword in answer for keyword in keywords)
+        return AnswerFeatures(answer).has_role_keywords(role)
     
     @staticmethod
     def is_nonsense(answer: str) -> bool:
         """Detect nonsense inputs"""
-        answer = answer.strip()
+        return AnswerFeatures(answer).is_nonsense
+
+class FastPathScorer:
+    """Small NumPy model that scores clear-cut answers without an LLM call.
+
+    Trained offline on stored LLM evaluations (trainFastScorer.py). A softmax
+    classifier puts each answer in a weak / medium / strong band of the overall
+    score and a ridge regression predicts the scores. Only weak or strong
+    predictions at or above the confidence threshold are used; everything
+    else still goes to the LLM.
+    """
+    FEATURES = (
+        'log_words', 'has_digits', 'has_keywords', 'has_examples', 'has_profanity', 'is_off_topic',
+        'is_strong', 'is_too_short', 'is_too_long', 'is_nonsense', 'interview_terms', 'role_terms'
+    )
+    TARGETS = ('communication', 'technical', 'examples', 'overall')
+    BANDS = ('weak', 'medium', 'strong')
+    WEAK_BELOW = 50  # overall scores below this are 'weak'
+    STRONG_FROM = 75  # overall scores from this up are 'strong'
+    
+    def __init__(self, mean, scale, classifier, regressor, threshold=FAST_SCORER_THRESHOLD, metadata=None):
+        self.mean = np.asarray(mean, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+        self.classifier = np.asarray(classifier, dtype=float)  # (features + 1) x bands
+        self.regressor = np.asarray(regressor, dtype=float)  # (features + 1) x targets
+        self.threshold = threshold
+        self.metadata = metadata or {}
+    
+    @classmethod
+    def featurize(cls, answer: str, role: str, features: AnswerFeatures = None, analysis: dict = None) -> np.ndarray:
+        """Feature vector (in FEATURES order) for one answer"""
+        features = features or AnswerFeatures(answer)
+        analysis = analysis or HeuristicsAnalyzer.analyze_answer(answer, role, features)
+        return np.array([
+            np.log1p(features.word_count),
+            analysis['has_digits'], analysis['has_keywords'], analysis['has_examples'],
+            analysis['has_profanity'], analysis['is_off_topic'], analysis['is_strong'],
+            analysis['is_too_short'], analysis['is_too_long'], features.is_nonsense,
+            len(features.hits.get('interview_keywords', ())),
+            len(features.hits.get(f"role:{role}", ())),
+        ], dtype=float)
+    
+    @classmethod
+    def band(cls, overall: float) -> int:
+        if overall < cls.WEAK_BELOW:
+            return 0
+        return 2 if overall >= cls.STRONG_FROM else 1
+    
+    def _design(self, rows: np.ndarray) -> np.ndarray:
+        """Standardize feature rows and add the bias column"""
+        rows = (np.atleast_2d(rows) - self.mean) / self.scale
+        return np.hstack([rows, np.ones((rows.shape[0], 1))])
+    
+    @staticmethod
+    def _softmax(logits: np.ndarray) -> np.ndarray:
+        logits = logits - logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+    
+    @classmethod
+    def fit(cls, samples: list, ridge: float = 1.0, l2: float = 0.01, iterations: int = 500,
+            learning_rate: float = 0.5, threshold: float = FAST_SCORER_THRESHOLD) -> 'FastPathScorer':
+        """Train on (answer, role, eval_data) samples"""
+        rows = np.array([cls.featurize(answer, role) for answer, role, _ in samples])
+        targets = np.array([
+            [eval_data['scores'].get(key, 0) for key in cls.TARGETS[:3]] + [eval_data['overall']]
+            for _, _, eval_data in samples
+        ], dtype=float)
+        bands = np.array([cls.band(overall) for overall in targets[:, 3]])
         
-        # Too short
-        if len(answer) < 3:
-            return True
+        mean = rows.mean(axis=0)
+        scale = rows.std(axis=0)
+        scale[scale == 0] = 1.0  # constant features stay at zero
+        model = cls(mean, scale, np.zeros((rows.shape[1] + 1, len(cls.BANDS))),
+                    np.zeros((rows.shape[1] + 1, len(cls.TARGETS))), threshold)
+        design = model._design(rows)
         
-        # Only special characters
-        if not re.search(r'[a-zA-Z]', answer):
-            return True
+        # Ridge regression for the scores (bias not penalized)
+        penalty = ridge * np.eye(design.shape[1])
+        penalty[-1, -1] = 0.0
+        model.regressor = np.linalg.solve(design.T @ design + penalty, design.T @ targets)
         
-        # Repetitive characters
-        if len(set(answer)) < 3 and len(answer) > 10:
-            return True
+        # Softmax regression for the band, by gradient descent
+        one_hot = np.eye(len(cls.BANDS))[bands]
+        weights = np.zeros_like(model.classifier)
+        for _ in range(iterations):
+            gradient = design.T @ (cls._softmax(design @ weights) - one_hot) / len(samples)
+            gradient[:-1] += l2 * weights[:-1]
+            weights -= learning_rate * gradient
+        model.classifier = weights
+        model.metadata = {'samples': len(samples), 'trained_at': datetime.now().isoformat()}
+        return model
+    
+    def predict(self, answer: str, role: str, features: AnswerFeatures = None):
+        """(evaluation, band name, confidence) regardless of the threshold"""
+        features = features or AnswerFeatures(answer)
+        analysis = HeuristicsAnalyzer.analyze_answer(answer, role, features)
+        design = self._design(self.featurize(answer, role, features, analysis))
+        probabilities = self._softmax(design @ self.classifier)[0]
+        band = int(probabilities.argmax())
+        predicted = (design @ self.regressor)[0]
         
-        # Common nonsense patterns
-        nonsense_patterns = ['asdf', 'qwerty', 'test', '12345', 'abc', 'xyz']
-        if answer.lower() in nonsense_patterns:
-            return True
+        scores = {key: int(max(0, min(5, round(value)))) for key, value in zip(self.TARGETS[:3], predicted[:3])}
+        overall = int(max(0, min(100, round(predicted[3]))))
+        # Keep the score consistent with the band the classifier is confident about
+        if band == 0:
+            overall = min(overall, self.WEAK_BELOW - 1)
+        elif band == 2:
+            overall = max(overall, self.STRONG_FROM)
         
+        eval_data = {
+            "scores": scores,
+            "overall": overall,
+            "should_followup": band == 0,
+            "followup_question": "Can you walk me through a specific example?" if band == 0 else "",
+            "feedback": self._feedback(analysis, role, band),
+            "scorer": "fast_path"
+        }
+        return eval_data, self.BANDS[band], float(probabilities[band])
+    
+    def evaluate(self, answer: str, role: str, features: AnswerFeatures = None):
+        """Evaluation for a clear-cut answer, or None if the LLM should score it"""
+        eval_data, band, confidence = self.predict(answer, role, features)
+        if band == 'medium' or confidence < self.threshold:
+            return None
+        return eval_data
+    
+    @staticmethod
+    def _feedback(analysis: dict, role: str, band: int) -> list:
+        if band == 2:
+            return ["Clear, relevant answer with concrete detail"]
+        feedback = []
+        if analysis['is_too_short']:
+            feedback.append("Give a fuller answer; a few sentences at least")
+        if not analysis['has_examples']:
+            feedback.append("Add a specific example from your experience")
+        if not analysis['has_keywords']:
+            feedback.append(f"Include more {role}-specific detail")
+        return feedback or ["Make the answer more specific to the question"]
+    
+    def to_dict(self) -> dict:
+        return {
+            'features': list(self.FEATURES),
+            'mean': self.mean.tolist(),
+            'scale': self.scale.tolist(),
+            'classifier': self.classifier.tolist(),
+            'regressor': self.regressor.tolist(),
+            'metadata': self.metadata
+        }
+    
+    def save(self, path: Path):
+        """Write the model atomically"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = path.with_name(f".{path.name}.tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        temp_file.replace(path)
+    
+    @classmethod
+    def load(cls, path: Path = FAST_SCORER_PATH, threshold: float = FAST_SCORER_THRESHOLD):
+        """Load a trained model; None if there is none or it does not match FEATURES"""
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data['features'] != list(cls.FEATURES):
+                raise ValueError("feature list differs; retrain with trainFastScorer.py")
+            return cls(data['mean'], data['scale'], data['classifier'], data['regressor'],
+                       threshold, data.get('metadata'))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error loading fast-path scorer {path}: {e}")
+            return None
+
+# Loaded once at startup; restart after retraining
+fast_path_scorer = FastPathScorer.load()
+
+class RateLimitError(Exception):
+    """Raised when the LLM backend rejects a request for exceeding its quota"""
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the LLM while the circuit breaker is open"""
+
+class TokenBucket:
+    """Thread-safe token bucket pacing LLM requests across the whole process.
+
+    reserve() always takes a token, letting the balance go negative, so callers
+    that arrive together queue up one 1/rate interval apart instead of retrying
+    in lockstep. pause() holds every caller back, e.g. for a Retry-After.
+    """
+    def __init__(self, rate=GEMINI_RPS, burst=GEMINI_BURST):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()  # in the future while paused
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.delayed = 0
+        self.delay_seconds = 0.0
+    
+    def reserve(self) -> float:
+        """Take a token; returns the seconds the caller must wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            if now > self._updated:
+                if self.rate > 0:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+            delay = self._updated - now
+            if self.rate > 0:
+                self._tokens -= 1
+                if self._tokens < 0:
+                    delay += -self._tokens / self.rate
+            self.acquired += 1
+            if delay > 0:
+                self.delayed += 1
+                self.delay_seconds += delay
+            return delay
+    
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+    
+    async def acquire_async(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    
+    def pause(self, seconds: float):
+        """Hand out no tokens for the next few seconds"""
+        with self._lock:
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = max(self._updated, time.monotonic() + seconds)
+    
+    def stats(self) -> dict:
+        """Counters for /api/stats"""
+        with self._lock:
+            return {
+                'rate': self.rate,
+                'burst': self.burst,
+                'acquired': self.acquired,
+                'delayed': self.delayed,
+                'delay_seconds': round(self.delay_seconds, 3),
+                'paused': self._updated > time.monotonic()
+            }
+
+class CircuitBreaker:
+    """Stops calling a failing backend until it has had time to recover.
+
+    closed: calls go through; failure_threshold failed calls in a row open it.
+    open: calls are rejected until reset_timeout has passed.
+    half_open: one probe call is let through; success closes the breaker,
+    failure opens it again.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._opened_at = 0.0
+            self._probing = False
+            self.opened = 0
+            self.rejected = 0
+    
+    def allow(self) -> bool:
+        """Whether a call may go ahead; in half-open state only one probe at a time"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+    
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probing = False
+    
+    def release(self):
+        """End a call in a finally block; a half-open probe that recorded no outcome
+        (e.g. cancelled with asyncio.CancelledError) lets the next caller probe"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+    
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and 0 < self.failure_threshold <= self.consecutive_failures
+            ):
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self.opened += 1
+    
+    def stats(self) -> dict:
+        """Counters for /api/stats"""
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'opened': self.opened,
+                'rejected': self.rejected
+            }
+
+def backoff_delay(attempt: int, retry_after: float = None) -> float:
+    """Seconds to wait before retry number attempt + 1: full jitter, at least retry_after"""
+    delay = random.uniform(0, min(GEMINI_BACKOFF_MAX, GEMINI_BACKOFF_BASE * 2 ** attempt))
+    if retry_after:
+        delay = max(delay, retry_after)
+    return delay
+
+# Shared by every LLMService in the process (one quota, one view of backend health)
+gemini_rate_limiter = TokenBucket()
+gemini_circuit = CircuitBreaker()
+
+class LLMBackend:
+    """Interface for the text generation backend used by LLMService.
+
+    system_instruction is only passed when prefix caching is on: the backend
+    should send it by reference (cached content) rather than with every call.
+    """
+    name = 'base'
+    
+    def generate(self, prompt: str, generation_config: dict, system_instruction: str = None) -> str:
+        """Return the generated text for a prompt"""
+        raise NotImplementedError
+    
+    async def generate_async(self, prompt: str, generation_config: dict, system_instruction: str = None) -> str:
+        """Async generate; defaults to running generate() on the loop's executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.generate, prompt, generation_config, system_instruction)
+    
+    def prefix_cached(self, system_instruction: str) -> bool:
+        """Whether the instruction is sent by reference instead of as input text"""
         return False
 
+class GeminiBackend(LLMBackend):
+    """Google Gemini through the google-generativeai client"""
+    name = 'gemini'
+    
+    def __init__(self, model_name: str = GEMINI_MODEL):
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+        # system instruction -> (model carrying it, expiry time, cached by reference)
+        self._prefixed = {}
+        self._prefixed_lock = threading.Lock()
+    
+    def _model_for(self, system_instruction: str):
+        """Model with the instruction in a CachedContent, or as its system instruction if caching is refused"""
+        if not system_instruction:
+            return self.model
+        with self._prefixed_lock:
+            entry = self._prefixed.get(system_instruction)
+            if entry is None or time.monotonic() >= entry[1]:
+                try:
+                    cached = genai.caching.CachedContent.create(
+                        model=f"models/{self.model_name}", system_instruction=system_instruction,
+                        ttl=timedelta(seconds=PROMPT_CACHE_TTL)
+                    )
+                    # Renew a little before the backend drops it
+                    entry = (genai.GenerativeModel.from_cached_content(cached),
+                             time.monotonic() + PROMPT_CACHE_TTL * 0.9, True)
+                except Exception as e:
+                    # Explicit caching has a minimum prefix size; the instruction still only
+                    # needs to be set once per model
+                    print(f"Prompt prefix not cached, using a system instruction: {e}")
+                    entry = (genai.GenerativeModel(self.model_name, system_instruction=system_instruction),
+                             float('inf'), False)
+                self._prefixed[system_instruction] = entry
+            return entry[0]
+    
+    def prefix_cached(self, system_instruction: str) -> bool:
+        entry = self._prefixed.get(system_instruction)
+        return bool(entry and entry[2])
+    
+    def generate(self, prompt: str, generation_config: dict, system_instruction: str = None) -> str:
+        try:
+            response = self._model_for(system_instruction).generate_content(prompt, generation_config=generation_config)
+        except google_exceptions.ResourceExhausted as e:
+            raise RateLimitError(f"Gemini quota exceeded: {e}") from e
+        return response.text if response and hasattr(response, 'text') else ''
+    
+    async def generate_async(self, prompt: str, generation_config: dict, system_instruction: str = None) -> str:
+        try:
+            response = await self._model_for(system_instruction).generate_content_async(
+                prompt, generation_config=generation_config
+            )
+        except google_exceptions.ResourceExhausted as e:
+            raise RateLimitError(f"Gemini quota exceeded: {e}") from e
+        return response.text if response and hasattr(response, 'text') else ''
+
+class MockGeminiBackend(LLMBackend):
+    """Gemini REST protocol client pointed at a local stand-in server (mockGeminiServer.py)"""
+    name = 'mock'
+    
+    def __init__(self, base_url: str = MOCK_LLM_URL, model_name: str = GEMINI_MODEL):
+        self.base_url = base_url.rstrip('/')
+        self.model_name = model_name
+        self.url = f"{self.base_url}/v1beta/models/{model_name}:generateContent"
+        self.http = requests.Session()
+        self._cached_contents = {}  # system instruction -> cachedContents/<id>
+        self._cached_lock = threading.Lock()
+    
+    def _cached_content(self, system_instruction: str) -> str:
+        """Name of the cachedContents resource holding the instruction, created on first use"""
+        with self._cached_lock:
+            name = self._cached_contents.get(system_instruction)
+        if name is None:
+            response = self.http.post(f"{self.base_url}/v1beta/cachedContents", json={
+                "model": f"models/{self.model_name}",
+                "systemInstruction": {"parts": [{"text": system_instruction}]},
+                "ttl": f"{PROMPT_CACHE_TTL}s"
+            }, timeout=GEMINI_TIMEOUT)
+            response.raise_for_status()
+            name = response.json()['name']
+            with self._cached_lock:
+                self._cached_contents[system_instruction] = name
+        return name
+    
+    def prefix_cached(self, system_instruction: str) -> bool:
+        return system_instruction in self._cached_contents
+    
+    def generate(self, prompt: str, generation_config: dict, system_instruction: str = None) -> str:
+        body = {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": {
+                "temperature": generation_config.get("temperature"),
+                "topP": generation_config.get("top_p"),
+                "topK": generation_config.get("top_k"),
+                "maxOutputTokens": generation_config.get("max_output_tokens"),
+            }
+        }
+        if system_instruction:
+            body["cachedContent"] = self._cached_content(system_instruction)
+        response = self.http.post(self.url, json=body, timeout=GEMINI_TIMEOUT)
+        
+        if response.status_code == 404 and system_instruction:
+            # Cached content expired on the server: create it again and retry once
+            with self._cached_lock:
+                self._cached_contents.pop(system_instruction, None)
+            body["cachedContent"] = self._cached_content(system_instruction)
+            response = self.http.post(self.url, json=body, timeout=GEMINI_TIMEOUT)
+        
+        if response.status_code == 429:
+            retry_after = response.headers.get('Retry-After')
+            raise RateLimitError("Mock LLM rate limit exceeded", float(retry_after) if retry_after else None)
+        response.raise_for_status()
+        
+        candidates = response.json().get('candidates') or []
+        if not candidates:
+            return ''
+        return ''.join(part.get('text', '') for part in candidates[0].get('content', {}).get('parts', []))
+
+def create_llm_backend(name: str = None) -> LLMBackend:
+    """Build the configured LLM backend"""
+    name = name or LLM_BACKEND
+    if name == 'gemini':
+        return GeminiBackend()
+    if name == 'mock':
+        return MockGeminiBackend()
+    raise ValueError(f"Unknown LLM backend: {name}")
+
 class LLMService:
     """Service for interacting with Google Gemini LLM"""
     
-    def __init__(self):
-        self.model = genai.GenerativeModel(GEMINI_MODEL)
+    def __init__(self, backend: LLMBackend = None, rate_limiter: TokenBucket = None, circuit: CircuitBreaker = None,
+                 fast_scorer: FastPathScorer = None, prefix_cache: bool = None):
+        self.backend = backend or create_llm_backend()
+        self.prefix_cache = PROMPT_PREFIX_CACHE if prefix_cache is None else prefix_cache
+        # Clear-cut answers are scored locally; set to None to send every answer to the LLM
+        self.fast_scorer = fast_scorer or fast_path_scorer
+        self.rate_limiter = rate_limiter or gemini_rate_limiter
+        self.circuit = circuit or gemini_circuit
+        # Cap concurrent Gemini requests; retries wait outside the semaphore
+        self._slots = threading.BoundedSemaphore(GEMINI_MAX_CONCURRENCY)
+        self._async_slots = None  # created on first use inside the event loop
+        self._counters_lock = threading.Lock()
+        self.counters = {'calls': 0, 'retries': 0, 'rate_limited': 0, 'errors': 0,
+                         'failures': 0, 'circuit_rejections': 0, 'fast_path': 0,
+                         'prompt_bytes': 0, 'prompt_bytes_saved': 0, 'input_tokens_saved': 0, 'prefix_cached_calls': 0}
     
-    def call_gemini_api(self, prompt: str, max_tokens: int = GEMINI_MAX_TOKENS, temperature: float = 0.7) -> str:
-        """Call Gemini API with retry logic"""
-        max_retries = 3
-        
+    def _count(self, name: str, amount: int = 1):
+        with self._counters_lock:
+            self.counters[name] += amount
+    
+    def stats(self) -> dict:
+        """Counters for /api/stats"""
+        with self._counters_lock:
+            counters = dict(self.counters)
+        counters['input_tokens_saved_per_call'] = (
+            round(counters['input_tokens_saved'] / counters['calls'], 1) if counters['calls'] else 0.0
+        )
+        return dict(counters, rate_limiter=self.rate_limiter.stats(), circuit=self.circuit.stats())
+    
+    def _prompt_parts(self, prompt: str, system_instruction: str):
+        """(prompt, instruction for the backend): the instruction is inlined unless prefix caching is on"""
+        if system_instruction and not self.prefix_cache:
+            return f"""{system_instruction}
+
+{prompt}""", None
+        return prompt, system_instruction
+    
+    def _count_prompt(self, prompt: str, system_instruction: str, purpose: str):
+        """Record the input size of a successful call and what the cached prefix saved"""
+        sent = len(prompt.encode('utf-8'))
+        if system_instruction:
+            prefix = len(system_instruction.encode('utf-8'))
+            if self.backend.prefix_cached(system_instruction):
+                self._count('prefix_cached_calls')
+                self._count('prompt_bytes_saved', prefix)
+                self._count('input_tokens_saved', prefix // 4)  # rough estimate, as in _response_text
+                metrics.inc('llm_prompt_bytes_saved_total', prefix, purpose=purpose)
+            else:
+                sent += prefix
+        self._count('prompt_bytes', sent)
+        metrics.observe('llm_prompt_bytes', sent, purpose=purpose)
+    
+    def _generate(self, prompt: str, generation_config: dict, system_instruction: str):
+        if system_instruction:
+            return self.backend.generate(prompt, generation_config, system_instruction=system_instruction)
+        return self.backend.generate(prompt, generation_config)
+    
+    async def _generate_async(self, prompt: str, generation_config: dict, system_instruction: str):
+        if system_instruction:
+            return await self.backend.generate_async(prompt, generation_config, system_instruction=system_instruction)
+        return await self.backend.generate_async(prompt, generation_config)
+    
+    @staticmethod
+    def _generation_config(max_tokens: int, temperature: float) -> dict:
         # Create generation config as dict (more compatible)
-        generation_config = {
+        return {
             "temperature": temperature,
             "top_p": 0.8,
             "top_k": 40,
             "max_output_tokens": max_tokens,
         }
+    
+    @staticmethod
+    def _response_text(text: str, max_tokens: int) -> str:
+        """Size-check generated text"""
+        if text:
+            generated_text = text.strip()
+            # Check if response is too long (token control)
+            if len(generated_text) > max_tokens * 4:  # Rough estimate
+                raise ValueError("Response exceeds expected size")
+            return generated_text
+        raise Exception("Empty response from Gemini API")
+    
+    def _check_circuit(self, purpose: str):
+        """Raise CircuitOpenError instead of calling a backend that keeps failing"""
+        if not self.circuit.allow():
+            self._count('circuit_rejections')
+            metrics.inc('llm_calls_total', purpose=purpose, outcome='circuit_open')
+            raise CircuitOpenError("Gemini circuit breaker is open")
+        self._count('calls')
+    
+    def _retry_delay(self, error: Exception, attempt: int, purpose: str, started: float):
+        """Classify a failed attempt; returns the backoff before the next one, or None to give up"""
+        retry_after = None
+        reason = 'rate_limited' if isinstance(error, RateLimitError) else 'error'
+        if isinstance(error, RateLimitError):
+            self._count('rate_limited')
+            retry_after = error.retry_after
+            if retry_after:
+                # Hold back every caller in the process, not just this one
+                self.rate_limiter.pause(retry_after)
+        else:
+            self._count('errors')
         
-        for attempt in range(max_retries):
-            try:
-                response = self.model.generate_content(
-                    prompt,
-                    generation_config=generation_config
-                )
-                
-                if response and hasattr(response, 'text') and response.text:
-                    generated_text = response.text.strip()
-                    # Check if response is too long (token control)
-                    if len(generated_text) > max_tokens * 4:  # Rough estimate
-                        raise ValueError("Response exceeds expected size")
-                    return generated_text
-                else:
-                    raise Exception("Empty response from Gemini API")
-                    
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    import time
-                    time.sleep(2)
+        if attempt >= GEMINI_MAX_RETRIES - 1:
+            self._count('failures')
+            self.circuit.record_failure()
+            metrics.inc('llm_calls_total', purpose=purpose, outcome='failure')
+            metrics.observe('llm_call_duration_seconds', time.perf_counter() - started, purpose=purpose)
+            print(f"Error calling Gemini API: {error}")
+            return None
+        self._count('retries')
+        metrics.inc('llm_retries_total', purpose=purpose, reason=reason)
+        return backoff_delay(attempt, retry_after)
+    
+    def _record_success(self, prompt: str, system_instruction: str, text: str, purpose: str, started: float):
+        self.circuit.record_success()
+        self._count_prompt(prompt, system_instruction, purpose)
+        metrics.inc('llm_calls_total', purpose=purpose, outcome='success')
+        metrics.observe('llm_call_duration_seconds', time.perf_counter() - started, purpose=purpose)
+        metrics.observe('llm_response_bytes', len(text.encode('utf-8')), purpose=purpose)
+    
+    def call_gemini_api(self, prompt: str, max_tokens: int = GEMINI_MAX_TOKENS, temperature: float = 0.7,
+                        system_instruction: str = None, purpose: str = 'other') -> str:
+        """Call Gemini API through the shared rate limiter and circuit breaker, retrying with backoff.
+
+        system_instruction is the static part of the prompt; it is sent as a
+        cached prefix when prefix caching is on and prepended to prompt otherwise.
+        purpose labels the call in /metrics (evaluate, evaluate_batch, followup).
+        """
+        generation_config = self._generation_config(max_tokens, temperature)
+        prompt, system_instruction = self._prompt_parts(prompt, system_instruction)
+        self._check_circuit(purpose)
+        started = time.perf_counter()
+        
+        try:
+            attempt = 0
+            while True:
+                try:
+                    self.rate_limiter.acquire()
+                    with self._slots:
+                        text = self._generate(prompt, generation_config, system_instruction)
+                    text = self._response_text(text, max_tokens)
+                except Exception as e:
+                    delay = self._retry_delay(e, attempt, purpose, started)
+                    if delay is None:
+                        raise
+                    time.sleep(delay)
+                    attempt += 1
                     continue
-                print(f"Error calling Gemini API: {e}")
-                raise
+                self._record_success(prompt, system_instruction, text, purpose, started)
+                return text
+        finally:
+            self.circuit.release()
+    
+    async def call_gemini_api_async(self, prompt: str, max_tokens: int = GEMINI_MAX_TOKENS, temperature: float = 0.7,
+                                    system_instruction: str = None, purpose: str = 'other') -> str:
+        """Async variant of call_gemini_api for the ASGI server path"""
+        generation_config = self._generation_config(max_tokens, temperature)
+        prompt, system_instruction = self._prompt_parts(prompt, system_instruction)
+        self._check_circuit(purpose)
+        started = time.perf_counter()
         
-        return ""
+        try:
+            attempt = 0
+            while True:
+                try:
+                    await self.rate_limiter.acquire_async()
+                    if self._async_slots is None:
+                        self._async_slots = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+                    async with self._async_slots:
+                        text = await self._generate_async(prompt, generation_config, system_instruction)
+                    text = self._response_text(text, max_tokens)
+                except Exception as e:
+                    delay = self._retry_delay(e, attempt, purpose, started)
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+                self._record_success(prompt, system_instruction, text, purpose, started)
+                return text
+        finally:
+            self.circuit.release()
     
     def generate_followup_question(self, role: str, question: str, answer: str) -> str:
         """Generate follow-up question using LLM"""
-        prompt = f"""{get_question_prompt(role)}
-
-Previous question: {question}
+        prompt = f"""Previous question: {question}
 Candidate's answer: {answer}
 
 Generate a focused follow-up question (6-20 words):"""
         
         try:
-            response = self.call_gemini_api(prompt, max_tokens=50, temperature=0.8)
+            response = self.call_gemini_api(
+                prompt, max_tokens=50, temperature=0.8, system_instruction=get_question_prompt(role),
+                purpose='followup'
+            )
             # Clean response
             response = response.strip()
             # Remove quotes if present
@@ -272,56 +2031,229 @@ Generate a focused follow-up question (6-20 words):"""
             print(f"Error generating follow-up: {e}")
             return "Can you provide more specific details about that?"
     
-    def evaluate_answer(self, question: str, answer: str, role: str) -> dict:
-        """Evaluate answer using LLM and return JSON"""
-        context = format_evaluation_context(question, answer, role)
-        prompt = f"""{get_evaluation_prompt()}
+    def _fast_path(self, answer: str, role: str, features: AnswerFeatures = None):
+        """Local evaluation for a clear-cut answer, or None"""
+        if self.fast_scorer is None:
+            return None
+        eval_data = self.fast_scorer.evaluate(answer, role, features)
+        if eval_data is not None:
+            self._count('fast_path')
+            metrics.inc('llm_fast_path_total')
+        return eval_data
+    
+    def evaluate_answer(self, question: str, answer: str, role: str, features: AnswerFeatures = None) -> dict:
+        """Evaluate answer using LLM and return JSON (cached per question/answer/role).
+
+        features are the turn's AnswerFeatures, if already computed, for the
+        fast path and the heuristic fallback.
+        """
+        eval_data = self._fast_path(answer, role, features)
+        if eval_data is not None:
+            return eval_data
+        try:
+            return evaluation_cache.get_or_compute(
+                question, answer, role,
+                lambda: self._request_evaluation(question, answer, role)
+            )
+        except CircuitOpenError:
+            return self._heuristic_evaluation(answer, role, features)
+        except Exception as e:
+            print(f"Error evaluating answer: {e}")
+            # Return default evaluation (not cached, so the next caller retries)
+            return self._default_evaluation()
+    
+    async def evaluate_answer_async(self, question: str, answer: str, role: str,
+                                    features: AnswerFeatures = None) -> dict:
+        """Async variant of evaluate_answer; shares the evaluation cache"""
+        eval_data = self._fast_path(answer, role, features)
+        if eval_data is not None:
+            return eval_data
+        cached = evaluation_cache.get(question, answer, role)
+        if cached is not None:
+            return cached
+        try:
+            response = await self.call_gemini_api_async(
+                format_evaluation_context(question, answer, role), max_tokens=GEMINI_MAX_TOKENS, temperature=0.3,
+                system_instruction=get_evaluation_prompt(), purpose='evaluate'
+            )
+            eval_data = self._parse_evaluation(response, 'evaluate')
+        except CircuitOpenError:
+            return self._heuristic_evaluation(answer, role, features)
+        except Exception as e:
+            print(f"Error evaluating answer: {e}")
+            return self._default_evaluation()
+        evaluation_cache.set(question, answer, role, eval_data)
+        return eval_data
+    
+    def evaluate_answers_batch(self, items: list, role: str) -> list:
+        """Evaluate several (question, answer) pairs, one LLM request per EVAL_BATCH_SIZE misses.
 
-{context}"""
+        Returns one evaluation per item, in order. Cached items and those the
+        fast-path scorer is confident about are not sent.
+        Items whose entry in the returned array is missing or invalid are
+        retried individually; if the batch request itself fails, the affected
+        items get the default evaluation (heuristic scores while the circuit
+        breaker is open).
+        """
+        results = [
+            self._fast_path(answer, role) or evaluation_cache.get(question, answer, role)
+            for question, answer in items
+        ]
+        missing = [index for index, result in enumerate(results) if result is None]
+        
+        for start in range(0, len(missing), EVAL_BATCH_SIZE):
+            chunk = missing[start:start + EVAL_BATCH_SIZE]
+            try:
+                parsed = self._request_batch_evaluation([items[index] for index in chunk], role)
+            except CircuitOpenError:
+                for index in chunk:
+                    results[index] = self._heuristic_evaluation(items[index][1], role)
+                continue
+            except Exception as e:
+                print(f"Error evaluating answers: {e}")
+                for index in chunk:
+                    results[index] = self._default_evaluation()
+                continue
+            
+            for index, eval_data in zip(chunk, parsed):
+                question, answer = items[index]
+                if eval_data is None:
+                    # Malformed item: score it on its own
+                    results[index] = self.evaluate_answer(question, answer, role)
+                else:
+                    evaluation_cache.set(question, answer, role, eval_data)
+                    results[index] = eval_data
+        return results
+    
+    def _request_batch_evaluation(self, items: list, role: str) -> list:
+        """Call the LLM once for several items; returns a validated evaluation or None per item"""
+        response = self.call_gemini_api(
+            format_batch_evaluation_context(items, role), max_tokens=GEMINI_MAX_TOKENS * len(items), temperature=0.3,
+            system_instruction=get_batch_evaluation_prompt(), purpose='evaluate_batch'
+        )
+        results = self._parse_batch_evaluation(response, len(items))
+        failures = results.count(None)
+        if failures:
+            metrics.inc('llm_parse_failures_total', failures, purpose='evaluate_batch')
+        return results
+    
+    @classmethod
+    def _parse_batch_evaluation(cls, response: str, count: int) -> list:
+        """Validate each element of a JSON array of evaluations; None for missing or invalid items"""
+        results = [None] * count
+        json_match = re.search(r'\[.*\]', response, re.DOTALL)
+        if not json_match:
+            return results
+        try:
+            items = json.loads(json_match.group(0))
+        except ValueError:
+            return results
+        if not isinstance(items, list):
+            return results
         
+        for position, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            # Prefer the model's own numbering; fall back to array order
+            number = item.pop('index', position + 1)
+            index = number - 1 if isinstance(number, int) else position
+            if not 0 <= index < count or results[index] is not None:
+                continue
+            try:
+                results[index] = cls._validate_evaluation(item)
+            except (ValueError, TypeError, AttributeError):
+                continue
+        return results
+    
+    @staticmethod
+    def _default_evaluation() -> dict:
+        metrics.inc('llm_fallbacks_total', kind='default')
+        return {
+            "scores": {"communication": 3, "technical": 3, "examples": 3},
+            "overall": 60,
+            "should_followup": True,
+            "followup_question": "Can you elaborate on that?",
+            "feedback": ["Evaluation temporarily unavailable"],
+            "scorer": "default"
+        }
+    
+    @staticmethod
+    def _heuristic_evaluation(answer: str, role: str, features: AnswerFeatures = None) -> dict:
+        """Score an answer from the heuristics alone while the circuit breaker is open (not cached)"""
+        metrics.inc('llm_fallbacks_total', kind='heuristics')
+        analysis = HeuristicsAnalyzer.analyze_answer(answer, role, features)
+        if analysis['is_too_short']:
+            communication = 2
+        elif analysis['is_too_long']:
+            communication = 3
+        else:
+            communication = 4
+        technical = 4 if analysis['has_keywords'] else 2
+        examples = 4 if analysis['has_examples'] else 3 if analysis['has_digits'] else 1
+        if analysis['has_profanity'] or analysis['is_off_topic']:
+            communication = max(0, communication - 2)
+            technical = max(0, technical - 1)
+        return {
+            "scores": {"communication": communication, "technical": technical, "examples": examples},
+            "overall": round((communication + technical + examples) * 100 / 15),
+            "should_followup": not analysis['is_strong'],
+            "followup_question": "Can you walk me through a specific example?",
+            "feedback": ["Scored by heuristics while the evaluation service is unavailable"],
+            "scorer": "heuristics"
+        }
+    
+    def _request_evaluation(self, question: str, answer: str, role: str) -> dict:
+        """Call the LLM and parse a validated evaluation; raises on failure"""
+        response = self.call_gemini_api(
+            format_evaluation_context(question, answer, role), max_tokens=GEMINI_MAX_TOKENS, temperature=0.3,
+            system_instruction=get_evaluation_prompt(), purpose='evaluate'
+        )
+        return self._parse_evaluation(response, 'evaluate')
+    
+    @staticmethod
+    def _parse_evaluation(response: str, purpose: str = None) -> dict:
+        """Extract and validate evaluation JSON from an LLM response; raises on failure"""
         try:
-            response = self.call_gemini_api(prompt, max_tokens=GEMINI_MAX_TOKENS, temperature=0.3)
-            
-            # Extract JSON from response
-            json_match = re.search(r'\{[^{}]*"scores"[^{}]*\{[^{}]*\}[^{}]*\}', response, re.DOTALL)
+            return LLMService._extract_evaluation(response)
+        except (ValueError, TypeError, AttributeError):
+            if purpose:
+                metrics.inc('llm_parse_failures_total', purpose=purpose)
+            raise
+    
+    @staticmethod
+    def _extract_evaluation(response: str) -> dict:
+        # Extract JSON from response
+        json_match = re.search(r'\{[^{}]*"scores"[^{}]*\{[^{}]*\}[^{}]*\}', response, re.DOTALL)
+        if json_match:
+            json_str = json_match.group(0)
+        else:
+            # Try to find any JSON object
+            json_match = re.search(r'\{.*\}', response, re.DOTALL)
             if json_match:
                 json_str = json_match.group(0)
             else:
-                # Try to find any JSON object
-                json_match = re.search(r'\{.*\}', response, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(0)
-                else:
-                    raise ValueError("No JSON found in response")
-            
-            # Parse JSON
-            eval_data = json.loads(json_str)
-            
-            # Validate schema
-            if not all(key in eval_data for key in EVALUATION_SCHEMA.keys()):
-                raise ValueError("Invalid evaluation schema")
-            
-            # Ensure scores are in range
-            for key in ['communication', 'technical', 'examples']:
-                if key in eval_data.get('scores', {}):
-                    eval_data['scores'][key] = max(0, min(5, int(eval_data['scores'][key])))
-            
-            # Ensure overall is 0-100
-            if 'overall' in eval_data:
-                eval_data['overall'] = max(0, min(100, int(eval_data['overall'])))
-            
-            return eval_data
-            
-        except Exception as e:
-            print(f"Error evaluating answer: {e}")
-            # Return default evaluation
-            return {
-                "scores": {"communication": 3, "technical": 3, "examples": 3},
-                "overall": 60,
-                "should_followup": True,
-                "followup_question": "Can you elaborate on that?",
-                "feedback": ["Evaluation temporarily unavailable"]
-            }
+                raise ValueError("No JSON found in response")
+        
+        # Parse JSON
+        return LLMService._validate_evaluation(json.loads(json_str))
+    
+    @staticmethod
+    def _validate_evaluation(eval_data: dict) -> dict:
+        """Check an evaluation against EVALUATION_SCHEMA and clamp scores; raises on failure"""
+        # Validate schema
+        if not isinstance(eval_data, dict) or not all(key in eval_data for key in EVALUATION_SCHEMA.keys()):
+            raise ValueError("Invalid evaluation schema")
+        
+        # Ensure scores are in range
+        for key in ['communication', 'technical', 'examples']:
+            if key in eval_data.get('scores', {}):
+                eval_data['scores'][key] = max(0, min(5, int(eval_data['scores'][key])))
+        
+        # Ensure overall is 0-100
+        if 'overall' in eval_data:
+            eval_data['overall'] = max(0, min(100, int(eval_data['overall'])))
+        
+        return eval_data
 
 class InterviewAgent:
     """Main interview agent with agentic behavior"""
@@ -331,31 +2263,21 @@ class InterviewAgent:
         self.heuristics = HeuristicsAnalyzer()
         self.llm_service = LLMService()
     
-    def decide_followup(self, answer: str, question: str, role: str, session: dict):
+    @timed_stage('followup')
+    def decide_followup(self, answer: str, question: str, role: str, session: dict,
+                        features: AnswerFeatures = None):
         """Decide whether to force follow-up or ask LLM, return (should_followup, followup_question)"""
-        heuristic_result = self.heuristics.analyze_answer(answer, role)
-        answer_lower = answer.lower()
+        features = features or AnswerFeatures(answer)
+        with timed_stage('heuristics'):
+            heuristic_result = self.heuristics.analyze_answer(answer, role, features)
         
         # Enhanced off-topic detection - check FIRST before anything else
-        off_topic_patterns = [
-            'what is the weather', 'what time is it', 'what is the date', 'what day is it',
-            'can you write', 'can you create', 'write me a resume', 'create a resume',
-            'what is 2+2', 'calculate', 'tell me a joke', 'how are you',
-            'what can you do', 'what are your capabilities', 'who are you',
-            'what is your name', 'where are you from'
-        ]
-        
-        # Check if clearly off-topic (contains off-topic pattern AND no interview-related words)
-        interview_keywords = ['interview', 'question', 'answer', 'role', 'engineer', 'software', 'sales', 
-                             'retail', 'customer', 'code', 'project', 'experience', 'work', 'job', 'position']
-        is_clearly_off_topic = any(pattern in answer_lower for pattern in off_topic_patterns) and \
-                               not any(keyword in answer_lower for keyword in interview_keywords)
-        
-        if is_clearly_off_topic:
+        # Clearly off-topic: an off-topic request AND no interview-related words
+        if features.is_off_topic_request:
             return (False, f"Let's focus on the interview. {question}")
         
         # Handle nonsense inputs
-        if self.heuristics.is_nonsense(answer):
+        if features.is_nonsense:
             return (False, f"I didn't quite understand that. Let's refocus on the interview question: {question}")
         
         # Check for profanity or off-topic
@@ -393,7 +2315,8 @@ class InterviewAgent:
             # Only follow up if answer lacks BOTH examples AND keywords (very rare)
             if not heuristic_result['has_examples'] and not heuristic_result['has_keywords']:
                 try:
-                    eval_result = self.llm_service.evaluate_answer(question, answer, role)
+                    with timed_stage('followup_llm'):
+                        eval_result = self.llm_service.evaluate_answer(question, answer, role, features)
                     should_followup = eval_result.get('should_followup', False)
                     followup_question = eval_result.get('followup_question', '')
                     
@@ -409,45 +2332,815 @@ class InterviewAgent:
         # Most answers are adequate - don't over-ask for elaboration
         return (False, None)
 
+@timed_stage('submit_eval')
+def attach_evaluation(session_id: str, session: dict, turn_index: int, eval_data: dict):
+    """Attach an evaluation to its turn in the session store and, in journal mode, the journal"""
+    interview_sessions.attach_eval(session_id, session, turn_index, eval_data)
+    if SESSION_JOURNAL:
+        append_journal_eval(session_id, session, turn_index, eval_data)
+
+def submit_evaluation(session_id: str, session: dict, turn_index: int, question: str, answer: str, role: str,
+                      features: AnswerFeatures = None):
+    """Score an answer on the worker pool and attach the result to its turn when done"""
+    def score():
+        # Attached before the future completes, so waiting on it means the eval is on the turn
+        eval_data = agent.llm_service.evaluate_answer(question, answer, role, features)
+        attach_evaluation(session_id, session, turn_index, eval_data)
+        return eval_data
+    
+    future = scoring_pool.submit(score)
+    with pending_evaluations_lock:
+        pending_evaluations.setdefault(session_id, {})[turn_index] = future
+    
+    def forget(done):
+        if not done.cancelled() and done.exception() is not None:
+            print(f"Evaluation error: {done.exception()}")
+        with pending_evaluations_lock:
+            session_pending = pending_evaluations.get(session_id, {})
+            if session_pending.get(turn_index) is done:
+                del session_pending[turn_index]
+            if not session_pending:
+                pending_evaluations.pop(session_id, None)
+    
+    future.add_done_callback(forget)
+    return future
+
+def get_pending_turns(session_id: str) -> list:
+    """Turn indices whose evaluation is still running"""
+    with pending_evaluations_lock:
+        return sorted(turn for turn, future in pending_evaluations.get(session_id, {}).items() if not future.done())
+
+def wait_for_evaluations(session_id: str, timeout: float = EVAL_WAIT_TIMEOUT) -> bool:
+    """Block until outstanding evaluations finish or the deadline passes; True if all done"""
+    with pending_evaluations_lock:
+        futures = list(pending_evaluations.get(session_id, {}).values())
+    if not futures:
+        return True
+    _, not_done = wait_futures(futures, timeout=timeout)
+    if not_done:
+        print(f"Timed out waiting for {len(not_done)} evaluation(s) in {session_id}")
+    return not not_done
+
+def wait_for_turn_evaluation(session_id: str, turn_index: int, timeout: float = EVAL_WAIT_TIMEOUT) -> bool:
+    """Block until one turn's evaluation finishes or the deadline passes"""
+    with pending_evaluations_lock:
+        future = pending_evaluations.get(session_id, {}).get(turn_index)
+    if future is None:
+        return True
+    _, not_done = wait_futures([future], timeout=timeout)
+    return not not_done
+
+async def wait_for_evaluations_async(session_id: str, timeout: float = EVAL_WAIT_TIMEOUT) -> bool:
+    """Async variant of wait_for_evaluations that doesn't block the event loop"""
+    with pending_evaluations_lock:
+        futures = [asyncio.wrap_future(f) for f in pending_evaluations.get(session_id, {}).values()]
+    if not futures:
+        return True
+    _, not_done = await asyncio.wait(futures, timeout=timeout)
+    return not not_done
+
+class Speculator:
+    """Work started before it is known to be needed, on its own small pool.
+
+    Session work (the next question draws) is registered per (session, kind)
+    and claimed by the request that needs it; a claim only succeeds if the
+    work is finished and was started for the same key (e.g. the same asked
+    questions), anything else is cancelled or dropped. Starting new work of a
+    kind replaces the old. Only the most recent max_sessions sessions keep work.
+    """
+    def __init__(self, pool: ThreadPoolExecutor = None, enabled: bool = SPECULATE,
+                 max_sessions: int = SESSION_MAX_LIVE):
+        self.pool = pool or speculative_pool
+        self.enabled = enabled
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._work = OrderedDict()  # session_id -> {kind: (key, Future)}
+        self.started = 0
+        self.used = 0
+        self.discarded = 0
+    
+    def submit(self, fn, *args):
+        """Start work not tied to a session; returns its Future, or None when disabled"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self.started += 1
+        return self.pool.submit(fn, *args)
+    
+    def start(self, session_id: str, kind: tuple, key, fn, *args):
+        """Start work for a session, replacing earlier work of the same kind"""
+        if not self.enabled:
+            return
+        future = self.submit(fn, *args)
+        replaced = []
+        with self._lock:
+            work = self._work.setdefault(session_id, {})
+            self._work.move_to_end(session_id)
+            if kind in work:
+                replaced.append((kind, work[kind][1]))
+            work[kind] = (key, future)
+            while len(self._work) > self.max_sessions:
+                evicted = self._work.popitem(last=False)[1]
+                replaced.extend((old_kind, old) for old_kind, (_, old) in evicted.items())
+        for old_kind, old in replaced:
+            self.drop(old_kind[0], old)
+    
+    def claim(self, session_id: str, kind: tuple, key):
+        """Result of finished work for this key, or None (the work is dropped either way)"""
+        with self._lock:
+            key_and_future = self._work.get(session_id, {}).pop(kind, None)
+        if key_and_future is None:
+            return None
+        started_for, future = key_and_future
+        if started_for != key or not future.done() or future.cancelled() or future.exception() is not None:
+            self.drop(kind[0], future)
+            return None
+        return self.use(kind[0], future)
+    
+    def use(self, kind: str, future, timeout: float = None):
+        """Wait for speculative work that turned out to be needed"""
+        result = future.result(timeout)
+        with self._lock:
+            self.used += 1
+        metrics.inc('speculative_work_total', kind=kind, outcome='used')
+        return result
+    
+    def drop(self, kind: str, future):
+        """Cancel work that is no longer needed (a running call finishes and is ignored)"""
+        future.cancel()
+        with self._lock:
+            self.discarded += 1
+        metrics.inc('speculative_work_total', kind=kind, outcome='discarded')
+    
+    def discard(self, session_id: str):
+        """Drop all of a session's outstanding work"""
+        with self._lock:
+            work = self._work.pop(session_id, {})
+        for kind, (_, future) in work.items():
+            self.drop(kind[0], future)
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'sessions': len(self._work),
+                'started': self.started,
+                'used': self.used,
+                'discarded': self.discarded
+            }
+
+speculation = Speculator()
+
+def speculate_draws(session_id: str, session: dict):
+    """Prepare the next question draws (current and escalated difficulty) while the candidate answers"""
+    if not speculation.enabled or not session.get('role'):
+        return
+    used_questions = list(session['used_questions'])
+    context = used_questions + QuestionBank._recent_answers(session)
+    for difficulty in dict.fromkeys((session.get('difficulty', 'medium'), 'hard')):
+        speculation.start(
+            session_id, ('draw', difficulty), tuple(used_questions), agent.question_bank.prepare_draw,
+            session['role'], difficulty, used_questions, context, session.get('question_bank_version')
+        )
+
+def draw_question(session_id: str, session: dict, difficulty: str) -> str:
+    """Next question for the session, built on the speculative draw when one is ready"""
+    used_questions = session['used_questions']
+    draft = speculation.claim(session_id, ('draw', difficulty), tuple(used_questions))
+    # The draw for the other difficulty is not needed any more
+    speculation.discard(session_id)
+    return agent.question_bank.get_question(session['role'], difficulty, used_questions, session, draft=draft)
+
+async def prepare_chat_turn_async(session_id: str, user_message: str) -> AnswerFeatures:
+    """Do the LLM-bound work of a chat turn without blocking the event loop.
+
+    Warms the evaluation cache for the answer and, when a feedback summary is
+    likely, waits for background scoring. chat_turn() then runs on heuristics
+    and cached evaluations only. Returns the message's features for chat_turn().
+    """
+    features = AnswerFeatures(user_message)
+    session = interview_sessions.get(session_id)
+    if not session or not session.get('role') or not session.get('current_question'):
+        return features
+    
+    # Off-topic requests and skips are not answers, chat_turn() won't score them
+    if user_message and not features.has('skip_commands') and not features.is_off_topic_request:
+        await agent.llm_service.evaluate_answer_async(
+            session['current_question'], user_message, session['role'], features
+        )
+    
+    if features.has('feedback_requests') or answered_count(session) >= 9:
+        await wait_for_evaluations_async(session_id)
+    return features
+
+def _event_record(event: dict) -> dict:
+    """Convert a conversation history entry to an export event"""
+    event_data = {
+        "time": event.get('timestamp'),
+        "speaker": event.get('role'),
+        "text": event.get('content')
+    }
+    
+    # Add evaluation if available
+    if 'eval' in event:
+        event_data['eval'] = event['eval']
+    
+    return event_data
+
+def build_session_document(session_id: str, session: dict) -> dict:
+    """Build the exported session document"""
+    session_data = {
+        "sessionId": session_id,
+        "role": session.get('role'),
+        "mode": "interview",
+        "startedAt": session.get('started_at'),
+        "events": [_event_record(event) for event in session.get('conversation_history', [])],
+        "aggregatedFeedback": {}
+    }
+    
+    # Add aggregated feedback if available
+    if 'aggregated_feedback' in session:
+        session_data['aggregatedFeedback'] = session['aggregated_feedback']
+    
+    return session_data
+
+def _write_session_document(session_id: str, session_data: dict):
+    """Write a session file atomically (temp file + rename)"""
+    started = time.perf_counter()
+    session_file = DATA_DIR / f"{session_id}.json"
+    temp_file = session_file.with_name(f".{session_file.name}.{threading.get_ident()}.tmp")
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(session_data, f, indent=2, ensure_ascii=False)
+    os.replace(temp_file, session_file)
+    catalog.record_file(session_file, session_data)
+    metrics.observe('session_save_duration_seconds', time.perf_counter() - started, mode='file')
+
+@timed_stage('save')
 def save_session(session_id: str, session: dict):
     """Save session to JSON file"""
     try:
-        session_file = DATA_DIR / f"{session_id}.json"
-        
-        # Prepare session data
-        session_data = {
-            "sessionId": session_id,
-            "role": session.get('role'),
-            "mode": "interview",
-            "startedAt": session.get('started_at'),
-            "events": [],
-            "aggregatedFeedback": {}
-        }
+        _write_session_document(session_id, build_session_document(session_id, session))
+    except Exception as e:
+        print(f"Error saving session: {e}")
+
+class SessionCatalog:
+    """SQLite index over the stored session files in DATA_DIR.
+
+    Every session file write records one row (role, start time, answered count,
+    average overall score), and scan() indexes files it hasn't seen or whose
+    mtime/size changed, e.g. files written before the catalog existed, and
+    session journals (<id>.jsonl, preferred over <id>.json like
+    load_session_document does). Other JSON files in the directory are not
+    sessions and are skipped. The first query runs a scan; later queries
+    trigger one in the background at most every rescan_interval seconds.
+    """
+    COLUMNS = 'session_id, role, mode, started_at, answered, average_score'
+    
+    def __init__(self, path: str = CATALOG_DB_PATH, rescan_interval: float = CATALOG_RESCAN_INTERVAL):
+        self.path = path
+        self.rescan_interval = rescan_interval
+        self._local = threading.local()
+        self._scan_lock = threading.Lock()
+        self._scanned_at = {}  # db path -> time.monotonic() of the last completed scan
+    
+    def _db_path(self) -> str:
+        # Follows DATA_DIR unless configured explicitly
+        return str(self.path or DATA_DIR / 'catalog.sqlite3')
+    
+    def _connect(self):
+        """One connection per thread and database"""
+        path = self._db_path()
+        connections = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
+        conn = connections.get(path)
+        if conn is None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, role TEXT, mode TEXT, started_at TEXT, "
+                "answered INTEGER NOT NULL, average_score REAL, "
+                "file_mtime_ns INTEGER NOT NULL, file_size INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_started_at ON sessions (started_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_role ON sessions (role, started_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_score ON sessions (average_score)")
+            connections[path] = conn
+        return _Transaction(conn)
+    
+    @staticmethod
+    def is_session_document(session_data) -> bool:
+        """Whether parsed JSON looks like an exported session (and not e.g. a model file)"""
+        return isinstance(session_data, dict) and isinstance(session_data.get('sessionId'), str) and \
+            isinstance(session_data.get('events', session_data.get('conversation_history')), list)
+    
+    @staticmethod
+    def _row(session_id: str, session_data: dict, stat) -> tuple:
+        scores = [
+            event['eval']['overall'] for event in session_data.get('events', [])
+            if isinstance(event.get('eval'), dict) and isinstance(event['eval'].get('overall'), (int, float))
+        ]
+        average = round(sum(scores) / len(scores), 2) if scores else None
+        return (session_id, session_data.get('role'), session_data.get('mode'), session_data.get('startedAt'),
+                len(scores), average, stat.st_mtime_ns, stat.st_size)
+    
+    def record_file(self, session_file: Path, session_data: dict):
+        """Index a session file that was just written"""
+        if not self.is_session_document(session_data):
+            return
+        try:
+            row = self._row(session_file.stem, session_data, session_file.stat())
+            with self._connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row)
+        except Exception as e:
+            print(f"Error updating session catalog: {e}")
+    
+    def scan(self) -> dict:
+        """Index new and changed session files and drop rows for deleted ones"""
+        with self._scan_lock:
+            db_path = self._db_path()
+            with self._connect() as conn:
+                known = {
+                    session_id: (mtime_ns, size)
+                    for session_id, mtime_ns, size in conn.execute(
+                        "SELECT session_id, file_mtime_ns, file_size FROM sessions")
+                }
+            
+            # session_id -> directory entry; a journal holds newer turns than the export file
+            files = {}
+            with os.scandir(DATA_DIR) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.') or not entry.is_file():
+                        continue
+                    if entry.name.endswith('.jsonl'):
+                        files[entry.name[:-len('.jsonl')]] = entry
+                    elif entry.name.endswith('.json'):
+                        files.setdefault(entry.name[:-len('.json')], entry)
+            
+            rows, seen = [], set()
+            for session_id, entry in files.items():
+                stat = entry.stat()
+                if known.get(session_id) == (stat.st_mtime_ns, stat.st_size):
+                    seen.add(session_id)
+                    continue
+                try:
+                    if entry.name.endswith('.jsonl'):
+                        session_data = read_journal(session_id)
+                    else:
+                        with open(entry.path, 'r', encoding='utf-8') as f:
+                            session_data = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"Skipping unreadable session file {entry.name}: {e}")
+                    # Keep any existing row until the file can be read again
+                    seen.add(session_id)
+                    continue
+                if not self.is_session_document(session_data):
+                    continue
+                seen.add(session_id)
+                rows.append(self._row(session_id, session_data, stat))
+            removed = [(session_id,) for session_id in known.keys() - seen]
+            
+            with self._connect() as conn:
+                conn.executemany("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                conn.executemany("DELETE FROM sessions WHERE session_id = ?", removed)
+            self._scanned_at[db_path] = time.monotonic()
+            return {'indexed': len(rows), 'removed': len(removed), 'files': len(seen)}
+    
+    def _ensure_fresh(self):
+        scanned_at = self._scanned_at.get(self._db_path())
+        if scanned_at is None:
+            self.scan()
+        elif time.monotonic() - scanned_at > self.rescan_interval and not self._scan_lock.locked():
+            self._scanned_at[self._db_path()] = time.monotonic()
+            threading.Thread(target=self._background_scan, name='catalog-scan', daemon=True).start()
+    
+    def _background_scan(self):
+        try:
+            self.scan()
+        except Exception as e:
+            print(f"Error scanning session files: {e}")
+    
+    def query(self, role: str = None, since: str = None, until: str = None, min_score: float = None,
+              limit: int = 50, offset: int = 0) -> dict:
+        """One page of catalog entries, newest first.
+
+        since/until are ISO dates or timestamps; a date-only until includes that whole day.
+        """
+        self._ensure_fresh()
+        clauses, params = [], []
+        if role:
+            clauses.append("role = ?")
+            params.append(role)
+        if since:
+            clauses.append("started_at >= ?")
+            params.append(since)
+        if until:
+            if len(until) == 10:
+                clauses.append("started_at < ?")
+                params.append((datetime.fromisoformat(until) + timedelta(days=1)).date().isoformat())
+            else:
+                clauses.append("started_at <= ?")
+                params.append(until)
+        if min_score is not None:
+            clauses.append("average_score >= ?")
+            params.append(min_score)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
         
-        # Convert conversation history to events
-        for event in session.get('conversation_history', []):
-            event_data = {
-                "time": event.get('timestamp'),
-                "speaker": event.get('role'),
-                "text": event.get('content')
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM sessions{where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {self.COLUMNS} FROM sessions{where} "
+                "ORDER BY started_at DESC, session_id DESC LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return {
+            'sessions': [
+                {'sessionId': session_id, 'role': role, 'mode': mode, 'startedAt': started_at,
+                 'answered': answered, 'averageScore': average_score}
+                for session_id, role, mode, started_at, answered, average_score in rows
+            ],
+            'total': total,
+            'limit': limit,
+            'offset': offset
+        }
+
+catalog = SessionCatalog()
+
+class PersistenceWorker:
+    """Write-behind queue for session files.
+
+    schedule() snapshots the session document and returns; a background thread
+    writes it out. Repeated saves of a session that is still queued replace the
+    queued snapshot, and queued sessions are flushed in batches. When the
+    backlog is full, schedule() blocks for up to backpressure_timeout and then
+    writes synchronously. stop() drains the queue; it runs at interpreter exit.
+    """
+    def __init__(self, max_backlog: int = PERSIST_MAX_BACKLOG, batch_size: int = PERSIST_BATCH_SIZE,
+                 flush_interval: float = PERSIST_FLUSH_INTERVAL,
+                 backpressure_timeout: float = PERSIST_BACKPRESSURE_TIMEOUT):
+        self.max_backlog = max_backlog
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.backpressure_timeout = backpressure_timeout
+        self._pending = OrderedDict()  # session_id -> document, oldest first
+        self._inflight = 0
+        self._writing = set()  # session ids in the batch being written
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self.enqueued = 0
+        self.coalesced = 0
+        self.flushed = 0
+        self.batches = 0
+        self.errors = 0
+        self.backpressure_waits = 0
+        self.sync_writes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+    
+    @timed_stage('persist')
+    def schedule(self, session_id: str, session: dict):
+        """Queue a session to be written"""
+        document = build_session_document(session_id, session)
+        with self._cond:
+            if session_id in self._pending:
+                self._pending[session_id] = document
+                self.coalesced += 1
+                return
+            if len(self._pending) >= self.max_backlog and not self._stopping:
+                self.backpressure_waits += 1
+                self._cond.wait_for(
+                    lambda: len(self._pending) < self.max_backlog or self._stopping,
+                    timeout=self.backpressure_timeout
+                )
+            if len(self._pending) < self.max_backlog and not self._stopping:
+                self._pending[session_id] = document
+                self.enqueued += 1
+                self._ensure_started()
+                self._cond.notify_all()
+                return
+            self.sync_writes += 1
+        # Backlog still full (or shutting down): write in the caller
+        self._write(session_id, document)
+    
+    def save_now(self, session_id: str, session: dict) -> bool:
+        """Write a session in the caller, replacing any queued copy (e.g. when it is closed)"""
+        document = build_session_document(session_id, session)
+        with self._cond:
+            self._pending.pop(session_id, None)
+            # An older copy may be in the batch being written; let it land first
+            self._cond.wait_for(lambda: session_id not in self._writing, timeout=self.backpressure_timeout)
+            self.sync_writes += 1
+        return self._write(session_id, document)
+    
+    def drain(self, timeout: float = None) -> bool:
+        """Wait until everything queued has been written; True if the queue emptied"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._inflight, timeout=timeout)
+    
+    def stop(self, timeout: float = 30):
+        """Flush the queue and stop the worker thread"""
+        self.drain(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+    
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'queue_depth': len(self._pending),
+                'in_flight': self._inflight,
+                'enqueued': self.enqueued,
+                'coalesced': self.coalesced,
+                'flushed': self.flushed,
+                'batches': self.batches,
+                'errors': self.errors,
+                'backpressure_waits': self.backpressure_waits,
+                'sync_writes': self.sync_writes,
+                'last_flush_ms': round(self.last_flush_ms, 3),
+                'max_flush_ms': round(self.max_flush_ms, 3),
+                'avg_flush_ms': round(self.total_flush_ms / self.batches, 3) if self.batches else 0.0
             }
+    
+    def _ensure_started(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='persistence', daemon=True)
+            self._thread.start()
+    
+    def _write(self, session_id: str, document: dict) -> bool:
+        try:
+            _write_session_document(session_id, document)
+            return True
+        except Exception as e:
+            print(f"Error saving session: {e}")
+            with self._cond:
+                self.errors += 1
+            return False
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._stopping)
+                if not self._pending:
+                    return
+            if self.flush_interval and not self._stopping:
+                # Give repeated saves of the same session a chance to coalesce
+                time.sleep(self.flush_interval)
+            with self._cond:
+                batch = [self._pending.popitem(last=False) for _ in range(min(self.batch_size, len(self._pending)))]
+                self._inflight = len(batch)
+                self._writing = {session_id for session_id, _ in batch}
+                self._cond.notify_all()
             
-            # Add evaluation if available
-            if 'eval' in event:
-                event_data['eval'] = event['eval']
+            started = time.perf_counter()
+            for session_id, document in batch:
+                self._write(session_id, document)
+            elapsed_ms = (time.perf_counter() - started) * 1000
             
-            session_data['events'].append(event_data)
-        
-        # Add aggregated feedback if available
-        if 'aggregated_feedback' in session:
-            session_data['aggregatedFeedback'] = session['aggregated_feedback']
-        
-        # Write to file
-        with open(session_file, 'w', encoding='utf-8') as f:
-            json.dump(session_data, f, indent=2, ensure_ascii=False)
-        
+            with self._cond:
+                self._inflight = 0
+                self._writing = set()
+                self.flushed += len(batch)
+                self.batches += 1
+                self.last_flush_ms = elapsed_ms
+                self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+                self.total_flush_ms += elapsed_ms
+                self._cond.notify_all()
+
+persistence = PersistenceWorker()
+atexit.register(persistence.stop)
+
+def persist_session(session_id: str, session: dict):
+    """Persist a session off the request path (journal append or write-behind save)"""
+    if SESSION_JOURNAL:
+        append_journal(session_id, session)
+    else:
+        persistence.schedule(session_id, session)
+
+# Journal mode: one JSONL record per turn, so every write is constant-size.
+# Records are the export header ({"sessionId", "role", "mode", "startedAt"}),
+# export events ({"time", "speaker", "text"[, "eval"]}), late evaluations
+# ({"turn", "eval"}) and the feedback summary ({"aggregatedFeedback"}).
+journal_lock = threading.Lock()
+
+def _journal_file(session_id: str) -> Path:
+    return DATA_DIR / f"{session_id}.jsonl"
+
+def _append_journal_records(session_id: str, records: list):
+    started = time.perf_counter()
+    with open(_journal_file(session_id), 'a', encoding='utf-8') as f:
+        f.write(''.join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+    metrics.observe('session_save_duration_seconds', time.perf_counter() - started, mode='journal')
+
+@timed_stage('persist')
+def append_journal(session_id: str, session: dict):
+    """Append the turns recorded since the last call to the session journal"""
+    try:
+        with journal_lock:
+            history = session.get('conversation_history', [])
+            start = session.get('journaled_turns', 0)
+            records = []
+            if start == 0 or session.get('journaled_role') != session.get('role'):
+                records.append({
+                    "sessionId": session_id,
+                    "role": session.get('role'),
+                    "mode": "interview",
+                    "startedAt": session.get('started_at')
+                })
+                session['journaled_role'] = session.get('role')
+            records.extend(_event_record(event) for event in history[start:])
+            
+            feedback = session.get('aggregated_feedback') or {}
+            if feedback.get('summary') and not session.get('journaled_feedback'):
+                records.append({"aggregatedFeedback": feedback})
+                session['journaled_feedback'] = True
+            
+            if records:
+                _append_journal_records(session_id, records)
+            session['journaled_turns'] = len(history)
     except Exception as e:
-        print(f"Error saving session: {e}")
+        print(f"Error appending to session journal: {e}")
+
+def append_journal_eval(session_id: str, session: dict, turn_index: int, eval_data: dict):
+    """Journal an evaluation that arrived after its turn was written"""
+    try:
+        with journal_lock:
+            if turn_index < session.get('journaled_turns', 0):
+                _append_journal_records(session_id, [{"turn": turn_index, "eval": eval_data}])
+    except Exception as e:
+        print(f"Error appending to session journal: {e}")
+
+def read_journal(session_id: str):
+    """Fold a session journal into the export document, or None if there is no journal"""
+    journal_file = _journal_file(session_id)
+    if not journal_file.exists():
+        return None
+    
+    session_data = {
+        "sessionId": session_id,
+        "role": None,
+        "mode": "interview",
+        "startedAt": None,
+        "events": [],
+        "aggregatedFeedback": {}
+    }
+    with open(journal_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Torn final line from a crash mid-write
+                continue
+            if 'speaker' in record:
+                session_data['events'].append(record)
+            elif 'turn' in record:
+                if record['turn'] < len(session_data['events']):
+                    session_data['events'][record['turn']]['eval'] = record['eval']
+            elif 'aggregatedFeedback' in record:
+                session_data['aggregatedFeedback'] = record['aggregatedFeedback']
+            elif 'sessionId' in record:
+                session_data.update({key: record[key] for key in ('role', 'mode', 'startedAt') if key in record})
+    return session_data
+
+def compact_journal(session_id: str, session: dict = None):
+    """Rewrite a session journal as the regular export file and remove the journal"""
+    try:
+        if session is not None:
+            append_journal(session_id, session)
+        with journal_lock:
+            session_data = read_journal(session_id)
+            if session_data is None:
+                return
+            _write_session_document(session_id, session_data)
+            _journal_file(session_id).unlink()
+            if session is not None:
+                # Later turns start a fresh journal from the full history
+                session['journaled_turns'] = 0
+                session['journaled_feedback'] = False
+    except Exception as e:
+        print(f"Error compacting session journal: {e}")
+
+def load_session_document(session_id: str):
+    """Stored session document (journal or export file), or None"""
+    session_data = read_journal(session_id)
+    if session_data is not None:
+        return session_data
+    session_file = DATA_DIR / f"{session_id}.json"
+    if session_file.exists():
+        with open(session_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return None
+
+class SessionDocument:
+    """A serialized session document with its HTTP validators"""
+    def __init__(self, body: bytes, etag: str, last_modified: float = None):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+
+class SessionDocumentCache:
+    """LRU of serialized session files for GET /api/session/<id>.
+
+    Entries are keyed by session id and validated against the backing file's
+    name, mtime and size, so a rewritten or appended file is re-read on the
+    next request and an unchanged one is never parsed twice.
+    """
+    def __init__(self, max_size: int = SESSION_DOC_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # session_id -> (validator, SessionDocument)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, session_id: str):
+        """Serialized stored document, or None if the session has no file"""
+        validator = self._validator(session_id)
+        if validator is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and entry[0] == validator:
+                self._entries.move_to_end(session_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        
+        session_data = load_session_document(session_id)
+        if session_data is None:
+            return None
+        body = json.dumps(session_data, ensure_ascii=False).encode('utf-8')
+        _, mtime_ns, size = validator
+        document = SessionDocument(body, f"{mtime_ns:x}-{size:x}", mtime_ns / 1e9)
+        with self._lock:
+            self._entries[session_id] = (validator, document)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return document
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+    
+    def _validator(self, session_id: str):
+        # A journal takes precedence over the export file, as in load_session_document
+        for session_file in (_journal_file(session_id), DATA_DIR / f"{session_id}.json"):
+            try:
+                stat = session_file.stat()
+            except FileNotFoundError:
+                continue
+            return (session_file.name, stat.st_mtime_ns, stat.st_size)
+        return None
+
+session_documents = SessionDocumentCache()
+
+def _live_session_document(session_id: str, session: dict) -> SessionDocument:
+    """Serialize a live session. Background evals change it without a new turn, often
+    within the same second, so it is validated by ETag only and has no Last-Modified."""
+    body = json.dumps(build_session_document(session_id, session), ensure_ascii=False).encode('utf-8')
+    return SessionDocument(body, hashlib.sha1(body).hexdigest())
+
+def get_session_document(session_id: str):
+    """Serialized session for GET /api/session/<id>: live sessions from memory, others from disk"""
+    session = interview_sessions.peek(session_id)
+    if session is not None:
+        return _live_session_document(session_id, session)
+    return session_documents.get(session_id)
+
+def close_session(session_id: str, session: dict):
+    """Write the final session file and drop the live session.
+
+    The file is written before the session leaves the store, so GET
+    /api/session/<id> keeps working straight after a reset.
+    """
+    session = interview_sessions.get(session_id) or session
+    speculation.discard(session_id)
+    if SESSION_JOURNAL:
+        compact_journal(session_id, session)
+    else:
+        persistence.save_now(session_id, session)
+    interview_sessions.delete(session_id)
+
+@timed_stage('commit')
+def commit_turn(session_id: str, session: dict):
+    """Store the session after a turn and, in journal mode, append the turn to disk"""
+    interview_sessions.put(session_id, session)
+    if SESSION_JOURNAL:
+        append_journal(session_id, session)
 
 # Initialize agent
 agent = InterviewAgent()
@@ -462,16 +3155,77 @@ def chat():
     user_message = data.get('message', '').strip()
     session_id = data.get('session_id', 'default')
     
+    timer = RequestTimer('chat', session_id=session_id)
+    with request_timing(timer, should_profile(request.headers.get('X-Profile'))):
+        payload, response_parts = chat_turn(session_id, user_message)
+        # Feedback summaries are generated while the parts are consumed
+        with timed_stage('respond'):
+            payload['response'] = ''.join(response_parts)
+    response = jsonify(payload)
+    response.headers.update(timer.headers())
+    return response
+
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """Streaming variant of /api/chat using Server-Sent Events.
+
+    Emits 'token' events carrying response text as it becomes available and a
+    final 'done' event with the same metadata /api/chat returns.
+    """
+    data = request.json
+    user_message = data.get('message', '').strip()
+    session_id = data.get('session_id', 'default')
+    
+    # Timings cover the work done before the first token; the header goes out with it
+    timer = RequestTimer('chat_stream', session_id=session_id)
+    with request_timing(timer, should_profile(request.headers.get('X-Profile'))):
+        payload, response_parts = chat_turn(session_id, user_message)
+    
+    def events():
+        for part in response_parts:
+            yield format_sse('token', {'text': part})
+        yield format_sse('done', payload)
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no', **timer.headers()}
+    )
+
+def format_sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _debug_payload(payload: dict, features: AnswerFeatures) -> dict:
+    """Attach the turn's answer features to a response when CHAT_DEBUG is on"""
+    if CHAT_DEBUG:
+        payload['features'] = features.to_dict()
+    return payload
+
+def chat_turn(session_id: str, user_message: str, features: AnswerFeatures = None):
+    """Process one chat message.
+
+    Returns (payload, response_parts): payload is the JSON response metadata and
+    response_parts is an iterable of response text chunks. Feedback summaries
+    are produced lazily so each section is sent as soon as its evaluation is
+    ready; the turn is recorded in the session once the parts are consumed.
+    features may be passed in when the caller already computed them.
+    """
+    if features is None:
+        with timed_stage('features'):
+            features = AnswerFeatures(user_message)
+    
     # Handle empty message (silent user)
     if not user_message:
-        return jsonify({
-            'response': "I'm here to help you practice for interviews. Please type a message to continue, or select a role to begin.",
-            'session_id': session_id
-        })
+        return _debug_payload({'session_id': session_id}, features), [
+            "I'm here to help you practice for interviews. Please type a message to continue, or select a role to begin."
+        ]
     
     # Initialize or get session
-    if session_id not in interview_sessions:
-        interview_sessions[session_id] = {
+    with timed_stage('session_load'):
+        session = interview_sessions.get(session_id)
+    if session is None:
+        session = {
             'role': None,
             'difficulty': 'medium',
             'current_question': None,
@@ -483,28 +3237,10 @@ def chat():
             'aggregated_feedback': {}
         }
     
-    session = interview_sessions[session_id]
-    
-    user_lower = user_message.lower()
-    
     # Enhanced off-topic detection - check before processing
     if session.get('role') and session.get('current_question'):
-        off_topic_patterns = [
-            'what is the weather', 'what time is it', 'what is the date', 'what day is it',
-            'can you write', 'can you create', 'write me a resume', 'create a resume',
-            'what is 2+2', 'calculate', 'tell me a joke', 'joke',
-            'how are you', 'what can you do', 'what are your capabilities',
-            'who are you', 'what is your name', 'where are you from'
-        ]
-        interview_keywords = ['interview', 'question', 'answer', 'role', 'engineer', 'software', 
-                            'sales', 'retail', 'customer', 'code', 'project', 'experience', 
-                            'work', 'job', 'position', 'company', 'team']
-        
-        is_off_topic = any(pattern in user_lower for pattern in off_topic_patterns)
-        has_interview_context = any(keyword in user_lower for keyword in interview_keywords)
-        
         # Check if it's clearly off-topic and not related to interview
-        if is_off_topic and not has_interview_context:
+        if features.is_off_topic_request:
             current_q = session.get('current_question', 'Please answer the interview question.')
             response = f"I'm here to help you practice for interviews. Let's focus on that.\n\n{current_q}"
             session['conversation_history'].append({
@@ -517,12 +3253,12 @@ def chat():
                 'content': response,
                 'timestamp': datetime.now().isoformat()
             })
-            return jsonify({
-                'response': response,
+            commit_turn(session_id, session)
+            return _debug_payload({
                 'session_id': session_id,
                 'role': session['role'],
                 'question_number': len(session['used_questions'])
-            })
+            }, features), [response]
     
     # Add user message to history
     session['conversation_history'].append({
@@ -533,33 +3269,30 @@ def chat():
     
     # Determine role if not set
     if not session['role']:
-        if 'engineer' in user_lower or 'software' in user_lower:
-            session['role'] = 'engineer'
-        elif 'sales' in user_lower:
-            session['role'] = 'sales'
-        elif 'retail' in user_lower:
-            session['role'] = 'retail'
-        else:
+        session['role'] = features.selected_role()
+        if not session['role']:
             response = "I'm here to help you practice for job interviews. Which role would you like to practice for?\n\n• Software Engineer\n• Sales Representative\n• Retail Associate\n\nType the role name to get started."
             session['conversation_history'].append({
                 'role': 'assistant',
                 'content': response,
                 'timestamp': datetime.now().isoformat()
             })
-            return jsonify({
-                'response': response,
+            commit_turn(session_id, session)
+            return _debug_payload({
                 'session_id': session_id,
                 'role': None
-            })
+            }, features), [response]
     
     # Generate response based on interview state
     role = session['role']
     difficulty = session.get('difficulty', 'medium')
+    # Set when the response is the feedback summary; the summary is streamed after this prefix
+    summary_prefix = None
     
     # Check if we need to ask a new question
     if not session.get('current_question'):
         # Get new question from bank
-        question = agent.question_bank.get_question(role, difficulty, session['used_questions'])
+        question = draw_question(session_id, session, difficulty)
         session['current_question'] = question
         session['used_questions'].append(question)
         session['questions_asked'].append({
@@ -573,11 +3306,11 @@ def chat():
         current_question = session['current_question']
         
         # Check if user wants to skip
-        if any(word in user_lower for word in ['next', 'skip', 'move on', 'done']):
+        if features.has('skip_commands'):
             # Move to next question
             session['current_question'] = None
             if len(session['used_questions']) < 10:  # Limit questions
-                question = agent.question_bank.get_question(role, difficulty, session['used_questions'])
+                question = draw_question(session_id, session, difficulty)
                 session['current_question'] = question
                 session['used_questions'].append(question)
                 session['questions_asked'].append({
@@ -591,29 +3324,27 @@ def chat():
         else:
             # User provided an answer, decide on follow-up
             should_followup, followup_question = agent.decide_followup(
-                user_message, current_question, role, session
+                user_message, current_question, role, session, features
             )
             
-            # Update question record with answer
-            for qa in session['questions_asked']:
+            # Link the question record to this answer turn (the current question is the latest record)
+            for question_index in range(len(session['questions_asked']) - 1, -1, -1):
+                qa = session['questions_asked'][question_index]
                 if qa['question'] == current_question and qa['user_response'] is None:
-                    qa['user_response'] = user_message
-                    qa['timestamp'] = datetime.now().isoformat()
+                    record_answer(session, question_index, len(session['conversation_history']) - 1)
                     break
             
-            # Evaluate answer
-            try:
-                eval_result = agent.llm_service.evaluate_answer(current_question, user_message, role)
-                # Store evaluation in conversation history
-                session['conversation_history'][-1]['eval'] = eval_result
-            except Exception as e:
-                print(f"Evaluation error: {e}")
+            # Evaluate answer in the background; the eval is attached to the turn when ready
+            submit_evaluation(
+                session_id, session, len(session['conversation_history']) - 1,
+                current_question, user_message, role, features
+            )
             
             if should_followup and followup_question:
                 response = followup_question
             elif followup_question is None and difficulty == 'hard':
                 # Difficulty escalated, ask hard question
-                question = agent.question_bank.get_question(role, 'hard', session['used_questions'])
+                question = draw_question(session_id, session, 'hard')
                 session['current_question'] = question
                 session['used_questions'].append(question)
                 session['questions_asked'].append({
@@ -626,10 +3357,8 @@ def chat():
                 # Move to next question
                 session['current_question'] = None
                 # Count questions with answers (not just asked)
-                questions_with_answers = len([qa for qa in session['questions_asked'] if qa.get('user_response')])
-                
-                if questions_with_answers < 10:
-                    question = agent.question_bank.get_question(role, difficulty, session['used_questions'])
+                if answered_count(session) < 10:
+                    question = draw_question(session_id, session, difficulty)
                     session['current_question'] = question
                     session['used_questions'].append(question)
                     session['questions_asked'].append({
@@ -640,35 +3369,15 @@ def chat():
                     response = question
                 else:
                     # Automatically provide feedback after 10 questions
-                    feedback_summary = generate_feedback_summary(session)
-                    session['aggregated_feedback'] = {
-                        'generated_at': datetime.now().isoformat(),
-                        'summary': feedback_summary
-                    }
-                    response = f"Great job! You've completed 10 interview questions.\n\n{feedback_summary}"
+                    summary_prefix = "Great job! You've completed 10 interview questions.\n\n"
     
     # Handle feedback request (if not already provided)
-    if ('feedback' in user_lower or 'summary' in user_lower) and not session.get('aggregated_feedback'):
-        response = generate_feedback_summary(session)
-        session['aggregated_feedback'] = {
-            'generated_at': datetime.now().isoformat(),
-            'summary': response
-        }
-    
-    # Add assistant response to history
-    session['conversation_history'].append({
-        'role': 'assistant',
-        'content': response,
-        'timestamp': datetime.now().isoformat()
-    })
-    
-    # Save session periodically
-    if len(session['conversation_history']) % 5 == 0:
-        save_session(session_id, session)
+    if summary_prefix is None and features.has('feedback_requests') and not session.get('aggregated_feedback'):
+        summary_prefix = ""
     
     # Calculate total questions (target is 10) and current question number
     total_questions = 10
-    questions_with_answers = len([qa for qa in session['questions_asked'] if qa.get('user_response')])
+    questions_with_answers = answered_count(session)
     
     # If we have a current question that hasn't been answered yet, show that number
     if session.get('current_question'):
@@ -677,19 +3386,97 @@ def chat():
         # No current question means we're between questions or done
         current_question_num = questions_with_answers
     
-    return jsonify({
-        'response': response,
+    payload = {
         'session_id': session_id,
         'role': session['role'],
         'difficulty': session.get('difficulty', 'medium'),
         'question_number': current_question_num,
-        'total_questions': total_questions
-    })
+        'total_questions': total_questions,
+        'pending_evals': get_pending_turns(session_id)
+    }
+    _debug_payload(payload, features)
+    
+    if summary_prefix is None:
+        if session.get('current_question'):
+            speculate_draws(session_id, session)
+        return payload, _finish_turn(session_id, session, [response])
+    
+    # No more questions are drawn for this interview
+    speculation.discard(session_id)
+    # Mark feedback as in progress so a concurrent request doesn't start a second summary
+    session['aggregated_feedback'] = {'generated_at': datetime.now().isoformat(), 'summary': None}
+    interview_sessions.put(session_id, session)
+    return payload, _finish_turn(
+        session_id, session, iter_feedback_summary(session, session_id), summary_prefix=summary_prefix
+    )
+
+def _finish_turn(session_id: str, session: dict, parts, summary_prefix=None):
+    """Yield response parts, then record the assistant turn in the session.
+
+    If the consumer stops early (e.g. a streaming client disconnects) the
+    remaining parts are still produced so the session stays complete.
+    """
+    parts = iter(parts)
+    produced = []
+    try:
+        if summary_prefix:
+            yield summary_prefix
+        for part in parts:
+            produced.append(part)
+            yield part
+    finally:
+        produced.extend(parts)
+        response = ''.join(produced)
+        
+        if summary_prefix is not None:
+            session['aggregated_feedback'] = {
+                'generated_at': datetime.now().isoformat(),
+                'summary': response
+            }
+            response = summary_prefix + response
+        
+        # Add assistant response to history
+        session['conversation_history'].append({
+            'role': 'assistant',
+            'content': response,
+            'timestamp': datetime.now().isoformat()
+        })
+        
+        commit_turn(session_id, session)
+        
+        if SESSION_JOURNAL:
+            # Completed interviews are compacted into the regular export file
+            if summary_prefix is not None:
+                compact_journal(session_id, session)
+        # Save session periodically
+        elif len(session['conversation_history']) % 5 == 0:
+            persistence.schedule(session_id, session)
 
-def generate_feedback_summary(session):
+def generate_feedback_summary(session, session_id=None):
     """Generate comprehensive feedback summary"""
+    return ''.join(iter_feedback_summary(session, session_id))
+
+def iter_feedback_summary(session, session_id=None):
+    """Generate the feedback summary line by line.
+
+    Each question's section is yielded as soon as its evaluation is available,
+    waiting on background scoring up to EVAL_WAIT_TIMEOUT overall. Once every
+    answer is scored the rendered summary is cached on the session until the
+    next eval or answer arrives.
+    """
     if not session.get('role') or not session.get('questions_asked'):
-        return "No interview data available for feedback."
+        yield "No interview data available for feedback."
+        return
+    
+    link_answer_turns(session)
+    answered_total = answered_count(session)
+    cached = session.get('feedback_cache')
+    if cached and cached['eval_version'] == session.get('eval_version', 0) and cached['answered'] == answered_total:
+        yield cached['summary']
+        return
+    
+    deadline = time.monotonic() + EVAL_WAIT_TIMEOUT
+    history = session['conversation_history']
     
     role_data = {
         'engineer': 'Software Engineer',
@@ -697,102 +3484,235 @@ def generate_feedback_summary(session):
         'retail': 'Retail Associate'
     }
     
+    parts = []
     role_name = role_data.get(session['role'], session['role'])
-    feedback_parts = [f"Interview Feedback Summary for {role_name} Position"]
-    feedback_parts.append("=" * 50)
-    
-    total_scores = {'communication': 0, 'technical': 0, 'examples': 0}
-    total_overall = 0
-    total_responses = 0
-    
-    # Get all evaluations from conversation history
-    for i, qa in enumerate(session['questions_asked'], 1):
-        if qa.get('user_response'):
-            # Get evaluation from conversation history - match by content
-            eval_data = None
-            user_response = qa['user_response']
-            
-            for event in session['conversation_history']:
-                if event.get('role') == 'user' and event.get('content') == user_response:
-                    eval_data = event.get('eval')
-                    break
+    parts.append(f"Interview Feedback Summary for {role_name} Position")
+    parts.append("\n" + "=" * 50)
+    yield from parts
+    
+    answered = [
+        (i, qa, qa.get('answer_turn'))
+        for i, qa in enumerate(session['questions_asked'], 1) if qa.get('user_response')
+    ]
+    
+    # Answers that have no evaluation and none on the way are scored in one batch request,
+    # started now so sections that are already scored can be sent meanwhile
+    pending = set(get_pending_turns(session_id)) if session_id else set()
+    unscored = [
+        (i, qa, turn_index) for i, qa, turn_index in answered
+        if turn_index is None or ('eval' not in history[turn_index] and turn_index not in pending)
+    ]
+    batch = None
+    if unscored:
+        batch = scoring_pool.submit(
+            agent.llm_service.evaluate_answers_batch,
+            [(qa['question'], qa['user_response']) for _, qa, _ in unscored], session['role']
+        )
+    batch_positions = {i: position for position, (i, _, _) in enumerate(unscored)}
+    
+    # Scores of the answers shown, for answers without a linked turn
+    unlinked_totals = dict.fromkeys(SCORE_DIMENSIONS + ('overall', 'count'), 0)
+    scored = 0
+    for i, qa, turn_index in answered:
+        eval_data = None
+        if i in batch_positions:
+            try:
+                eval_data = batch.result(timeout=max(0, deadline - time.monotonic()))[batch_positions[i]]
+            except Exception as e:
+                print(f"Error waiting for batch evaluation: {e}")
+        else:
+            if session_id:
+                wait_for_turn_evaluation(session_id, turn_index, max(0, deadline - time.monotonic()))
+            eval_data = history[turn_index].get('eval')
             
-            # If not found, try to evaluate now
+            # Still missing (scoring failed or timed out): try to evaluate now
             if not eval_data:
                 try:
-                    eval_data = agent.llm_service.evaluate_answer(qa['question'], user_response, session['role'])
-                except:
+                    eval_data = agent.llm_service.evaluate_answer(qa['question'], qa['user_response'], session['role'])
+                except Exception:
                     pass
+        
+        if eval_data:
+            if turn_index is None:
+                _add_scores(unlinked_totals, eval_data, 1)
+            elif history[turn_index].get('eval') is not eval_data:
+                # Keep what the summary scored on the turn so it counts towards the totals
+                if session_id:
+                    attach_evaluation(session_id, session, turn_index, eval_data)
+                else:
+                    record_turn_eval(session, turn_index, eval_data)
+            scored += 1
+            scores = eval_data.get('scores', {})
+            overall = eval_data.get('overall', 0)
             
-            if eval_data:
-                scores = eval_data.get('scores', {})
-                overall = eval_data.get('overall', 0)
-                
-                total_scores['communication'] += scores.get('communication', 0)
-                total_scores['technical'] += scores.get('technical', 0)
-                total_scores['examples'] += scores.get('examples', 0)
-                total_overall += overall
-                total_responses += 1
-                
-                feedback_parts.append(f"\nQuestion {i}: {qa['question'][:70]}")
-                feedback_parts.append(f"  Communication: {scores.get('communication', 0)}/5")
-                feedback_parts.append(f"  Technical: {scores.get('technical', 0)}/5")
-                feedback_parts.append(f"  Examples: {scores.get('examples', 0)}/5")
-                feedback_parts.append(f"  Overall: {overall}/100")
-                
-                if eval_data.get('feedback') and len(eval_data['feedback']) > 0:
-                    feedback_parts.append("  Feedback:")
-                    for fb in eval_data['feedback']:
-                        feedback_parts.append(f"    • {fb}")
+            section = [
+                f"\n\nQuestion {i}: {qa['question'][:70]}",
+                f"\n  Communication: {scores.get('communication', 0)}/5",
+                f"\n  Technical: {scores.get('technical', 0)}/5",
+                f"\n  Examples: {scores.get('examples', 0)}/5",
+                f"\n  Overall: {overall}/100",
+            ]
+            if eval_data.get('feedback') and len(eval_data['feedback']) > 0:
+                section.append("\n  Feedback:")
+                section.extend(f"\n    • {fb}" for fb in eval_data['feedback'])
+            parts.extend(section)
+            yield from section
+    
+    with score_totals_lock:
+        totals = dict(score_totals(session))
+    for key in SCORE_DIMENSIONS + ('overall', 'count'):
+        totals[key] += unlinked_totals[key]
+    total_responses = totals['count']
     
     if total_responses > 0:
-        avg_scores = {k: v / total_responses for k, v in total_scores.items()}
-        avg_overall = total_overall / total_responses
+        avg_scores = {k: totals[k] / total_responses for k in SCORE_DIMENSIONS}
+        avg_overall = totals['overall'] / total_responses
         
-        feedback_parts.append(f"\n{'=' * 50}")
-        feedback_parts.append("Overall Performance:")
-        feedback_parts.append(f"  Communication: {avg_scores['communication']:.1f}/5")
-        feedback_parts.append(f"  Technical: {avg_scores['technical']:.1f}/5")
-        feedback_parts.append(f"  Examples: {avg_scores['examples']:.1f}/5")
-        feedback_parts.append(f"  Overall Score: {avg_overall:.1f}/100")
-        feedback_parts.append(f"  Questions Answered: {total_responses}/10")
+        section = [
+            f"\n\n{'=' * 50}",
+            "\nOverall Performance:",
+            f"\n  Communication: {avg_scores['communication']:.1f}/5",
+            f"\n  Technical: {avg_scores['technical']:.1f}/5",
+            f"\n  Examples: {avg_scores['examples']:.1f}/5",
+            f"\n  Overall Score: {avg_overall:.1f}/100",
+            f"\n  Questions Answered: {total_responses}/10",
+        ]
         
         # Add performance assessment
         if avg_overall >= 80:
-            feedback_parts.append("\nExcellent performance! You're well-prepared for this role.")
+            section.append("\n\nExcellent performance! You're well-prepared for this role.")
         elif avg_overall >= 60:
-            feedback_parts.append("\nGood performance! Continue practicing to improve further.")
+            section.append("\n\nGood performance! Continue practicing to improve further.")
         else:
-            feedback_parts.append("\nKeep practicing! Focus on providing detailed examples and staying relevant to the role.")
+            section.append("\n\nKeep practicing! Focus on providing detailed examples and staying relevant to the role.")
         
-        feedback_parts.append("\nTips for improvement:")
-        feedback_parts.append("  • Use the STAR method (Situation, Task, Action, Result) for behavioral questions")
-        feedback_parts.append("  • Provide specific examples from your experience")
-        feedback_parts.append("  • Stay relevant to the role you're applying for")
-        feedback_parts.append("  • Practice active listening and ask clarifying questions")
+        section.extend([
+            "\n\nTips for improvement:",
+            "\n  • Use the STAR method (Situation, Task, Action, Result) for behavioral questions",
+            "\n  • Provide specific examples from your experience",
+            "\n  • Stay relevant to the role you're applying for",
+            "\n  • Practice active listening and ask clarifying questions",
+        ])
     else:
-        feedback_parts.append("\nNo answers were evaluated. Please complete some interview questions first.")
+        section = ["\n\nNo answers were evaluated. Please complete some interview questions first."]
+    parts.extend(section)
+    yield from section
     
-    return "\n".join(feedback_parts)
+    # Only a complete summary is reused
+    if scored == len(answered) and not unlinked_totals['count']:
+        session['feedback_cache'] = {
+            'eval_version': session.get('eval_version', 0),
+            'answered': answered_total,
+            'summary': ''.join(parts)
+        }
 
 @app.route('/api/reset', methods=['POST'])
 def reset():
     data = request.json
     session_id = data.get('session_id', 'default')
-    if session_id in interview_sessions:
-        # Save before deleting
-        save_session(session_id, interview_sessions[session_id])
-        del interview_sessions[session_id]
+    session = interview_sessions.get(session_id)
+    if session is not None:
+        # Save before deleting, including any evaluations still in flight
+        wait_for_evaluations(session_id)
+        close_session(session_id, session)
     return jsonify({'status': 'reset'})
 
+@app.route('/api/sessions', methods=['GET'])
+def list_sessions():
+    """Query stored sessions by role, start date and average score"""
+    args = request.args
+    try:
+        limit = min(max(int(args.get('limit', 50)), 1), CATALOG_MAX_PAGE)
+        offset = max(int(args.get('offset', 0)), 0)
+        min_score = float(args['min_score']) if args.get('min_score') else None
+        until = args.get('to')
+        if until and len(until) == 10:
+            datetime.fromisoformat(until)
+    except ValueError:
+        return jsonify({'error': 'Invalid query parameter'}), 400
+    
+    return jsonify(catalog.query(
+        role=args.get('role'),
+        since=args.get('from'),
+        until=until,
+        min_score=min_score,
+        limit=limit,
+        offset=offset
+    ))
+
 @app.route('/api/session/<session_id>', methods=['GET'])
 def get_session(session_id):
-    """Get session data"""
-    session_file = DATA_DIR / f"{session_id}.json"
-    if session_file.exists():
-        with open(session_file, 'r', encoding='utf-8') as f:
-            return jsonify(json.load(f))
-    return jsonify({'error': 'Session not found'}), 404
+    """Get session data (conditional on ETag / Last-Modified)"""
+    document = get_session_document(session_id)
+    if document is None:
+        return jsonify({'error': 'Session not found'}), 404
+    
+    response = Response(document.body, mimetype='application/json')
+    response.set_etag(document.etag)
+    if document.last_modified is not None:
+        response.last_modified = document.last_modified
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+def _runtime_metrics() -> list:
+    """Gauges read from the live objects at scrape time"""
+    with pending_evaluations_lock:
+        pending = sum(len(turns) for turns in pending_evaluations.values())
+    persist = persistence.stats()
+    circuit = gemini_circuit.stats()
+    limiter = gemini_rate_limiter.stats()
+    return [
+        ('sessions_live', 'gauge', 'Interview sessions in the session store',
+         [({}, interview_sessions.stats().get('live', 0))]),
+        ('evaluations_pending', 'gauge', 'Answers being scored in the background', [({}, pending)]),
+        ('persistence_queue_depth', 'gauge', 'Sessions waiting for the write-behind worker',
+         [({}, persist['queue_depth'])]),
+        ('persistence_errors_total', 'counter', 'Failed session file writes', [({}, persist['errors'])]),
+        ('evaluation_cache_requests_total', 'counter', 'Evaluation cache lookups by result',
+         [({'result': 'hit'}, evaluation_cache.hits), ({'result': 'miss'}, evaluation_cache.misses)]),
+        ('llm_circuit_state', 'gauge', 'Gemini circuit breaker state (1 for the current state)',
+         [({'state': state}, int(circuit['state'] == state))
+          for state in (CircuitBreaker.CLOSED, CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN)]),
+        ('llm_circuit_opened_total', 'counter', 'Times the circuit breaker opened', [({}, circuit['opened'])]),
+        ('llm_rate_limit_delay_seconds_total', 'counter', 'Time callers waited for the shared rate limiter',
+         [({}, limiter['delay_seconds'])]),
+    ]
+
+metrics.add_collector(_runtime_metrics)
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus text exposition of the counters and histograms above"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    """Runtime counters"""
+    return jsonify({
+        'sessions': interview_sessions.stats(),
+        'persistence': persistence.stats(),
+        'session_documents': session_documents.stats(),
+        'llm': agent.llm_service.stats(),
+        'speculation': speculation.stats()
+    })
+
+@app.route('/api/session/<session_id>/evals', methods=['GET'])
+def get_session_evals(session_id):
+    """Get evaluations for a live session, including which turns are still being scored"""
+    session = interview_sessions.get(session_id)
+    if session is None:
+        return jsonify({'error': 'Session not found'}), 404
+    
+    evals = [
+        {'turn': index, 'text': event.get('content'), 'eval': event['eval']}
+        for index, event in enumerate(session['conversation_history'])
+        if 'eval' in event
+    ]
+    return jsonify({
+        'session_id': session_id,
+        'evals': evals,
+        'pending_evals': get_pending_turns(session_id)
+    })
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
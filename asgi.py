@@ -0,0 +1,139 @@
+"""
+ASGI entry point for Interview Practice Partner
+Serves /api/chat, /api/reset and /api/session/<id> with async handlers so a slow
+Gemini call doesn't hold a worker thread; all other routes fall through to Flask.
+
+Run with: uvicorn asgi:application --host 0.0.0.0 --port 5000
+"""
+import asyncio
+import json
+import re
+from email.utils import formatdate, parsedate_to_datetime
+
+from asgiref.wsgi import WsgiToAsgi
+
+import app as interview_app
+
+flask_application = WsgiToAsgi(interview_app.app)
+
+SESSION_PATH = re.compile(r'^/api/session/([^/]+)$')
+
+async def read_json(receive) -> dict:
+    """Read and decode a JSON request body"""
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    try:
+        return json.loads(body or b'{}')
+    except ValueError:
+        return {}
+
+async def send_json(send, data, status: int = 200, headers: dict = None):
+    """Send a JSON response, with any extra headers"""
+    body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            (b'access-control-allow-origin', b'*'),
+        ] + [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in (headers or {}).items()],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+async def chat(scope, receive, send):
+    data = await read_json(receive)
+    user_message = data.get('message', '').strip()
+    session_id = data.get('session_id', 'default')
+    
+    timer = interview_app.RequestTimer('chat', session_id=session_id)
+    profile = interview_app.should_profile(request_header(scope, b'x-profile'))
+    
+    # LLM work happens here, on the event loop, bounded by the Gemini semaphore
+    with timer.stage('prepare'):
+        features = await interview_app.prepare_chat_turn_async(session_id, user_message)
+    
+    def run_turn():
+        # The profile (if any) covers the synchronous part of the turn
+        with interview_app.request_timing(timer, profile):
+            payload, response_parts = interview_app.chat_turn(session_id, user_message, features)
+            with interview_app.timed_stage('respond'):
+                payload['response'] = ''.join(response_parts)
+        return payload
+    
+    payload = await asyncio.get_running_loop().run_in_executor(None, run_turn)
+    await send_json(send, payload, headers=timer.headers())
+
+async def reset(scope, receive, send):
+    data = await read_json(receive)
+    session_id = data.get('session_id', 'default')
+    session = interview_app.interview_sessions.get(session_id)
+    if session is not None:
+        # Save before deleting, including any evaluations still in flight
+        await interview_app.wait_for_evaluations_async(session_id)
+        await asyncio.get_running_loop().run_in_executor(None, interview_app.close_session, session_id, session)
+    await send_json(send, {'status': 'reset'})
+
+def request_header(scope, name: bytes) -> str:
+    for key, value in scope.get('headers', []):
+        if key.lower() == name:
+            return value.decode('latin-1')
+    return None
+
+def is_not_modified(scope, document) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since against a session document"""
+    if_none_match = request_header(scope, b'if-none-match')
+    if if_none_match is not None:
+        tags = [re.sub(r'^W/', '', tag.strip()).strip('"') for tag in if_none_match.split(',')]
+        return '*' in tags or document.etag in tags
+    if_modified_since = request_header(scope, b'if-modified-since')
+    if if_modified_since and document.last_modified is not None:
+        try:
+            return int(document.last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+async def get_session(scope, receive, send, session_id):
+    """Get session data (conditional on ETag / Last-Modified)"""
+    loop = asyncio.get_running_loop()
+    document = await loop.run_in_executor(None, interview_app.get_session_document, session_id)
+    if document is None:
+        await send_json(send, {'error': 'Session not found'}, status=404)
+        return
+    
+    headers = [
+        (b'etag', f'"{document.etag}"'.encode()),
+        (b'cache-control', b'no-cache'),
+        (b'access-control-allow-origin', b'*'),
+    ]
+    if document.last_modified is not None:
+        headers.append((b'last-modified', formatdate(document.last_modified, usegmt=True).encode()))
+    
+    if is_not_modified(scope, document):
+        await send({'type': 'http.response.start', 'status': 304, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+    
+    headers.extend([
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(document.body)).encode()),
+    ])
+    await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': document.body})
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http':
+        method, path = scope['method'], scope['path']
+        if method == 'POST' and path == '/api/chat':
+            return await chat(scope, receive, send)
+        if method == 'POST' and path == '/api/reset':
+            return await reset(scope, receive, send)
+        match = SESSION_PATH.match(path)
+        if method == 'GET' and match:
+            return await get_session(scope, receive, send, match.group(1))
+    await flask_application(scope, receive, send)
@@ -40,6 +40,11 @@ IMPORTANT: Only evaluate answers that are relevant to the interview. If the answ
 
 Return ONLY valid JSON matching this schema: {{"scores":{{"communication":0,"technical":0,"examples":0}},"overall":0,"should_followup":false,"followup_question":"","feedback":["item1","item2"]}}. Be concise; do not include any extra text."""
 
+# Batch evaluation wraps EVALUATION_PROMPT, so both score with the same rubric
+BATCH_EVALUATION_INTRO = """You are given several numbered question/answer pairs from one interview. Evaluate each answer on its own, following these instructions for every answer:"""
+
+BATCH_EVALUATION_OUTPUT = """For this batch, instead of a single JSON object return ONLY a valid JSON array with exactly one object per answer, in order. Each object matches the schema above with an added "index" field holding the answer number, e.g. {"index":1,"scores":{...},...}. Do not include any extra text."""
+
 def get_question_prompt(role: str) -> str:
     """Get formatted question generation prompt"""
     return QUESTION_GENERATION_PROMPT.format(role=role)
@@ -56,3 +61,20 @@ Candidate Answer: {answer}
 
 Evaluate the answer and return JSON only."""
 
+def get_batch_evaluation_prompt() -> str:
+    """Get batch evaluation prompt (the single-answer prompt plus batch input and output instructions)"""
+    return f"{BATCH_EVALUATION_INTRO}\n\n{get_evaluation_prompt()}\n\n{BATCH_EVALUATION_OUTPUT}"
+
+def format_batch_evaluation_context(items: list, role: str) -> str:
+    """Format numbered (question, answer) pairs for batch evaluation"""
+    pairs = "\n\n".join(
+        f"""Answer {number}
+Question: {question}
+Candidate Answer: {answer}"""
+        for number, (question, answer) in enumerate(items, 1)
+    )
+    return f"""Role: {role}
+
+{pairs}
+
+Evaluate all {len(items)} answers and return a JSON array only."""
@@ -0,0 +1,177 @@
+"""
+End-to-end load test for Interview Practice Partner
+Replays the user turns recorded in data/session_*.json against a running app,
+many transcripts at once, and writes a JSON report of throughput, per-branch
+turn latency percentiles and error rates that can be diffed between releases.
+
+Run with: python loadTest.py --url http://127.0.0.1:5000 --sessions 50 --concurrency 10 --output report.json
+"""
+import argparse
+import json
+import math
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import requests
+
+BRANCHES = ['role_selection', 'new_question', 'followup', 'feedback', 'other']
+
+def load_transcripts(data_dir: Path) -> list:
+    """User turns of every recorded session, one list of messages per session"""
+    transcripts = []
+    for session_file in sorted(data_dir.glob('session_*.json')):
+        with open(session_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        turns = [event['text'] for event in data.get('events', [])
+                 if event.get('speaker') == 'user' and event.get('text')]
+        if turns:
+            transcripts.append(turns)
+    return transcripts
+
+def classify_turn(previous: dict, current: dict) -> str:
+    """Which branch of /api/chat produced a response, judged from consecutive responses"""
+    text = current.get('response') or ''
+    if not previous.get('role'):
+        return 'role_selection'
+    if 'Feedback Summary' in text or text.startswith('No interview data'):
+        return 'feedback'
+    if current.get('question_number', 0) > previous.get('question_number', 0):
+        return 'new_question'
+    if current.get('question_number') == previous.get('question_number') and text.endswith('?') \
+            and not text.startswith(("I'm here to help", "Let's focus", "Let's keep", "I didn't quite")):
+        return 'followup'
+    return 'other'
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def latency_summary(values: list) -> dict:
+    values = sorted(values)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'mean': round(sum(values) / len(values), 2),
+        'p50': round(percentile(values, 50), 2),
+        'p95': round(percentile(values, 95), 2),
+        'p99': round(percentile(values, 99), 2),
+        'max': round(values[-1], 2),
+    }
+
+def replay_transcript(base_url: str, session_id: str, turns: list, think_time: float, reset: bool) -> list:
+    """Send one transcript turn by turn; returns a record per turn"""
+    http = requests.Session()
+    records = []
+    previous = {}
+    for message in turns:
+        started = time.perf_counter()
+        record = {'session_id': session_id}
+        try:
+            response = http.post(f"{base_url}/api/chat", json={'message': message, 'session_id': session_id}, timeout=120)
+            record['status'] = response.status_code
+            if response.ok:
+                data = response.json()
+                record['branch'] = classify_turn(previous, data)
+                previous = data
+            else:
+                record['error'] = f"HTTP {response.status_code}"
+        except requests.RequestException as e:
+            record['status'] = None
+            record['error'] = type(e).__name__
+        record['latency_ms'] = (time.perf_counter() - started) * 1000
+        records.append(record)
+        if think_time:
+            time.sleep(think_time)
+
+    if reset:
+        try:
+            http.post(f"{base_url}/api/reset", json={'session_id': session_id}, timeout=120)
+        except requests.RequestException:
+            pass
+    return records
+
+def build_report(records: list, duration: float, config: dict) -> dict:
+    """Aggregate per-turn records into the machine-readable report"""
+    errors = [r for r in records if 'error' in r]
+    error_kinds = {}
+    for r in errors:
+        error_kinds[r['error']] = error_kinds.get(r['error'], 0) + 1
+
+    by_branch = {}
+    for branch in BRANCHES:
+        latencies = [r['latency_ms'] for r in records if r.get('branch') == branch]
+        if latencies:
+            by_branch[branch] = latency_summary(latencies)
+
+    return {
+        'config': config,
+        'duration_s': round(duration, 3),
+        'turns': len(records),
+        'sessions': len({r['session_id'] for r in records}),
+        'throughput_turns_per_s': round(len(records) / duration, 2) if duration else 0.0,
+        'errors': {
+            'count': len(errors),
+            'rate': round(len(errors) / len(records), 4) if records else 0.0,
+            'by_kind': error_kinds,
+        },
+        'latency_ms': {
+            'all': latency_summary([r['latency_ms'] for r in records if 'error' not in r]),
+            'by_branch': by_branch,
+        },
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded transcripts against /api/chat")
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='Base URL of the running app')
+    parser.add_argument('--data-dir', default='data', help='Directory with session_*.json transcripts')
+    parser.add_argument('--sessions', type=int, default=20, help='Number of transcripts to replay (cycles through files)')
+    parser.add_argument('--concurrency', type=int, default=5, help='Transcripts replayed at the same time')
+    parser.add_argument('--think-time', type=float, default=0.0, help='Seconds to pause between turns')
+    parser.add_argument('--no-reset', action='store_true', help="Don't reset sessions when a transcript ends")
+    parser.add_argument('--output', default=None, help='Write the JSON report here (default: stdout)')
+    args = parser.parse_args()
+
+    transcripts = load_transcripts(Path(args.data_dir))
+    if not transcripts:
+        parser.error(f"No transcripts with user turns found in {args.data_dir}")
+
+    run_id = uuid.uuid4().hex[:8]
+    base_url = args.url.rstrip('/')
+    jobs = [(f"loadtest_{run_id}_{i}", transcripts[i % len(transcripts)]) for i in range(args.sessions)]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = pool.map(
+            lambda job: replay_transcript(base_url, job[0], job[1], args.think_time, not args.no_reset), jobs
+        )
+        records = [record for session_records in results for record in session_records]
+    duration = time.perf_counter() - started
+
+    report = build_report(records, duration, {
+        'url': base_url,
+        'sessions': args.sessions,
+        'concurrency': args.concurrency,
+        'think_time': args.think_time,
+        'transcripts': len(transcripts),
+        'run_id': run_id,
+        'started_at': datetime.now().isoformat(),
+    })
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+        print(f"{report['turns']} turns in {report['duration_s']}s "
+              f"({report['throughput_turns_per_s']} turns/s), error rate {report['errors']['rate']:.2%}")
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,282 @@
+"""
+Local stand-in for the Gemini generateContent API
+Used with LLM_BACKEND=mock for offline load testing and regression tests of the
+/api/chat path. Latency, errors, malformed JSON and rate limiting are configurable.
+Static prompt prefixes can be registered once through the cachedContents endpoint
+and referenced by name, as with the real API's context caching.
+
+Run with: python mockGeminiServer.py --latency lognormal --latency-ms 400 --error-rate 0.02
+"""
+import argparse
+import itertools
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+GENERATE_PATH = re.compile(r'^/v1beta/models/[^/:]+:generateContent$')
+CACHED_CONTENTS_PATH = '/v1beta/cachedContents'
+BATCH_ANSWER = re.compile(r'^Answer \d+$', re.MULTILINE)
+
+FOLLOWUP_QUESTIONS = [
+    "Can you walk me through the specific steps you took?",
+    "What was the measurable result of that work?",
+    "How did you handle disagreements within the team?",
+    "What would you do differently if you faced that again?",
+]
+
+class MockGeminiConfig:
+    """Behaviour knobs for the stand-in server"""
+    def __init__(self, latency='lognormal', latency_ms=300.0, latency_spread_ms=150.0,
+                 error_rate=0.0, malformed_rate=0.0, rate_limit_rate=0.0, rps=0.0, seed=None):
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.latency_spread_ms = latency_spread_ms
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rps = rps
+        self.random = random.Random(seed)
+
+    def sample_latency(self) -> float:
+        """Draw one response delay in seconds from the configured distribution"""
+        mean, spread = self.latency_ms, self.latency_spread_ms
+        if self.latency == 'constant':
+            value = mean
+        elif self.latency == 'uniform':
+            value = self.random.uniform(mean - spread, mean + spread)
+        elif self.latency == 'normal':
+            value = self.random.gauss(mean, spread)
+        elif self.latency == 'exponential':
+            value = self.random.expovariate(1.0 / mean) if mean > 0 else 0
+        elif self.latency == 'lognormal':
+            # Parameterized so the distribution's mean and stddev match latency_ms / latency_spread_ms
+            if mean <= 0:
+                value = 0
+            else:
+                sigma2 = math.log(1 + (spread / mean) ** 2)
+                mu = math.log(mean) - sigma2 / 2
+                value = self.random.lognormvariate(mu, sigma2 ** 0.5)
+        else:
+            raise ValueError(f"Unknown latency distribution: {self.latency}")
+        return max(0.0, value) / 1000.0
+
+class QuotaBucket:
+    """Token bucket emulating a requests-per-second quota"""
+    def __init__(self, rps: float):
+        self.rps = rps
+        self.tokens = rps
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        if self.rps <= 0:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rps, self.tokens + (now - self.updated) * self.rps)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+class MockGeminiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config: MockGeminiConfig):
+        super().__init__(address, MockGeminiHandler)
+        self.config = config
+        self.quota = QuotaBucket(config.rps)
+        self.stats_lock = threading.Lock()
+        self.stats = {'requests': 0, 'ok': 0, 'errors': 0, 'malformed': 0, 'rate_limited': 0, 'prompt_bytes': 0,
+                      'cached_contents': 0, 'cache_hits': 0, 'cached_prompt_bytes': 0}
+        # cachedContents/<id> -> (instruction text, expiry time)
+        self.cached_contents = {}
+        self.cached_ids = itertools.count(1)
+
+    def count(self, key: str, amount: int = 1):
+        with self.stats_lock:
+            self.stats[key] += amount
+
+class MockGeminiHandler(BaseHTTPRequestHandler):
+    server_version = 'MockGemini/1.0'
+
+    def log_message(self, format, *args):
+        # Keep load tests quiet
+        pass
+
+    def send_json(self, status: int, data: dict, headers: dict = None):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/stats':
+            with self.server.stats_lock:
+                self.send_json(200, dict(self.server.stats))
+            return
+        self.send_json(404, {'error': {'code': 404, 'message': 'Not found'}})
+
+    @staticmethod
+    def parts_text(content: dict) -> str:
+        return ''.join(part.get('text', '') for part in (content or {}).get('parts', []))
+
+    def create_cached_content(self, raw: bytes):
+        """Store a system instruction; later requests reference it by name"""
+        try:
+            body = json.loads(raw or b'{}')
+            ttl = float(str(body.get('ttl', '3600s')).rstrip('s'))
+        except ValueError:
+            self.send_json(400, {'error': {'code': 400, 'message': 'Invalid JSON payload'}})
+            return
+        server = self.server
+        name = f"cachedContents/{next(server.cached_ids)}"
+        with server.stats_lock:
+            server.cached_contents[name] = (self.parts_text(body.get('systemInstruction')), time.monotonic() + ttl)
+        server.count('cached_contents')
+        self.send_json(200, {'name': name, 'model': body.get('model')})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        raw = self.rfile.read(length)
+        if self.path == CACHED_CONTENTS_PATH:
+            self.create_cached_content(raw)
+            return
+        if not GENERATE_PATH.match(self.path):
+            self.send_json(404, {'error': {'code': 404, 'message': 'Not found'}})
+            return
+
+        server, config = self.server, self.server.config
+        server.count('requests')
+        server.count('prompt_bytes', len(raw))
+
+        try:
+            body = json.loads(raw or b'{}')
+            prompt = ''.join(self.parts_text(content) for content in body.get('contents', []))
+        except ValueError:
+            self.send_json(400, {'error': {'code': 400, 'message': 'Invalid JSON payload'}})
+            return
+
+        # The instruction is part of the model input either way; only a cached one isn't resent
+        cached_tokens = 0
+        if body.get('cachedContent'):
+            with server.stats_lock:
+                cached = server.cached_contents.get(body['cachedContent'])
+            if cached is None or cached[1] < time.monotonic():
+                self.send_json(404, {'error': {'code': 404, 'status': 'NOT_FOUND',
+                                               'message': f"{body['cachedContent']} not found"}})
+                return
+            server.count('cache_hits')
+            server.count('cached_prompt_bytes', len(cached[0].encode('utf-8')))
+            cached_tokens = len(cached[0]) // 4
+            prompt = f"{cached[0]}\n\n{prompt}"
+        elif body.get('systemInstruction'):
+            prompt = f"{self.parts_text(body['systemInstruction'])}\n\n{prompt}"
+
+        # Quota and injected rate limits answer immediately, like the real API
+        if not server.quota.try_acquire() or config.random.random() < config.rate_limit_rate:
+            server.count('rate_limited')
+            self.send_json(429, {'error': {'code': 429, 'status': 'RESOURCE_EXHAUSTED',
+                                           'message': 'Resource has been exhausted (e.g. check quota).'}},
+                           headers={'Retry-After': '1'})
+            return
+
+        time.sleep(config.sample_latency())
+
+        if config.random.random() < config.error_rate:
+            server.count('errors')
+            self.send_json(500, {'error': {'code': 500, 'status': 'INTERNAL', 'message': 'Injected server error'}})
+            return
+
+        if config.random.random() < config.malformed_rate:
+            server.count('malformed')
+            text = self.malformed_text(prompt)
+        else:
+            server.count('ok')
+            text = self.generate_text(prompt)
+
+        self.send_json(200, {
+            'candidates': [{'content': {'role': 'model', 'parts': [{'text': text}]}, 'finishReason': 'STOP'}],
+            'usageMetadata': {'promptTokenCount': len(prompt) // 4, 'candidatesTokenCount': len(text) // 4,
+                              'cachedContentTokenCount': cached_tokens}
+        })
+
+    def generate_text(self, prompt: str) -> str:
+        """Plausible output for the app's prompt kinds"""
+        rng = self.server.config.random
+        if '"index"' in prompt:
+            # Batch evaluation: one object per numbered answer
+            count = len(BATCH_ANSWER.findall(prompt))
+            return json.dumps([dict(self.evaluation(), index=number) for number in range(1, count + 1)])
+        if '"scores"' in prompt:
+            return json.dumps(self.evaluation())
+        return rng.choice(FOLLOWUP_QUESTIONS)
+
+    def evaluation(self) -> dict:
+        rng = self.server.config.random
+        scores = {key: rng.randint(1, 5) for key in ('communication', 'technical', 'examples')}
+        overall = int(sum(scores.values()) / 15 * 100)
+        followup = overall < 40
+        return {
+            'scores': scores,
+            'overall': overall,
+            'should_followup': followup,
+            'followup_question': rng.choice(FOLLOWUP_QUESTIONS) if followup else '',
+            'feedback': ['Clear structure', 'Add a concrete metric']
+        }
+
+    def malformed_text(self, prompt: str) -> str:
+        """Broken output of the kinds real models produce"""
+        valid = self.generate_text(prompt)
+        return self.server.config.random.choice([
+            valid[:len(valid) // 2],                          # truncated
+            '{"scores": {"communication": 4}, "overall": 70}',  # missing fields
+            'Sure! Here is my evaluation of the answer.',     # prose, no JSON
+        ])
+
+def create_server(host: str = '127.0.0.1', port: int = 8765, config: MockGeminiConfig = None) -> MockGeminiServer:
+    """Create (but don't start) a stand-in server; port 0 picks a free port"""
+    return MockGeminiServer((host, port), config or MockGeminiConfig())
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Gemini generateContent API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', default='lognormal',
+                        choices=['constant', 'uniform', 'normal', 'lognormal', 'exponential'])
+    parser.add_argument('--latency-ms', type=float, default=300.0, help='Mean response latency')
+    parser.add_argument('--latency-spread-ms', type=float, default=150.0,
+                        help='Half-width (uniform) or standard deviation (normal, lognormal)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 500')
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help='Fraction of responses with broken JSON')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 429')
+    parser.add_argument('--rps', type=float, default=0.0, help='Quota in requests/second (0 = unlimited)')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    config = MockGeminiConfig(
+        latency=args.latency, latency_ms=args.latency_ms, latency_spread_ms=args.latency_spread_ms,
+        error_rate=args.error_rate, malformed_rate=args.malformed_rate,
+        rate_limit_rate=args.rate_limit_rate, rps=args.rps, seed=args.seed
+    )
+    server = create_server(args.host, args.port, config)
+    print(f"Mock Gemini server listening on http://{args.host}:{server.server_address[1]}")
+    print(f"Start the app with LLM_BACKEND=mock MOCK_LLM_URL=http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
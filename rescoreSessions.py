@@ -0,0 +1,251 @@
+"""
+Offline bulk re-scoring for Interview Practice Partner
+Re-evaluates the answers in stored session files with the current evaluation
+prompt, e.g. after a change to EVALUATION_PROMPT in llmPrompts.py, so score
+distributions can be compared. Session files are read one at a time and never
+modified; rescored copies, a resumable checkpoint and a summary are written to
+a separate output directory.
+
+Run with: python rescoreSessions.py --data-dir data --output-dir rescored --workers 4 --rps 2
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from pathlib import Path
+
+import app as interview_app
+
+CHECKPOINT_FILE = 'checkpoint.jsonl'
+SUMMARY_FILE = 'summary.json'
+
+# Set in each worker process by init_worker()
+llm_service = None
+
+def worker_rate_limiter(rps: float, workers: int):
+    """One worker's share of the --rps cap (rate 0 = unlimited)"""
+    return interview_app.TokenBucket(rate=rps / workers if rps > 0 else 0, burst=1)
+
+def init_worker(backend: str, mock_url: str, rps: float, workers: int):
+    """Give each worker process its own LLM client"""
+    global llm_service
+    if backend == 'mock':
+        llm_backend = interview_app.MockGeminiBackend(mock_url)
+    else:
+        llm_backend = interview_app.create_llm_backend(backend)
+    # Every request a worker sends (batches, per-answer re-sends of a malformed batch and
+    # retries) takes a token from its share, so together the workers stay under --rps
+    llm_service = interview_app.LLMService(llm_backend, rate_limiter=worker_rate_limiter(rps, workers))
+    # Re-scoring measures the LLM prompt, so every answer goes to the LLM
+    llm_service.fast_scorer = None
+
+def scored_answers(document: dict) -> list:
+    """(event index, question, answer) for every evaluated answer in a session document"""
+    answers = []
+    question = None
+    for index, event in enumerate(document.get('events', [])):
+        if event.get('speaker') == 'assistant':
+            question = event.get('text')
+        elif event.get('speaker') == 'user' and 'eval' in event and question:
+            answers.append((index, question, event.get('text') or ''))
+    return answers
+
+def rescore_session(document: dict) -> dict:
+    """Worker: re-evaluate one session document and return the rescored copy"""
+    started = time.perf_counter()
+    answers = scored_answers(document)
+
+    results = llm_service.evaluate_answers_batch(
+        [(question, answer) for _, question, answer in answers], document.get('role')
+    )
+    # Default and heuristic evaluations mean the LLM was unavailable; saving them would
+    # skew the comparison and checkpoint the session, so fail it and let a rerun retry it
+    fallbacks = [eval_data['scorer'] for eval_data in results if 'scorer' in eval_data]
+    if fallbacks:
+        raise RuntimeError(f"{len(fallbacks)} of {len(results)} answers got {fallbacks[0]} scores "
+                           f"instead of LLM scores")
+    before, after = [], []
+    for (index, _, _), eval_data in zip(answers, results):
+        event = document['events'][index]
+        before.append(event['eval'].get('overall', 0))
+        after.append(eval_data.get('overall', 0))
+        event['originalEval'] = event['eval']
+        event['eval'] = eval_data
+    document['rescoredAt'] = datetime.now().isoformat()
+
+    return {
+        'document': document,
+        'before': before,
+        'after': after,
+        'seconds': time.perf_counter() - started
+    }
+
+def load_checkpoint(checkpoint_path: Path) -> dict:
+    """Completed sessions from an earlier run: file name -> checkpoint record"""
+    done = {}
+    if checkpoint_path.exists():
+        with open(checkpoint_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn final line from an interrupted run
+                    continue
+                done[record['file']] = record
+    return done
+
+def write_output(output_dir: Path, file_name: str, document: dict):
+    """Write one rescored document atomically"""
+    target = output_dir / file_name
+    temp_file = target.with_name(f".{file_name}.tmp")
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2, ensure_ascii=False)
+    temp_file.replace(target)
+
+def histogram(scores: list) -> dict:
+    """Counts of overall scores in buckets of 10 ('90' holds 90-100)"""
+    counts = {str(bucket): 0 for bucket in range(0, 100, 10)}
+    for score in scores:
+        counts[str(min(int(score) // 10 * 10, 90))] += 1
+    return counts
+
+def mean(values: list):
+    return round(sum(values) / len(values), 2) if values else None
+
+def build_summary(records: list, duration: float, resumed: int, config: dict, failed: list = ()) -> dict:
+    """Throughput and before/after score distributions over every checkpointed session.
+
+    failed lists the sessions of this run that were not rescored (and not
+    checkpointed); they are retried by the next run.
+    """
+    before = [score for record in records for score in record['before']]
+    after = [score for record in records for score in record['after']]
+    rescored_now = [record for record in records if not record.get('resumed')]
+    answers_now = sum(len(record['after']) for record in rescored_now)
+    return {
+        'config': config,
+        'sessions': len(records),
+        'answers': len(after),
+        'resumed_sessions': resumed,
+        'failed_sessions': len(failed),
+        'failed': sorted(failed),
+        'duration_s': round(duration, 3),
+        'throughput': {
+            'sessions_per_s': round(len(rescored_now) / duration, 3) if duration else 0.0,
+            'answers_per_s': round(answers_now / duration, 3) if duration else 0.0,
+        },
+        'overall': {
+            'before': {'mean': mean(before), 'histogram': histogram(before)},
+            'after': {'mean': mean(after), 'histogram': histogram(after)},
+            'mean_change': round(mean(after) - mean(before), 2) if after else None,
+        },
+    }
+
+def run(data_dir: Path, output_dir: Path, pattern: str = 'session_*.json', workers: int = 4, rps: float = 2.0,
+        backend: str = None, mock_url: str = None, restart: bool = False, log=print) -> dict:
+    """Re-score every matching session not already in the checkpoint; returns the summary"""
+    if output_dir.resolve() == data_dir.resolve():
+        raise ValueError("Output directory must differ from the data directory; originals are never rewritten")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint_path = output_dir / CHECKPOINT_FILE
+    if restart and checkpoint_path.exists():
+        checkpoint_path.unlink()
+    done = load_checkpoint(checkpoint_path)
+    records = [dict(record, resumed=True) for record in done.values()]
+    failed = []
+
+    backend = backend or interview_app.LLM_BACKEND
+    started = time.perf_counter()
+    in_flight = {}
+
+    def collect(futures):
+        for future in futures:
+            path = in_flight.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                log(f"Error rescoring {path.name}: {e}")
+                failed.append(path.name)
+                continue
+            write_output(output_dir, path.name, result['document'])
+            record = {
+                'file': path.name,
+                'sessionId': result['document'].get('sessionId'),
+                'before': result['before'],
+                'after': result['after'],
+                'seconds': round(result['seconds'], 3),
+            }
+            with open(checkpoint_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+            records.append(record)
+            log(f"{path.name}: {len(record['after'])} answers, "
+                f"mean {mean(record['before'])} -> {mean(record['after'])}")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(backend, mock_url or interview_app.MOCK_LLM_URL, rps, workers)) as pool:
+        # Files are read one at a time and at most two jobs per worker are queued
+        for path in sorted(data_dir.glob(pattern)):
+            if path.name in done:
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    document = json.load(f)
+            except (OSError, ValueError) as e:
+                log(f"Skipping unreadable {path.name}: {e}")
+                continue
+            answers = len(scored_answers(document))
+            if not answers:
+                continue
+
+            while len(in_flight) >= workers * 2:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(finished)
+            in_flight[pool.submit(rescore_session, document)] = path
+
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            collect(finished)
+
+    duration = time.perf_counter() - started
+    summary = build_summary(records, duration, len(done), {
+        'data_dir': str(data_dir),
+        'pattern': pattern,
+        'workers': workers,
+        'rps': rps,
+        'backend': backend,
+        'finished_at': datetime.now().isoformat(),
+    }, failed)
+    with open(output_dir / SUMMARY_FILE, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score stored interview sessions with the current evaluation prompt")
+    parser.add_argument('--data-dir', default='data', help='Directory with the original session files (read only)')
+    parser.add_argument('--output-dir', default='rescored', help='Where rescored copies, checkpoint and summary go')
+    parser.add_argument('--pattern', default='session_*.json', help='Glob for session files in --data-dir')
+    parser.add_argument('--workers', type=int, default=4, help='Worker processes')
+    parser.add_argument('--rps', type=float, default=2.0, help='LLM requests per second across all workers (0 = unlimited)')
+    parser.add_argument('--backend', default=None, help='LLM backend (default: LLM_BACKEND)')
+    parser.add_argument('--mock-url', default=None, help='Stand-in server URL for --backend mock (default: MOCK_LLM_URL)')
+    parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint and re-score everything')
+    args = parser.parse_args()
+
+    try:
+        summary = run(Path(args.data_dir), Path(args.output_dir), args.pattern, args.workers, args.rps,
+                      args.backend, args.mock_url, args.restart)
+    except ValueError as e:
+        parser.error(str(e))
+
+    overall = summary['overall']
+    print(f"{summary['sessions']} sessions ({summary['resumed_sessions']} from checkpoint), "
+          f"{summary['answers']} answers in {summary['duration_s']}s: "
+          f"{summary['throughput']['sessions_per_s']} sessions/s, {summary['throughput']['answers_per_s']} answers/s")
+    print(f"Mean overall score {overall['before']['mean']} -> {overall['after']['mean']}")
+    if summary['failed_sessions']:
+        print(f"{summary['failed_sessions']} sessions failed and were not checkpointed; rerun to retry them")
+
+if __name__ == '__main__':
+    main()
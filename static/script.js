@@ -97,7 +97,7 @@ async function sendMessage() {
     const typingId = showTypingIndicator();
 
     try {
-        const response = await fetch('/api/chat', {
+        const response = await fetch('/api/chat/stream', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -112,21 +112,30 @@ async function sendMessage() {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
 
-        const data = await response.json();
+        // Render tokens as they arrive; the bot message is created on the first token
+        let botContent = null;
+        let responseText = '';
+        const data = await readEventStream(response, (token) => {
+            if (!botContent) {
+                removeTypingIndicator(typingId);
+                botContent = addMessage('', 'bot');
+            }
+            responseText += token;
+            botContent.innerHTML = formatMessage(responseText);
+            chatMessages.scrollTop = chatMessages.scrollHeight;
+        });
         
         // Remove typing indicator
         removeTypingIndicator(typingId);
 
-        if (data.response) {
-            addMessage(data.response, 'bot');
-            
+        if (responseText) {
             // Read question aloud if voice mode is enabled
-            if (voiceModeEnabled && isQuestion(data.response)) {
-                speakText(data.response);
+            if (voiceModeEnabled && isQuestion(responseText)) {
+                speakText(responseText);
             }
             
             // Update progress info
-            if (data.role && progressInfo) {
+            if (data && data.role && progressInfo) {
                 const questionNum = data.question_number || 1;
                 const totalQuestions = data.total_questions || 10;
                 updateProgress(data.role, questionNum, totalQuestions);
@@ -145,6 +154,47 @@ async function sendMessage() {
     }
 }
 
+// Read a Server-Sent Events response: calls onToken for each 'token' event
+// and resolves with the metadata from the final 'done' event
+async function readEventStream(response, onToken) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let metadata = null;
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Frames are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const frame = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = 'message';
+            let dataLines = [];
+            frame.split('\n').forEach(line => {
+                if (line.startsWith('event: ')) {
+                    event = line.slice(7);
+                } else if (line.startsWith('data: ')) {
+                    dataLines.push(line.slice(6));
+                }
+            });
+            if (dataLines.length === 0) continue;
+
+            const payload = JSON.parse(dataLines.join('\n'));
+            if (event === 'token') {
+                onToken(payload.text);
+            } else if (event === 'done') {
+                metadata = payload;
+            }
+        }
+    }
+    return metadata;
+}
+
 function addMessage(text, type) {
     const chatMessages = window.chatMessages || document.getElementById('chatMessages');
     if (!chatMessages) {
@@ -169,6 +219,8 @@ function addMessage(text, type) {
     setTimeout(() => {
         chatMessages.scrollTop = chatMessages.scrollHeight;
     }, 10);
+
+    return contentDiv;
 }
 
 function formatMessage(text) {
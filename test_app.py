@@ -6,6 +6,7 @@ import unittest
 from unittest.mock import patch, MagicMock
 import json
 import os
+import asyncio
 import sys
 from pathlib import Path
 
@@ -14,8 +15,10 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from app import (
     InterviewAgent, HeuristicsAnalyzer, LLMService,
-    QuestionBank, save_session, EVALUATION_SCHEMA
+    QuestionBank, save_session, EVALUATION_SCHEMA,
+    EvaluationCache, evaluation_cache
 )
+import app as app_module
 
 class TestSessionCreation(unittest.TestCase):
     """Test session creation and management"""
@@ -139,6 +142,8 @@ class TestSessionFileExport(unittest.TestCase):
         test_file = self.test_data_dir / f"{self.test_session_id}.json"
         if test_file.exists():
             test_file.unlink()
+        for catalog_file in self.test_data_dir.glob('catalog.sqlite3*'):
+            catalog_file.unlink()
         if self.test_data_dir.exists():
             try:
                 self.test_data_dir.rmdir()
@@ -262,6 +267,1678 @@ class TestHeuristics(unittest.TestCase):
         self.assertTrue(self.heuristics.is_nonsense("a"))
         self.assertFalse(self.heuristics.is_nonsense("I am a software engineer"))
 
+class TestQuestionBank(unittest.TestCase):
+    """Test the file-backed question bank"""
+    
+    def setUp(self):
+        import tempfile
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / 'questions.json'
+        self.write_bank('v1', 3)
+        self.bank = QuestionBank(path=self.path, reload_interval=0, roles=('engineer',), difficulties=('medium',))
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def write_bank(self, label, count):
+        questions = [f"{label} question {i}?" for i in range(count)]
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'engineer': {'medium': questions}}, f)
+        # Make sure the change is visible even on coarse mtime filesystems
+        stat = self.path.stat()
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000 * count))
+    
+    def test_draws_do_not_repeat_until_exhausted(self):
+        """Test that used questions are skipped and the bucket resets when exhausted"""
+        used = []
+        for _ in range(3):
+            used.append(self.bank.get_question('engineer', 'medium', used))
+        self.assertEqual(sorted(used), [f"v1 question {i}?" for i in range(3)])
+        self.assertIn(self.bank.get_question('engineer', 'medium', used), used)
+    
+    def test_prefers_least_similar_question(self):
+        """Test that the next question differs most from what was already asked and answered"""
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'engineer': {'medium': [
+                "How would you optimize a slow database query?",
+                "How would you index a slow database query?",
+                "Tell me about a conflict within your team.",
+                "How do you tune database query performance?"
+            ]}}, f)
+        self.bank.reload()
+        session = {'conversation_history': [
+            {'role': 'user', 'content': 'I tuned the database query performance with an index'}
+        ]}
+        for _ in range(5):
+            question = self.bank.get_question('engineer', 'medium', ["How would you optimize a slow database query?"], session)
+            self.assertEqual(question, "Tell me about a conflict within your team.")
+    
+    def test_prepared_draw(self):
+        """Test that a draft sampled before the answer is finished against the answer"""
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'engineer': {'medium': [
+                "How would you optimize a slow database query?",
+                "How would you index a slow database query?",
+                "Tell me about a conflict within your team.",
+                "How do you tune database query performance?"
+            ]}}, f)
+        self.bank.reload()
+        used = ["How would you optimize a slow database query?"]
+        session = {'conversation_history': []}
+        draft = self.bank.prepare_draw('engineer', 'medium', used, used, session.get('question_bank_version'))
+        self.assertEqual(sorted(draft.candidates), [1, 2, 3])
+        
+        session['conversation_history'].append(
+            {'role': 'user', 'content': 'I tuned the database query performance with an index'})
+        with patch.object(QuestionBank, '_sample_unused', side_effect=AssertionError("draft not used")):
+            question = self.bank.get_question('engineer', 'medium', used, session, draft=draft)
+        self.assertEqual(question, "Tell me about a conflict within your team.")
+        
+        # A draft for other asked questions is ignored
+        with patch.object(QuestionBank, '_sample_unused', return_value=[1]) as sample:
+            self.bank.get_question('engineer', 'medium', used + ["How would you index a slow database query?"],
+                                   session, draft=draft)
+        sample.assert_called_once()
+    
+    def test_hot_reload_keeps_sessions_on_their_version(self):
+        """Test that a changed file is picked up without moving in-progress sessions"""
+        session = {}
+        first = self.bank.get_question('engineer', 'medium', [], session)
+        self.assertEqual(session['question_bank_version'], 1)
+        
+        self.write_bank('v2', 4)
+        self.assertTrue(self.bank.get_question('engineer', 'medium', []).startswith('v2'))
+        self.assertEqual(self.bank.version, 2)
+        self.assertTrue(self.bank.get_question('engineer', 'medium', [first], session).startswith('v1'))
+        self.assertTrue(self.bank.get_question('engineer', 'medium', [], {}).startswith('v2'))
+    
+    def test_invalid_file_keeps_current_bank(self):
+        """Test that a broken file doesn't replace the loaded bank"""
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('{"engineer": {"medium": []}}')
+        self.assertFalse(self.bank.reload())
+        self.assertEqual(self.bank.version, 1)
+        self.assertTrue(self.bank.get_question('engineer', 'medium').startswith('v1'))
+    
+    def test_reload_missing_role_keeps_current_bank(self):
+        """Test that a file without every offered role and difficulty doesn't replace the bank"""
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({role: {'medium': [f"{role} question?"], 'hard': [f"hard {role} question?"]}
+                       for role in ('engineer', 'sales')}, f)
+        bank = QuestionBank(path=self.path, reload_interval=0, roles=('engineer', 'sales'))
+        
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'engineer': {'medium': ["New question?"], 'hard': ["New hard question?"]}}, f)
+        self.assertFalse(bank.reload())
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({role: {'medium': ["New question?"]} for role in ('engineer', 'sales')}, f)
+        self.assertFalse(bank.reload())
+        
+        self.assertEqual(bank.version, 1)
+        self.assertEqual(bank.get_question('sales', 'medium', []), "sales question?")
+        self.assertEqual(bank.get_question('engineer', 'hard', []), "hard engineer question?")
+    
+    def test_default_bank(self):
+        """Test that the shipped bank covers every role and difficulty"""
+        bank = QuestionBank()
+        for role in ('engineer', 'sales', 'retail'):
+            for difficulty in ('easy', 'medium', 'hard'):
+                self.assertTrue(bank.get_question(role, difficulty).strip())
+
+class TestKeywordMatcher(unittest.TestCase):
+    """Test the single-pass keyword matcher"""
+    
+    def setUp(self):
+        self.matcher = app_module.KeywordMatcher({
+            'profanity': {'match': 'word', 'terms': ['hell']},
+            'skip': {'match': 'word', 'terms': ['next', 'move on']},
+            'examples': {'match': 'prefix', 'terms': ['example', 'project']},
+            'engineer': {'match': 'prefix', 'terms': ['develop', 'project']},
+            'nonsense': {'match': 'exact', 'terms': ['abc']}
+        })
+    
+    def test_word_boundaries(self):
+        """Test that whole-word terms don't match inside other words"""
+        self.assertEqual(self.matcher.scan("hello, what's in the context?"), {})
+        self.assertEqual(self.matcher.scan("What the HELL"), {'profanity': {'hell'}})
+        self.assertEqual(self.matcher.scan("Let's move   on"), {'skip': {'move on'}})
+    
+    def test_prefix_terms_and_shared_terms(self):
+        """Test that prefix terms match word stems and a term hits every category listing it"""
+        hits = self.matcher.scan("For example, I developed two projects")
+        self.assertEqual(hits, {'examples': {'example', 'project'}, 'engineer': {'develop', 'project'}})
+        self.assertEqual(self.matcher.scan("redevelop"), {})
+    
+    def test_exact_terms(self):
+        """Test that exact terms only match the whole text"""
+        self.assertEqual(self.matcher.scan(" ABC "), {'nonsense': {'abc'}})
+        self.assertEqual(self.matcher.scan("abc company"), {})
+    
+    def test_default_word_lists(self):
+        """Test the shipped word lists through the heuristics"""
+        self.assertFalse(HeuristicsAnalyzer.analyze_answer("Hello, I built our checkout service", 'retail')['has_profanity'])
+        self.assertTrue(HeuristicsAnalyzer._check_role_keywords("I debugged the database layer", 'engineer'))
+        self.assertFalse(HeuristicsAnalyzer.is_nonsense("abcdef is our product"))
+
+class TestAnswerFeatures(unittest.TestCase):
+    """Test the per-turn answer features"""
+    
+    def setUp(self):
+        self.session_id = "test_features_session"
+        self.client = app_module.app.test_client()
+    
+    def tearDown(self):
+        app_module.interview_sessions.pop(self.session_id, None)
+    
+    def test_features(self):
+        """Test the flags derived from one message"""
+        features = app_module.AnswerFeatures("For example, we cut query time by 40% on the software team")
+        self.assertEqual(features.word_count, 12)
+        self.assertTrue(features.has_digits)
+        self.assertFalse(features.is_nonsense)
+        self.assertTrue(features.has('example_markers'))
+        self.assertTrue(features.has_role_keywords('engineer'))
+        self.assertEqual(features.selected_role(), 'engineer')
+        self.assertTrue(app_module.AnswerFeatures("tell me a joke").is_off_topic_request)
+        self.assertTrue(app_module.AnswerFeatures("!!!").is_nonsense)
+    
+    @patch('app.LLMService.evaluate_answer', return_value={})
+    def test_message_scanned_once_per_turn(self, mock_evaluate):
+        """Test that a turn scans the message once however many checks use it"""
+        self.client.post('/api/chat', json={'message': 'engineer', 'session_id': self.session_id})
+        with patch.object(app_module.keyword_matcher, 'scan', wraps=app_module.keyword_matcher.scan) as mock_scan:
+            self.client.post('/api/chat', json={
+                'message': 'I debugged a slow database query and cut latency by 40 percent for our API users',
+                'session_id': self.session_id
+            })
+        app_module.wait_for_evaluations(self.session_id, timeout=5)
+        self.assertEqual(mock_scan.call_count, 1)
+    
+    def test_debug_flag(self):
+        """Test that features are only included in the response when CHAT_DEBUG is set"""
+        data = self.client.post('/api/chat', json={'message': 'sales', 'session_id': self.session_id}).get_json()
+        self.assertNotIn('features', data)
+        
+        app_module.interview_sessions.pop(self.session_id, None)
+        with patch('app.CHAT_DEBUG', True):
+            data = self.client.post('/api/chat', json={'message': 'sales', 'session_id': self.session_id}).get_json()
+        self.assertEqual(data['features']['hits']['select:sales'], ['sales'])
+        self.assertEqual(data['features']['word_count'], 1)
+
+class TestEvaluationCache(unittest.TestCase):
+    """Test the shared evaluation cache"""
+    
+    VALID_RESPONSE = '{"scores":{"communication":4,"technical":5,"examples":3},"overall":80,"should_followup":false,"followup_question":"","feedback":["Good"]}'
+    
+    def setUp(self):
+        evaluation_cache.clear()
+        self.llm_service = LLMService()
+    
+    def tearDown(self):
+        evaluation_cache.clear()
+    
+    def test_normalized_key_hit(self):
+        """Test that case and whitespace differences share an entry"""
+        cache = EvaluationCache(max_size=10, ttl=60)
+        cache.set("Tell me about yourself", "I  write Code", "engineer", {'overall': 70})
+        self.assertEqual(cache.get("tell me about yourself ", "i write code", "Engineer"), {'overall': 70})
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = EvaluationCache(max_size=2, ttl=60)
+        cache.set("q1", "a", "engineer", {'overall': 1})
+        cache.set("q2", "a", "engineer", {'overall': 2})
+        cache.get("q1", "a", "engineer")
+        cache.set("q3", "a", "engineer", {'overall': 3})
+        
+        self.assertIsNotNone(cache.get("q1", "a", "engineer"))
+        self.assertIsNone(cache.get("q2", "a", "engineer"))
+        self.assertEqual(len(cache), 2)
+    
+    @patch('app.time.monotonic')
+    def test_ttl_expiry(self, mock_monotonic):
+        """Test that entries expire after the TTL"""
+        cache = EvaluationCache(max_size=10, ttl=60)
+        mock_monotonic.return_value = 1000.0
+        cache.set("q", "a", "engineer", {'overall': 50})
+        mock_monotonic.return_value = 1061.0
+        self.assertIsNone(cache.get("q", "a", "engineer"))
+    
+    @patch('app.LLMService.call_gemini_api')
+    def test_evaluate_answer_calls_llm_once(self, mock_call):
+        """Test that repeated evaluations of the same answer reuse the cache"""
+        mock_call.return_value = self.VALID_RESPONSE
+        
+        first = self.llm_service.evaluate_answer("Tell me about yourself", "I build APIs", "engineer")
+        second = self.llm_service.evaluate_answer("Tell me about yourself", "I build APIs", "engineer")
+        
+        self.assertEqual(mock_call.call_count, 1)
+        self.assertEqual(first, second)
+    
+    @patch('app.LLMService.call_gemini_api')
+    def test_failed_evaluation_not_cached(self, mock_call):
+        """Test that default evaluations from failures are not cached"""
+        mock_call.side_effect = [Exception("API down"), self.VALID_RESPONSE]
+        
+        first = self.llm_service.evaluate_answer("q", "a", "engineer")
+        second = self.llm_service.evaluate_answer("q", "a", "engineer")
+        
+        self.assertEqual(first['overall'], 60)
+        self.assertEqual(second['overall'], 80)
+
+class TestBackgroundScoring(unittest.TestCase):
+    """Test background answer scoring"""
+    
+    EVAL = {
+        "scores": {"communication": 4, "technical": 4, "examples": 2},
+        "overall": 70,
+        "should_followup": False,
+        "followup_question": "",
+        "feedback": ["Solid"]
+    }
+    
+    def setUp(self):
+        self.session_id = "test_background_scoring"
+        self.session = {
+            'role': 'engineer',
+            'conversation_history': [
+                {'role': 'assistant', 'content': 'How do you debug?', 'timestamp': '2024-01-01T00:00:00'},
+                {'role': 'user', 'content': 'I add logging first', 'timestamp': '2024-01-01T00:00:01'}
+            ]
+        }
+    
+    def tearDown(self):
+        app_module.interview_sessions.pop(self.session_id, None)
+    
+    @patch('app.LLMService.evaluate_answer')
+    def test_eval_attached_to_turn(self, mock_evaluate):
+        """Test that a finished evaluation is attached to its turn"""
+        mock_evaluate.return_value = self.EVAL
+        
+        app_module.submit_evaluation(self.session_id, self.session, 1, 'How do you debug?', 'I add logging first', 'engineer')
+        self.assertTrue(app_module.wait_for_evaluations(self.session_id, timeout=5))
+        
+        self.assertEqual(self.session['conversation_history'][1]['eval'], self.EVAL)
+        self.assertEqual(app_module.get_pending_turns(self.session_id), [])
+    
+    def test_evals_endpoint(self):
+        """Test fetching evaluations for a live session"""
+        self.session['conversation_history'][1]['eval'] = self.EVAL
+        app_module.interview_sessions[self.session_id] = self.session
+        
+        client = app_module.app.test_client()
+        data = client.get(f'/api/session/{self.session_id}/evals').get_json()
+        
+        self.assertEqual(data['evals'][0]['turn'], 1)
+        self.assertEqual(data['evals'][0]['eval']['overall'], 70)
+        self.assertEqual(data['pending_evals'], [])
+        self.assertEqual(client.get('/api/session/missing_session/evals').status_code, 404)
+
+class TestFeedbackSummary(unittest.TestCase):
+    """Test answer-turn links, running score totals and the cached feedback summary"""
+    
+    @staticmethod
+    def evaluation(score, overall):
+        return {"scores": {"communication": score, "technical": score, "examples": score}, "overall": overall,
+                "should_followup": False, "followup_question": "", "feedback": []}
+    
+    def setUp(self):
+        self.session_id = "test_feedback_summary"
+        # The same answer given twice must still land on two different turns
+        self.session = {
+            'role': 'engineer',
+            'conversation_history': [
+                {'role': 'assistant', 'content': 'Q1?'}, {'role': 'user', 'content': 'I write tests'},
+                {'role': 'assistant', 'content': 'Q2?'}, {'role': 'user', 'content': 'I write tests'},
+            ],
+            'questions_asked': [{'question': 'Q1?', 'user_response': None}, {'question': 'Q2?', 'user_response': None}],
+        }
+        app_module.record_answer(self.session, 0, 1)
+        app_module.record_answer(self.session, 1, 3)
+    
+    def tearDown(self):
+        app_module.interview_sessions.pop(self.session_id, None)
+    
+    def test_running_totals(self):
+        """Test that totals follow evals as they land, including a replaced eval"""
+        store = app_module.InMemorySessionStore(max_live=10)
+        store.attach_eval(self.session_id, self.session, 1, self.evaluation(4, 80))
+        store.attach_eval(self.session_id, self.session, 3, self.evaluation(2, 40))
+        store.attach_eval(self.session_id, self.session, 3, self.evaluation(3, 60))
+        
+        totals = self.session['score_totals']
+        self.assertEqual((totals['count'], totals['communication'], totals['overall']), (2, 7, 140))
+        self.assertEqual(self.session['answered_count'], 2)
+        self.assertEqual([qa['answer_turn'] for qa in self.session['questions_asked']], [1, 3])
+    
+    def test_summary_cached_until_next_eval(self):
+        """Test that a complete summary is reused and rebuilt once another eval arrives"""
+        app_module.record_turn_eval(self.session, 1, self.evaluation(4, 80))
+        app_module.record_turn_eval(self.session, 3, self.evaluation(2, 40))
+        
+        with patch.object(app_module.agent.llm_service, 'evaluate_answer') as mock_evaluate, \
+                patch.object(app_module.agent.llm_service, 'evaluate_answers_batch') as mock_batch:
+            first = app_module.generate_feedback_summary(self.session)
+            with patch('app.link_answer_turns'):
+                self.assertEqual(app_module.generate_feedback_summary(self.session), first)
+            mock_evaluate.assert_not_called()
+            mock_batch.assert_not_called()
+        self.assertIn("Overall Score: 60.0/100", first)
+        self.assertIn("Questions Answered: 2/10", first)
+        
+        app_module.record_turn_eval(self.session, 3, self.evaluation(4, 80))
+        self.assertIn("Overall Score: 80.0/100", app_module.generate_feedback_summary(self.session))
+    
+    def test_links_sessions_saved_without_answer_turns(self):
+        """Test that older sessions are linked in conversation order on first summary"""
+        session = {
+            'role': 'engineer',
+            'conversation_history': [
+                {'role': 'user', 'content': 'same', 'eval': self.evaluation(5, 100)},
+                {'role': 'user', 'content': 'same', 'eval': self.evaluation(1, 20)},
+            ],
+            'questions_asked': [{'question': 'Q1?', 'user_response': 'same'}, {'question': 'Q2?', 'user_response': 'same'}],
+        }
+        summary = app_module.generate_feedback_summary(session)
+        
+        self.assertEqual([qa['answer_turn'] for qa in session['questions_asked']], [0, 1])
+        self.assertIn("Question 2: Q2?\n  Communication: 1/5", summary)
+        self.assertIn("Overall Score: 60.0/100", summary)
+
+class TestChatStreaming(unittest.TestCase):
+    """Test the Server-Sent Events chat endpoint"""
+    
+    def setUp(self):
+        self.session_id = "test_chat_stream"
+        self.client = app_module.app.test_client()
+    
+    def tearDown(self):
+        app_module.interview_sessions.pop(self.session_id, None)
+    
+    def parse_events(self, body):
+        events = []
+        for frame in body.strip().split('\n\n'):
+            lines = dict(line.split(': ', 1) for line in frame.split('\n'))
+            events.append((lines['event'], json.loads(lines['data'])))
+        return events
+    
+    def test_stream_tokens_then_metadata(self):
+        """Test that tokens are followed by a final metadata frame"""
+        response = self.client.post('/api/chat/stream', json={'message': 'engineer', 'session_id': self.session_id})
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        
+        events = self.parse_events(response.get_data(as_text=True))
+        tokens = [data['text'] for event, data in events if event == 'token']
+        event, metadata = events[-1]
+        
+        self.assertEqual(event, 'done')
+        self.assertEqual(metadata['role'], 'engineer')
+        self.assertEqual(metadata['question_number'], 1)
+        self.assertEqual(''.join(tokens), app_module.interview_sessions[self.session_id]['current_question'])
+    
+    def test_feedback_summary_streamed_in_parts(self):
+        """Test that the feedback summary is sent as several tokens and recorded once"""
+        app_module.interview_sessions[self.session_id] = {
+            'role': 'engineer',
+            'difficulty': 'medium',
+            'current_question': None,
+            'conversation_history': [
+                {'role': 'user', 'content': 'I write tests', 'timestamp': '2024-01-01T00:00:01',
+                 'eval': {'scores': {'communication': 4, 'technical': 4, 'examples': 4}, 'overall': 80, 'feedback': []}}
+            ],
+            'questions_asked': [{'question': 'How do you test?', 'user_response': 'I write tests', 'timestamp': None}],
+            'used_questions': ['How do you test?'],
+            'strong_answer_count': 0,
+            'started_at': '2024-01-01T00:00:00',
+            'aggregated_feedback': {}
+        }
+        
+        response = self.client.post('/api/chat/stream', json={'message': 'feedback', 'session_id': self.session_id})
+        tokens = [data['text'] for event, data in self.parse_events(response.get_data(as_text=True)) if event == 'token']
+        session = app_module.interview_sessions[self.session_id]
+        
+        self.assertGreater(len(tokens), 1)
+        self.assertEqual(''.join(tokens), session['aggregated_feedback']['summary'])
+        self.assertEqual(session['conversation_history'][-1]['content'], ''.join(tokens))
+
+class TestAsgiApplication(unittest.TestCase):
+    """Test the async ASGI server path"""
+    
+    VALID_RESPONSE = '{"scores":{"communication":4,"technical":5,"examples":3},"overall":80,"should_followup":false,"followup_question":"","feedback":["Good"]}'
+    
+    def setUp(self):
+        import asgi
+        self.asgi = asgi
+        self.session_id = "test_asgi_session"
+        evaluation_cache.clear()
+    
+    def tearDown(self):
+        app_module.interview_sessions.pop(self.session_id, None)
+        evaluation_cache.clear()
+    
+    def call(self, method, path, body=None):
+        """Run one request through the ASGI app and return (status, json)"""
+        messages = [{'type': 'http.request', 'body': json.dumps(body or {}).encode(), 'more_body': False}]
+        sent = []
+        
+        async def receive():
+            return messages.pop(0)
+        
+        async def send(message):
+            sent.append(message)
+        
+        scope = {'type': 'http', 'method': method, 'path': path, 'headers': [], 'query_string': b''}
+        asyncio.run(self.asgi.application(scope, receive, send))
+        body = b''.join(m.get('body', b'') for m in sent if m['type'] == 'http.response.body')
+        self.headers = dict(sent[0]['headers'])
+        return sent[0]['status'], json.loads(body)
+    
+    def test_chat_and_reset(self):
+        """Test role selection and reset through the async handlers"""
+        status, data = self.call('POST', '/api/chat', {'message': 'sales', 'session_id': self.session_id})
+        self.assertEqual(status, 200)
+        self.assertEqual(data['role'], 'sales')
+        self.assertTrue(self.headers[b'server-timing'].startswith(b'prepare;dur='))
+        
+        with patch('app.persistence.save_now') as mock_save:
+            status, data = self.call('POST', '/api/reset', {'session_id': self.session_id})
+        self.assertEqual(data, {'status': 'reset'})
+        mock_save.assert_called_once()
+        self.assertNotIn(self.session_id, app_module.interview_sessions)
+    
+    def test_missing_session(self):
+        """Test that an unknown session returns 404"""
+        status, data = self.call('GET', '/api/session/does_not_exist')
+        self.assertEqual(status, 404)
+    
+    @patch('app.LLMService.call_gemini_api')
+    @patch('app.LLMService.call_gemini_api_async')
+    def test_answer_scored_without_blocking_call(self, mock_async_call, mock_sync_call):
+        """Test that answer evaluation uses the async client and warms the cache"""
+        mock_async_call.return_value = self.VALID_RESPONSE
+        self.call('POST', '/api/chat', {'message': 'engineer', 'session_id': self.session_id})
+        self.call('POST', '/api/chat', {'message': 'I wrote a parser for our billing system', 'session_id': self.session_id})
+        app_module.wait_for_evaluations(self.session_id, timeout=5)
+        
+        mock_async_call.assert_called_once()
+        mock_sync_call.assert_not_called()
+        self.assertEqual(app_module.interview_sessions[self.session_id]['conversation_history'][2]['eval']['overall'], 80)
+    
+    @patch('app.LLMService.evaluate_answer_async')
+    def test_off_topic_request_not_scored(self, mock_evaluate):
+        """Test that an off-topic request is answered without evaluating it"""
+        self.call('POST', '/api/chat', {'message': 'engineer', 'session_id': self.session_id})
+        status, data = self.call('POST', '/api/chat', {'message': 'tell me a joke', 'session_id': self.session_id})
+        
+        self.assertEqual(status, 200)
+        self.assertIn("Let's focus on that", data['response'])
+        mock_evaluate.assert_not_called()
+
+class TestLLMBackends(unittest.TestCase):
+    """Test the pluggable LLM backend layer against the local stand-in server"""
+    
+    def start_server(self, **options):
+        import threading
+        from mockGeminiServer import create_server, MockGeminiConfig
+        server = create_server(port=0, config=MockGeminiConfig(latency='constant', latency_ms=0, seed=1, **options))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return app_module.MockGeminiBackend(f"http://127.0.0.1:{server.server_address[1]}")
+    
+    def setUp(self):
+        evaluation_cache.clear()
+    
+    def tearDown(self):
+        evaluation_cache.clear()
+    
+    def test_custom_backend(self):
+        """Test that LLMService delegates generation to its backend"""
+        backend = MagicMock(spec=app_module.LLMBackend)
+        backend.generate.return_value = '  How did you measure success?  '
+        
+        service = LLMService(backend=backend)
+        self.assertEqual(service.call_gemini_api("prompt"), 'How did you measure success?')
+        backend.generate.assert_called_once()
+    
+    def test_evaluation_through_mock_server(self):
+        """Test a full evaluation round trip against the stand-in server"""
+        service = LLMService(backend=self.start_server())
+        result = service.evaluate_answer("How do you debug?", "I bisect the failing commit", "engineer")
+        
+        self.assertTrue(all(key in result for key in EVALUATION_SCHEMA))
+        self.assertNotEqual(result['feedback'], ["Evaluation temporarily unavailable"])
+    
+    def test_rate_limit_response(self):
+        """Test that a 429 from the stand-in surfaces as RateLimitError"""
+        backend = self.start_server(rate_limit_rate=1.0)
+        with self.assertRaises(app_module.RateLimitError) as context:
+            backend.generate("prompt", {})
+        self.assertEqual(context.exception.retry_after, 1.0)
+    
+    def test_prefix_cache_cuts_prompt_bytes(self):
+        """Test that a cached instruction prefix is sent once and lowers the bytes per call"""
+        import threading
+        from mockGeminiServer import create_server, MockGeminiConfig
+        answers = [f"I profiled the service and fixed hot path number {n}" for n in range(3)]
+        prompt_bytes = {}
+        for prefix_cache in (False, True):
+            server = create_server(port=0, config=MockGeminiConfig(latency='constant', latency_ms=0, seed=1))
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self.addCleanup(server.server_close)
+            self.addCleanup(server.shutdown)
+            backend = app_module.MockGeminiBackend(f"http://127.0.0.1:{server.server_address[1]}")
+            service = LLMService(backend=backend, prefix_cache=prefix_cache)
+            evaluation_cache.clear()
+            
+            results = [service.evaluate_answer("How do you optimize?", answer, "engineer") for answer in answers]
+            self.assertTrue(all(result['feedback'] != ["Evaluation temporarily unavailable"] for result in results))
+            prompt_bytes[prefix_cache] = server.stats['prompt_bytes']
+        
+        self.assertEqual(server.stats['cached_contents'], 1)
+        self.assertEqual(server.stats['cache_hits'], 3)
+        self.assertLess(prompt_bytes[True], prompt_bytes[False] / 2)
+        self.assertGreater(service.stats()['input_tokens_saved_per_call'], 100)
+        
+        # Expired on the server: the backend registers the prefix again
+        server.cached_contents.clear()
+        service.evaluate_answer("How do you optimize?", "A new answer about caching", "engineer")
+        self.assertEqual(server.stats['cached_contents'], 2)
+    
+    def test_malformed_json_falls_back(self):
+        """Test that malformed evaluations yield the default evaluation"""
+        backend = self.start_server(malformed_rate=1.0)
+        result = LLMService(backend=backend).evaluate_answer("q", "a", "engineer")
+        self.assertEqual(result['feedback'], ["Evaluation temporarily unavailable"])
+
+class TestBatchEvaluation(unittest.TestCase):
+    """Test scoring several answers per LLM request"""
+    
+    EVAL = {"scores": {"communication": 4, "technical": 4, "examples": 3}, "overall": 75,
+            "should_followup": False, "followup_question": "", "feedback": ["Good"]}
+    
+    def setUp(self):
+        evaluation_cache.clear()
+        self.service = LLMService(backend=MagicMock(spec=app_module.LLMBackend))
+        self.items = [("Question one?", "Answer one"), ("Question two?", "Answer two"), ("Question three?", "Answer three")]
+    
+    def tearDown(self):
+        evaluation_cache.clear()
+    
+    def test_batch_prompt_uses_single_answer_rubric(self):
+        """Test that the batch prompt is built from the single-answer prompt, not a copy of it"""
+        import llmPrompts
+        with patch.object(llmPrompts, 'EVALUATION_PROMPT', "Score with the edited rubric."):
+            prompt = llmPrompts.get_batch_evaluation_prompt()
+        self.assertIn("Score with the edited rubric.", prompt)
+        self.assertIn('"index"', prompt)
+    
+    def test_only_malformed_items_retried(self):
+        """Test that valid items are used and only the invalid one is re-scored alone"""
+        batch_response = json.dumps([
+            dict(self.EVAL, index=1),
+            {"index": 2, "scores": {"communication": 1}},
+            dict(self.EVAL, index=3, overall=90)
+        ])
+        with patch.object(self.service, 'call_gemini_api', return_value=batch_response) as mock_call, \
+                patch.object(self.service, '_request_evaluation', return_value=dict(self.EVAL, overall=40)) as mock_single:
+            results = self.service.evaluate_answers_batch(self.items, 'engineer')
+        
+        mock_call.assert_called_once()
+        mock_single.assert_called_once_with("Question two?", "Answer two", 'engineer')
+        self.assertEqual([r['overall'] for r in results], [75, 40, 90])
+        self.assertNotIn('index', results[0])
+    
+    def test_cached_items_not_sent(self):
+        """Test that cached answers are left out of the batch prompt"""
+        evaluation_cache.set("Question one?", "Answer one", 'engineer', dict(self.EVAL, overall=10))
+        batch_response = json.dumps([dict(self.EVAL, index=1), dict(self.EVAL, index=2)])
+        with patch.object(self.service, 'call_gemini_api', return_value=batch_response) as mock_call:
+            results = self.service.evaluate_answers_batch(self.items, 'engineer')
+        
+        prompt = mock_call.call_args[0][0]
+        self.assertNotIn("Answer one", prompt)
+        self.assertIn("Answer three", prompt)
+        self.assertEqual([r['overall'] for r in results], [10, 75, 75])
+        self.assertEqual(evaluation_cache.get("Question three?", "Answer three", 'engineer')['overall'], 75)
+    
+    def test_feedback_summary_batches_unscored_answers(self):
+        """Test that the summary scores all unscored answers with one request"""
+        session = {
+            'role': 'engineer',
+            'questions_asked': [{'question': q, 'user_response': a} for q, a in self.items],
+            'conversation_history': [{'role': 'user', 'content': a} for _, a in self.items]
+        }
+        batch_response = json.dumps([dict(self.EVAL, index=n) for n in (1, 2, 3)])
+        with patch.object(app_module.agent.llm_service, 'call_gemini_api', return_value=batch_response) as mock_call:
+            summary = app_module.generate_feedback_summary(session)
+        
+        mock_call.assert_called_once()
+        self.assertIn("Question 3: Question three?", summary)
+        self.assertIn("Questions Answered: 3/10", summary)
+    
+    def test_batch_through_mock_server(self):
+        """Test that the stand-in server answers batch prompts with an array"""
+        import threading
+        from mockGeminiServer import create_server, MockGeminiConfig
+        server = create_server(port=0, config=MockGeminiConfig(latency='constant', latency_ms=0, seed=1))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        
+        service = LLMService(backend=app_module.MockGeminiBackend(f"http://127.0.0.1:{server.server_address[1]}"))
+        results = service.evaluate_answers_batch(self.items, 'engineer')
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(r['feedback'] != ["Evaluation temporarily unavailable"] for r in results))
+        self.assertEqual(server.stats['requests'], 1)
+
+class TestGeminiResilience(unittest.TestCase):
+    """Test the shared rate limiter, retry backoff and circuit breaker around the LLM"""
+    
+    def setUp(self):
+        evaluation_cache.clear()
+        self.backend = MagicMock(spec=app_module.LLMBackend)
+        self.limiter = app_module.TokenBucket(rate=0, burst=1)
+        self.circuit = app_module.CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        self.service = LLMService(backend=self.backend, rate_limiter=self.limiter, circuit=self.circuit)
+        sleep_patch = patch('app.time.sleep')
+        self.sleep = sleep_patch.start()
+        self.addCleanup(sleep_patch.stop)
+    
+    def tearDown(self):
+        evaluation_cache.clear()
+    
+    def test_token_bucket_paces_callers(self):
+        """Test that callers beyond the burst queue one interval apart"""
+        bucket = app_module.TokenBucket(rate=10, burst=2)
+        delays = [bucket.reserve() for _ in range(4)]
+        
+        self.assertEqual(delays[:2], [0, 0])
+        self.assertAlmostEqual(delays[2], 0.1, places=2)
+        self.assertAlmostEqual(delays[3], 0.2, places=2)
+        self.assertEqual(bucket.stats()['delayed'], 2)
+    
+    def test_rate_limit_honors_retry_after(self):
+        """Test that a rate-limit error is counted separately and its Retry-After respected"""
+        self.backend.generate.side_effect = [app_module.RateLimitError("quota", retry_after=4.0), 'Why?']
+        
+        self.assertEqual(self.service.call_gemini_api("prompt"), 'Why?')
+        self.assertGreaterEqual(max(call[0][0] for call in self.sleep.call_args_list), 4.0)
+        self.assertEqual(self.service.counters['rate_limited'], 1)
+        self.assertEqual(self.service.counters['errors'], 0)
+        self.assertEqual(self.service.counters['retries'], 1)
+    
+    def test_backoff_is_jittered_and_capped(self):
+        """Test that backoff delays stay within the exponential bound"""
+        for attempt in range(10):
+            delay = app_module.backoff_delay(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(app_module.GEMINI_BACKOFF_MAX, app_module.GEMINI_BACKOFF_BASE * 2 ** attempt))
+    
+    def test_open_circuit_scores_with_heuristics(self):
+        """Test that sustained failures open the breaker and scoring falls back to heuristics"""
+        self.backend.generate.side_effect = Exception("API down")
+        for _ in range(2):
+            self.service.evaluate_answer("q", "a", "engineer")
+        self.assertEqual(self.circuit.state, 'open')
+        calls = self.backend.generate.call_count
+        
+        result = self.service.evaluate_answer(
+            "How do you debug?", "For example, I debug the api code and cut errors by 40% on my project", "engineer"
+        )
+        self.assertEqual(self.backend.generate.call_count, calls)
+        self.assertEqual(result['feedback'], ["Scored by heuristics while the evaluation service is unavailable"])
+        self.assertTrue(all(key in result for key in EVALUATION_SCHEMA))
+        self.assertEqual(len(evaluation_cache), 0)
+        
+        batch = self.service.evaluate_answers_batch([("q1", "a1"), ("q2", "a2")], "engineer")
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(self.service.counters['circuit_rejections'], 2)
+    
+    def test_half_open_probe_closes_circuit(self):
+        """Test that a successful probe after the reset timeout closes the breaker"""
+        self.circuit.reset_timeout = 0
+        self.circuit.record_failure()
+        self.circuit.record_failure()
+        self.assertEqual(self.circuit.state, 'open')
+        
+        self.assertTrue(self.circuit.allow())
+        self.assertFalse(self.circuit.allow())  # one probe at a time
+        self.circuit.record_success()
+        self.assertEqual(self.circuit.stats()['state'], 'closed')
+    
+    def test_cancelled_probe_releases_circuit(self):
+        """Test that a probe cancelled mid-call doesn't leave the breaker stuck half-open"""
+        self.circuit.reset_timeout = 0
+        self.circuit.record_failure()
+        self.circuit.record_failure()
+        self.backend.generate_async.side_effect = asyncio.CancelledError()
+        
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(self.service.call_gemini_api_async("prompt"))
+        self.assertEqual(self.circuit.state, 'half_open')
+        
+        self.backend.generate.side_effect = None
+        self.backend.generate.return_value = 'Why?'
+        self.assertEqual(self.service.call_gemini_api("prompt"), 'Why?')
+        self.assertEqual(self.circuit.state, 'closed')
+    
+    def test_stats_endpoint(self):
+        """Test that limiter and breaker state is exposed in /api/stats"""
+        response = app_module.app.test_client().get('/api/stats')
+        llm = response.get_json()['llm']
+        self.assertIn(llm['circuit']['state'], ('closed', 'open', 'half_open'))
+        self.assertIn('rate_limiter', llm)
+        self.assertIn('rate_limited', llm)
+
+class TestLoadTest(unittest.TestCase):
+    """Test the transcript replay load-test helpers"""
+    
+    def test_transcripts_from_data(self):
+        """Test that recorded sessions yield their user turns"""
+        import loadTest
+        transcripts = loadTest.load_transcripts(Path(__file__).parent / 'data')
+        self.assertGreater(len(transcripts), 0)
+        self.assertTrue(all(isinstance(turn, str) for turn in transcripts[0]))
+    
+    def test_classify_turn(self):
+        """Test branch classification from consecutive responses"""
+        import loadTest
+        question = {'role': 'engineer', 'question_number': 1, 'response': 'How do you debug?'}
+        
+        self.assertEqual(loadTest.classify_turn({}, question), 'role_selection')
+        self.assertEqual(loadTest.classify_turn(question, {'role': 'engineer', 'question_number': 2, 'response': 'Why Python?'}), 'new_question')
+        self.assertEqual(loadTest.classify_turn(question, {'role': 'engineer', 'question_number': 1, 'response': 'Can you give an example?'}), 'followup')
+        self.assertEqual(loadTest.classify_turn(question, {'role': 'engineer', 'question_number': 1, 'response': 'Interview Feedback Summary for ...'}), 'feedback')
+    
+    def test_report_percentiles(self):
+        """Test latency percentiles and error rate in the report"""
+        import loadTest
+        records = [{'session_id': 's1', 'branch': 'new_question', 'latency_ms': float(ms)} for ms in range(1, 101)]
+        records.append({'session_id': 's2', 'error': 'HTTP 500', 'latency_ms': 5.0})
+        
+        report = loadTest.build_report(records, 2.0, {})
+        
+        self.assertEqual(report['latency_ms']['by_branch']['new_question']['p50'], 50.0)
+        self.assertEqual(report['latency_ms']['by_branch']['new_question']['p99'], 99.0)
+        self.assertEqual(report['errors']['count'], 1)
+        self.assertEqual(report['sessions'], 2)
+
+class TestRescoreSessions(unittest.TestCase):
+    """Test the offline re-scoring tool"""
+    
+    def setUp(self):
+        import tempfile
+        import threading
+        import shutil
+        from mockGeminiServer import create_server, MockGeminiConfig
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self.temp_dir.name) / 'data'
+        self.output_dir = Path(self.temp_dir.name) / 'rescored'
+        self.data_dir.mkdir()
+        for session_file in sorted((Path(__file__).parent / 'data').glob('session_*.json'))[:2]:
+            shutil.copy(session_file, self.data_dir)
+        
+        server = create_server(port=0, config=MockGeminiConfig(latency='constant', latency_ms=0, seed=1))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.mock_url = f"http://127.0.0.1:{server.server_address[1]}"
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def run_tool(self):
+        import rescoreSessions
+        return rescoreSessions.run(self.data_dir, self.output_dir, workers=1, rps=0,
+                                   backend='mock', mock_url=self.mock_url, log=lambda message: None)
+    
+    def test_rescore_and_resume(self):
+        """Test that copies are rescored, originals untouched and a rerun resumes from the checkpoint"""
+        originals = {path.name: path.read_bytes() for path in self.data_dir.iterdir()}
+        summary = self.run_tool()
+        
+        self.assertEqual(summary['sessions'], 2)
+        self.assertEqual(summary['resumed_sessions'], 0)
+        self.assertGreater(summary['answers'], 0)
+        self.assertEqual({path.name: path.read_bytes() for path in self.data_dir.iterdir()}, originals)
+        
+        name = sorted(originals)[0]
+        with open(self.output_dir / name, 'r', encoding='utf-8') as f:
+            rescored = json.load(f)
+        answers = [event for event in rescored['events'] if 'eval' in event]
+        self.assertTrue(all('originalEval' in event for event in answers))
+        self.assertNotEqual(answers[0]['eval']['feedback'], ["Evaluation temporarily unavailable"])
+        
+        resumed = self.run_tool()
+        self.assertEqual(resumed['resumed_sessions'], 2)
+        self.assertEqual(resumed['answers'], summary['answers'])
+        self.assertEqual(resumed['overall'], summary['overall'])
+    
+    def test_llm_outage_fails_sessions(self):
+        """Test that fallback scores are not saved or checkpointed, so a rerun retries the sessions"""
+        import threading
+        from mockGeminiServer import create_server, MockGeminiConfig
+        server = create_server(port=0, config=MockGeminiConfig(latency='constant', latency_ms=0, error_rate=1, seed=1))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        healthy_url, self.mock_url = self.mock_url, f"http://127.0.0.1:{server.server_address[1]}"
+        
+        with patch.object(app_module, 'GEMINI_MAX_RETRIES', 0):
+            summary = self.run_tool()
+        self.assertEqual(summary['sessions'], 0)
+        self.assertEqual(summary['failed_sessions'], 2)
+        self.assertEqual(sorted(path.name for path in self.output_dir.glob('session_*.json')), [])
+        
+        self.mock_url = healthy_url
+        retried = self.run_tool()
+        self.assertEqual((retried['sessions'], retried['resumed_sessions'], retried['failed_sessions']), (2, 0, 0))
+    
+    def test_workers_share_rate_cap(self):
+        """Test that each worker paces every LLM request at its share of --rps"""
+        import rescoreSessions
+        self.addCleanup(setattr, rescoreSessions, 'llm_service', None)
+        rescoreSessions.init_worker('mock', self.mock_url, 2.0, 4)
+        self.assertEqual(rescoreSessions.llm_service.rate_limiter.rate, 0.5)
+        self.assertIsNot(rescoreSessions.llm_service.rate_limiter, app_module.gemini_rate_limiter)
+        
+        rescoreSessions.init_worker('mock', self.mock_url, 0, 4)
+        self.assertEqual(rescoreSessions.llm_service.rate_limiter.reserve(), 0)
+    
+    def test_refuses_to_overwrite_originals(self):
+        """Test that the data directory can't be used as the output"""
+        import rescoreSessions
+        with self.assertRaises(ValueError):
+            rescoreSessions.run(self.data_dir, self.data_dir, workers=1, rps=0, backend='mock', mock_url=self.mock_url)
+
+class TestFastPathScorer(unittest.TestCase):
+    """Test the local fast-path scorer and its training tool"""
+    
+    STRONG = "For example, on my last project I debugged our api and database code, cut errors by 40% and shipped the fix to 3 teams in a week with tests"
+    WEAK = "not sure"
+    MEDIUM = "I usually talk to the team and then try to work through the problem step by step until it is fixed"
+    
+    @staticmethod
+    def evaluation(overall):
+        score = round(overall / 20)
+        return {"scores": {"communication": score, "technical": score, "examples": score}, "overall": overall,
+                "should_followup": overall < 50, "followup_question": "", "feedback": ["LLM feedback"]}
+    
+    def setUp(self):
+        import tempfile
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self.temp_dir.name)
+        labels = [(self.STRONG, 90), (self.WEAK, 25), (self.MEDIUM, 62)]
+        for session_number in range(10):
+            events = []
+            for repeat in range(4):
+                for answer, overall in labels:
+                    events.append({'speaker': 'assistant', 'text': f"Question {repeat}?"})
+                    events.append({'speaker': 'user', 'text': answer, 'eval': self.evaluation(overall + repeat)})
+            # Fallback evaluations are not training labels
+            events.append({'speaker': 'assistant', 'text': "Question?"})
+            events.append({'speaker': 'user', 'text': self.STRONG,
+                           'eval': LLMService._default_evaluation()})
+            with open(self.data_dir / f"session_{session_number}.json", 'w', encoding='utf-8') as f:
+                json.dump({'sessionId': str(session_number), 'role': 'engineer', 'events': events}, f)
+        self.model_path = Path(self.temp_dir.name) / 'models' / 'fast_scorer.json'
+        evaluation_cache.clear()
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+        evaluation_cache.clear()
+    
+    def train(self):
+        import trainFastScorer
+        return trainFastScorer.train(self.data_dir, self.model_path, threshold=0.8, min_samples=20,
+                                     log=lambda message: None)
+    
+    def test_training_report(self):
+        """Test that training holds out whole sessions and reports agreement per threshold"""
+        report = self.train()
+        
+        self.assertEqual(report['sessions'], 10)
+        self.assertEqual(report['train_samples'], 8 * 12)
+        self.assertEqual(report['validation']['samples'], 2 * 12)
+        self.assertEqual(report['validation']['band_accuracy'], 1.0)
+        selected = next(row for row in report['validation']['thresholds'] if row['threshold'] == 0.8)
+        self.assertAlmostEqual(selected['coverage'], 2 / 3, places=2)
+        self.assertEqual(selected['band_agreement'], 1.0)
+        self.assertTrue(self.model_path.exists())
+    
+    def test_clear_cut_answers_skip_llm(self):
+        """Test that confident strong/weak predictions skip the LLM and medium ones don't"""
+        self.train()
+        scorer = app_module.FastPathScorer.load(self.model_path, threshold=0.8)
+        backend = MagicMock(spec=app_module.LLMBackend)
+        backend.generate.return_value = json.dumps(self.evaluation(60))
+        service = LLMService(backend=backend, fast_scorer=scorer)
+        
+        strong = service.evaluate_answer("How do you debug?", self.STRONG, 'engineer')
+        weak = service.evaluate_answer("How do you debug?", self.WEAK, 'engineer')
+        self.assertEqual(strong['scorer'], 'fast_path')
+        self.assertGreaterEqual(strong['overall'], 75)
+        self.assertLess(weak['overall'], 50)
+        backend.generate.assert_not_called()
+        
+        medium = service.evaluate_answer("How do you debug?", self.MEDIUM, 'engineer')
+        self.assertNotIn('scorer', medium)
+        backend.generate.assert_called_once()
+        self.assertEqual(service.stats()['fast_path'], 2)
+    
+    def test_fast_path_reuses_turn_features(self):
+        """Test that a fast-path scored turn still scans the answer once"""
+        self.train()
+        scorer = app_module.FastPathScorer.load(self.model_path, threshold=0.8)
+        session_id = "test_fast_path_session"
+        self.addCleanup(app_module.interview_sessions.pop, session_id, None)
+        client = app_module.app.test_client()
+        with patch.object(app_module.agent.llm_service, 'fast_scorer', scorer):
+            client.post('/api/chat', json={'message': 'engineer', 'session_id': session_id})
+            with patch.object(app_module.keyword_matcher, 'scan', wraps=app_module.keyword_matcher.scan) as mock_scan:
+                client.post('/api/chat', json={'message': self.STRONG, 'session_id': session_id})
+                app_module.wait_for_evaluations(session_id, timeout=5)
+        
+        self.assertEqual(mock_scan.call_count, 1)
+        self.assertEqual(app_module.interview_sessions[session_id]['conversation_history'][2]['eval']['scorer'], 'fast_path')
+    
+    def test_too_few_samples(self):
+        """Test that training refuses to write a model from too little data"""
+        import trainFastScorer
+        with self.assertRaises(ValueError):
+            trainFastScorer.train(self.data_dir, self.model_path, min_samples=1000, log=lambda message: None)
+        self.assertFalse(self.model_path.exists())
+        self.assertIsNone(app_module.FastPathScorer.load(self.model_path))
+
+class TestMetrics(unittest.TestCase):
+    """Test the metrics registry and the /metrics endpoint"""
+    
+    def setUp(self):
+        evaluation_cache.clear()
+    
+    def tearDown(self):
+        evaluation_cache.clear()
+    
+    def test_text_exposition(self):
+        """Test counter, cumulative histogram buckets and label escaping"""
+        registry = app_module.MetricsRegistry()
+        registry.describe('demo_total', 'counter', 'Demo counter')
+        registry.describe('demo_seconds', 'histogram', 'Demo histogram', (0.1, 1))
+        registry.inc('demo_total', kind='a"b')
+        registry.inc('demo_total', 2, kind='a"b')
+        for value in (0.05, 0.1, 0.5, 3):
+            registry.observe('demo_seconds', value)
+        
+        text = registry.render()
+        self.assertIn('# TYPE demo_total counter\ndemo_total{kind="a\\"b"} 3\n', text)
+        self.assertIn('demo_seconds_bucket{le="0.1"} 2\n', text)
+        self.assertIn('demo_seconds_bucket{le="1"} 3\n', text)
+        self.assertIn('demo_seconds_bucket{le="+Inf"} 4\n', text)
+        self.assertIn('demo_seconds_count 4\n', text)
+        self.assertIn('demo_seconds_sum 3.65\n', text)
+    
+    def test_llm_instrumentation(self):
+        """Test call, parse failure and fallback metrics by purpose"""
+        backend = MagicMock(spec=app_module.LLMBackend)
+        backend.generate.return_value = 'Sure! Here is my evaluation.'
+        service = LLMService(backend=backend, fast_scorer=None)
+        metrics = app_module.metrics
+        before = {
+            'calls': metrics.value('llm_calls_total', purpose='evaluate', outcome='success'),
+            'latency': metrics.value('llm_call_duration_seconds', purpose='evaluate'),
+            'parse': metrics.value('llm_parse_failures_total', purpose='evaluate'),
+            'fallback': metrics.value('llm_fallbacks_total', kind='default'),
+            'prompt': metrics.value('llm_prompt_bytes', purpose='evaluate'),
+        }
+        
+        result = service.evaluate_answer("How do you debug?", "I read the logs", "engineer")
+        self.assertEqual(result['scorer'], 'default')
+        self.assertEqual(metrics.value('llm_calls_total', purpose='evaluate', outcome='success'), before['calls'] + 1)
+        self.assertEqual(metrics.value('llm_call_duration_seconds', purpose='evaluate'), before['latency'] + 1)
+        self.assertEqual(metrics.value('llm_parse_failures_total', purpose='evaluate'), before['parse'] + 1)
+        self.assertEqual(metrics.value('llm_fallbacks_total', kind='default'), before['fallback'] + 1)
+        self.assertEqual(metrics.value('llm_prompt_bytes', purpose='evaluate'), before['prompt'] + 1)
+    
+    def test_save_duration_and_endpoint(self):
+        """Test that session saves are timed and /metrics serves the text format"""
+        import tempfile
+        before = app_module.metrics.value('session_save_duration_seconds', mode='file')
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                patch.object(app_module, 'DATA_DIR', Path(temp_dir)), patch.object(app_module, 'catalog'):
+            save_session('test_metrics_session', {'role': 'engineer', 'conversation_history': []})
+        self.assertEqual(app_module.metrics.value('session_save_duration_seconds', mode='file'), before + 1)
+        
+        response = app_module.app.test_client().get('/metrics')
+        text = response.get_data(as_text=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        self.assertIn('# TYPE session_save_duration_seconds histogram', text)
+        self.assertRegex(text, r'\nsessions_live \d+\n')
+        self.assertIn('llm_circuit_state{state="closed"}', text)
+
+class TestRequestTiming(unittest.TestCase):
+    """Test per-stage request timings and on-demand profiling"""
+    
+    def setUp(self):
+        self.session_id = "test_request_timing"
+        self.client = app_module.app.test_client()
+    
+    def tearDown(self):
+        app_module.interview_sessions.pop(self.session_id, None)
+    
+    def test_server_timing_header(self):
+        """Test that /api/chat reports its stages and total in Server-Timing"""
+        with patch('builtins.print') as printed:
+            response = self.client.post('/api/chat', json={'message': 'engineer', 'session_id': self.session_id})
+        timing = response.headers['Server-Timing']
+        stages = [entry.split(';')[0] for entry in timing.split(', ')]
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('features', stages)
+        self.assertIn('session_load', stages)
+        self.assertIn('question', stages)
+        self.assertEqual(stages[-1], 'total')
+        self.assertRegex(timing, r'total;dur=\d+\.\d$')
+        self.assertNotIn('X-Profile-File', response.headers)
+        # Fast requests are not logged unless REQUEST_LOG is on
+        self.assertFalse(any('request_timing' in str(call) for call in printed.call_args_list))
+    
+    def test_stage_outside_request_is_noop(self):
+        """Test that timed stages on threads without a request timer record nothing"""
+        timer = app_module.RequestTimer('demo')
+        with app_module.timed_stage('orphan'):
+            pass
+        with app_module.request_timing(timer), app_module.timed_stage('inner'):
+            with app_module.timed_stage('inner'):
+                pass
+        self.assertEqual(list(timer.stages), ['inner'])
+        self.assertIsNone(getattr(app_module._request_timers, 'timer', None))
+    
+    def test_profile_on_header(self):
+        """Test that X-Profile writes a loadable profile and logs the request"""
+        import pstats
+        import tempfile
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                patch.object(app_module, 'PROFILE_DIR', Path(temp_dir)), \
+                patch.object(app_module, 'PROFILE_ALLOW_HEADER', True), \
+                patch.object(app_module, 'REQUEST_LOG', True), \
+                patch('builtins.print') as printed:
+            response = self.client.post('/api/chat', json={'message': 'engineer', 'session_id': self.session_id},
+                                        headers={'X-Profile': '1'})
+            profiles = list(Path(temp_dir).glob('*.prof'))
+            self.assertEqual([path.name for path in profiles], [response.headers['X-Profile-File']])
+            self.assertGreater(len(pstats.Stats(str(profiles[0])).stats), 0)
+        
+        record = json.loads(printed.call_args_list[-1][0][0])
+        self.assertEqual(record['event'], 'request_timing')
+        self.assertEqual(record['session_id'], self.session_id)
+        self.assertIn('question', record['stages_ms'])
+        self.assertTrue(record['profile'].endswith(response.headers['X-Profile-File']))
+    
+    def test_profile_header_ignored_unless_allowed(self):
+        """Test that clients cannot turn profiling on by default"""
+        with patch.object(app_module, 'RequestProfiler') as profiler:
+            response = self.client.post('/api/chat', json={'message': 'engineer', 'session_id': self.session_id},
+                                        headers={'X-Profile': '1'})
+        profiler.assert_not_called()
+        self.assertNotIn('X-Profile-File', response.headers)
+
+class TestSpeculation(unittest.TestCase):
+    """Test speculative question draws"""
+    
+    VAGUE_ANSWER = "Honestly it mostly depends on many different things that could come up during the day so it varies quite a lot really"
+    
+    def setUp(self):
+        from concurrent.futures import ThreadPoolExecutor
+        self.pool = ThreadPoolExecutor(max_workers=2)
+        self.speculation = app_module.Speculator(self.pool, enabled=True)
+        patcher = patch.object(app_module, 'speculation', self.speculation)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.session_id = "test_speculation"
+        self.client = app_module.app.test_client()
+    
+    def tearDown(self):
+        app_module.interview_sessions.pop(self.session_id, None)
+        app_module.pending_evaluations.pop(self.session_id, None)
+        self.pool.shutdown(wait=True)
+    
+    def outstanding(self):
+        return self.speculation._work.get(self.session_id, {})
+    
+    def test_draws_prepared_and_claimed(self):
+        """Test that both difficulties are prepared, one is used and the other discarded"""
+        self.client.post('/api/chat', json={'message': 'engineer', 'session_id': self.session_id})
+        self.assertEqual(set(self.outstanding()), {('draw', 'medium'), ('draw', 'hard')})
+        for _, future in self.outstanding().values():
+            future.result(timeout=5)
+        first = app_module.interview_sessions[self.session_id]['current_question']
+        
+        self.client.post('/api/chat', json={'message': 'skip', 'session_id': self.session_id})
+        session = app_module.interview_sessions[self.session_id]
+        self.assertNotEqual(session['current_question'], first)
+        self.assertEqual(session['used_questions'][0], first)
+        stats = self.speculation.stats()
+        self.assertEqual((stats['used'], stats['discarded']), (1, 1))
+        # The next draws are prepared for the new question
+        self.assertEqual(set(self.outstanding()), {('draw', 'medium'), ('draw', 'hard')})
+    
+    def test_stale_draw_discarded(self):
+        """Test that a draw prepared for other asked questions is not used"""
+        self.client.post('/api/chat', json={'message': 'engineer', 'session_id': self.session_id})
+        app_module.interview_sessions[self.session_id]['used_questions'].append("An extra question?")
+        self.assertIsNone(self.speculation.claim(self.session_id, ('draw', 'medium'), ()))
+        self.assertEqual(self.speculation.stats()['discarded'], 1)
+        
+        with patch('app.persistence.save_now'):
+            self.client.post('/api/reset', json={'session_id': self.session_id})
+        self.assertEqual(self.outstanding(), {})
+    
+    def test_followup_decision_independent_of_speculation(self):
+        """Test that SPECULATE changes no follow-up decision and starts no follow-up work"""
+        agent = InterviewAgent()
+        agent.llm_service = MagicMock()
+        agent.llm_service.generate_followup_question.return_value = "What changed after you tried that?"
+        evals = [
+            {'should_followup': True, 'followup_question': '', 'overall': 30},
+            {'should_followup': True, 'followup_question': 'What was the root cause?', 'overall': 30},
+            {'should_followup': False, 'overall': 80},
+        ]
+        for eval_result in evals:
+            agent.llm_service.evaluate_answer.return_value = eval_result
+            decisions = []
+            for speculator in (self.speculation, app_module.Speculator(self.pool, enabled=False)):
+                with patch.object(app_module, 'speculation', speculator):
+                    decisions.append(agent.decide_followup(self.VAGUE_ANSWER, "How do you handle outages?", 'engineer', {}))
+            self.assertEqual(decisions[0], decisions[1])
+        
+        self.assertEqual(decisions[0], (False, None))
+        agent.llm_service.generate_followup_question.assert_not_called()
+        self.assertEqual(self.speculation.stats()['started'], 0)
+    
+    def test_disabled_by_default(self):
+        """Test that nothing is started unless SPECULATE is on"""
+        speculator = app_module.Speculator(self.pool, enabled=False)
+        self.assertIsNone(speculator.submit(print))
+        speculator.start(self.session_id, ('draw', 'medium'), (), print)
+        self.assertEqual(speculator.stats()['started'], 0)
+
+class TestSessionStore(unittest.TestCase):
+    """Test the pluggable session stores"""
+    
+    def setUp(self):
+        import tempfile
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = app_module.SQLiteSessionStore(str(Path(self.temp_dir.name) / 'sessions.sqlite3'))
+        self.session = {
+            'role': 'retail',
+            'conversation_history': [
+                {'role': 'assistant', 'content': 'How do you handle returns?', 'timestamp': '2024-01-01T00:00:00'},
+                {'role': 'user', 'content': 'I follow store policy', 'timestamp': '2024-01-01T00:00:01'}
+            ]
+        }
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_sqlite_round_trip(self):
+        """Test that a session survives put/get and delete"""
+        self.store.put('s1', self.session)
+        
+        self.assertIn('s1', self.store)
+        self.assertEqual(self.store.get('s1'), self.session)
+        self.assertEqual(len(self.store), 1)
+        
+        self.store.delete('s1')
+        self.assertIsNone(self.store.get('s1'))
+    
+    def test_sqlite_eval_not_lost_to_stale_put(self):
+        """Test that a background eval survives a put of an older copy"""
+        self.store.put('s1', self.session)
+        stale_copy = self.store.get('s1')
+        
+        self.store.attach_eval('s1', self.store.get('s1'), 1, {'overall': 75})
+        stale_copy['conversation_history'].append({'role': 'assistant', 'content': 'Next question', 'timestamp': None})
+        self.store.put('s1', stale_copy)
+        
+        loaded = self.store.get('s1')
+        self.assertEqual(loaded['conversation_history'][1]['eval'], {'overall': 75})
+        self.assertEqual(len(loaded['conversation_history']), 3)
+    
+    def test_chat_with_sqlite_store(self):
+        """Test that chat state persists across requests through the SQLite store"""
+        with patch.object(app_module, 'interview_sessions', self.store):
+            client = app_module.app.test_client()
+            client.post('/api/chat', json={'message': 'retail', 'session_id': 'store_chat'})
+            data = client.post('/api/chat', json={'message': 'next', 'session_id': 'store_chat'}).get_json()
+            session = self.store.get('store_chat')
+        
+        self.assertEqual(data['role'], 'retail')
+        self.assertEqual(session['role'], 'retail')
+        self.assertEqual(len(session['conversation_history']), 4)
+        self.assertEqual(len(session['used_questions']), 2)
+
+class TestSessionEviction(unittest.TestCase):
+    """Test the memory-bounded in-process session store"""
+    
+    def setUp(self):
+        import tempfile
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.spill_dir = Path(self.temp_dir.name)
+        save_patcher = patch('app.persist_session')
+        self.mock_save = save_patcher.start()
+        self.addCleanup(save_patcher.stop)
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def make_session(self, role):
+        return {'role': role, 'conversation_history': [{'role': 'user', 'content': role, 'timestamp': None}]}
+    
+    def test_cap_evicts_least_recently_used(self):
+        """Test that exceeding the cap saves and spills the oldest session"""
+        store = app_module.InMemorySessionStore(max_live=1, idle_timeout=3600, spill_dir=self.spill_dir)
+        store.put('s1', self.make_session('engineer'))
+        store.put('s2', self.make_session('sales'))
+        
+        self.assertEqual(len(store), 1)
+        self.mock_save.assert_called_once_with('s1', self.make_session('engineer'))
+        self.assertTrue((self.spill_dir / 's1.json').exists())
+        self.assertEqual(store.stats(), {'live': 1, 'evictions': 1, 'reloads': 0})
+    
+    def test_evicted_session_reloads(self):
+        """Test that an evicted session comes back transparently"""
+        store = app_module.InMemorySessionStore(max_live=1, idle_timeout=3600, spill_dir=self.spill_dir)
+        store.put('s1', self.make_session('engineer'))
+        store.put('s2', self.make_session('sales'))
+        
+        self.assertIn('s1', store)
+        self.assertEqual(store.get('s1'), self.make_session('engineer'))
+        self.assertFalse((self.spill_dir / 's1.json').exists())
+        self.assertEqual(store.stats()['reloads'], 1)
+    
+    @patch('app.time.monotonic')
+    def test_idle_sessions_evicted(self, mock_monotonic):
+        """Test that sessions idle past the timeout are evicted on the next access"""
+        store = app_module.InMemorySessionStore(max_live=100, idle_timeout=60, spill_dir=self.spill_dir)
+        mock_monotonic.return_value = 1000.0
+        store.put('idle', self.make_session('retail'))
+        mock_monotonic.return_value = 1100.0
+        store.put('active', self.make_session('sales'))
+        
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store.stats()['evictions'], 1)
+        self.assertTrue((self.spill_dir / 'idle.json').exists())
+    
+    def test_eviction_writes_outside_lock(self):
+        """Test that spilling doesn't block other lookups and a session used meanwhile stays live"""
+        import threading
+        store = app_module.InMemorySessionStore(max_live=1, idle_timeout=3600, spill_dir=self.spill_dir)
+        store.put('s1', self.make_session('engineer'))
+        spilling, release = threading.Event(), threading.Event()
+        spill = store._spill
+        
+        def slow_spill(session_id, session):
+            spill(session_id, session)
+            spilling.set()
+            release.wait(5)
+        
+        with patch.object(store, '_spill', side_effect=slow_spill):
+            evictor = threading.Thread(target=store.put, args=('s2', self.make_session('sales')))
+            evictor.start()
+            self.assertTrue(spilling.wait(5))
+            # Neither lookup waits for the disk write, and s1 is used before it finishes
+            self.assertEqual(store.peek('s2'), self.make_session('sales'))
+            self.assertEqual(store.get('s1'), self.make_session('engineer'))
+            release.set()
+            evictor.join(5)
+        
+        self.assertEqual(store.stats()['evictions'], 0)
+        self.assertFalse((self.spill_dir / 's1.json').exists())
+        self.assertIsNotNone(store.peek('s1'))
+    
+    def test_stats_endpoint(self):
+        """Test that session counters are exposed"""
+        data = app_module.app.test_client().get('/api/stats').get_json()
+        self.assertIn('live', data['sessions'])
+
+class TestPersistenceWorker(unittest.TestCase):
+    """Test write-behind session persistence"""
+    
+    def setUp(self):
+        import tempfile
+        self.temp_dir = tempfile.TemporaryDirectory()
+        data_dir_patcher = patch('app.DATA_DIR', Path(self.temp_dir.name))
+        data_dir_patcher.start()
+        self.addCleanup(data_dir_patcher.stop)
+        self.worker = app_module.PersistenceWorker(max_backlog=10, batch_size=10, flush_interval=0.05)
+    
+    def tearDown(self):
+        self.worker.stop()
+        self.temp_dir.cleanup()
+    
+    def make_session(self, turns):
+        return {
+            'role': 'engineer',
+            'conversation_history': [{'role': 'user', 'content': f'turn {i}', 'timestamp': None} for i in range(turns)]
+        }
+    
+    def test_repeated_saves_coalesce(self):
+        """Test that queued saves of one session collapse into the latest snapshot"""
+        for turns in range(1, 4):
+            self.worker.schedule('s1', self.make_session(turns))
+        self.assertTrue(self.worker.drain(timeout=5))
+        
+        with open(Path(self.temp_dir.name) / 's1.json', 'r', encoding='utf-8') as f:
+            document = json.load(f)
+        self.assertEqual(len(document['events']), 3)
+        stats = self.worker.stats()
+        self.assertEqual(stats['enqueued'], 1)
+        self.assertEqual(stats['coalesced'], 2)
+        self.assertEqual(stats['flushed'], 1)
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertEqual(list(Path(self.temp_dir.name).glob('*.tmp')), [])
+    
+    def test_full_backlog_writes_synchronously(self):
+        """Test that a full backlog falls back to writing in the caller"""
+        worker = app_module.PersistenceWorker(max_backlog=0, backpressure_timeout=0)
+        worker.schedule('s2', self.make_session(1))
+        
+        self.assertTrue((Path(self.temp_dir.name) / 's2.json').exists())
+        self.assertEqual(worker.stats()['sync_writes'], 1)
+        self.assertEqual(worker.stats()['backpressure_waits'], 1)
+    
+    def test_reset_writes_before_dropping_session(self):
+        """Test that a reset session can be fetched straight away, replacing any queued save"""
+        session_id = 'test_reset_sync'
+        session = self.make_session(2)
+        app_module.interview_sessions.put(session_id, session)
+        client = app_module.app.test_client()
+        with patch.object(app_module, 'persistence', self.worker), patch.object(app_module, 'catalog'):
+            self.worker.schedule(session_id, self.make_session(1))
+            client.post('/api/reset', json={'session_id': session_id})
+            response = client.get(f'/api/session/{session_id}')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()['events']), 2)
+        self.assertEqual(self.worker.stats()['queue_depth'], 0)
+        self.assertEqual(self.worker.stats()['sync_writes'], 1)
+    
+    def test_stats_endpoint(self):
+        """Test that persistence counters are exposed"""
+        data = app_module.app.test_client().get('/api/stats').get_json()
+        self.assertIn('queue_depth', data['persistence'])
+
+class TestSessionRetrieval(unittest.TestCase):
+    """Test cached, conditional GET /api/session/<id>"""
+    
+    def setUp(self):
+        import tempfile
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.session_id = "test_retrieval_session"
+        patcher = patch.object(app_module, 'DATA_DIR', Path(self.temp_dir.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        app_module.session_documents.clear()
+        self.client = app_module.app.test_client()
+    
+    def tearDown(self):
+        app_module.interview_sessions.pop(self.session_id, None)
+        app_module.session_documents.clear()
+        self.temp_dir.cleanup()
+    
+    def write_file(self, role):
+        app_module._write_session_document(self.session_id, {'sessionId': self.session_id, 'role': role, 'events': []})
+    
+    def test_stored_session_cached_and_revalidated(self):
+        """Test that an unchanged file is parsed once and a rewritten one is re-read"""
+        self.write_file('engineer')
+        first = self.client.get(f'/api/session/{self.session_id}')
+        second = self.client.get(f'/api/session/{self.session_id}')
+        self.assertEqual(first.get_json()['role'], 'engineer')
+        self.assertEqual(first.headers['ETag'], second.headers['ETag'])
+        self.assertIn('Last-Modified', first.headers)
+        self.assertEqual(app_module.session_documents.stats(), {'size': 1, 'hits': 1, 'misses': 1})
+        
+        self.write_file('sales manager')
+        third = self.client.get(f'/api/session/{self.session_id}')
+        self.assertEqual(third.get_json()['role'], 'sales manager')
+        self.assertNotEqual(third.headers['ETag'], first.headers['ETag'])
+    
+    def test_not_modified(self):
+        """Test that a matching ETag or Last-Modified answers 304"""
+        self.write_file('engineer')
+        first = self.client.get(f'/api/session/{self.session_id}')
+        
+        by_etag = self.client.get(f'/api/session/{self.session_id}', headers={'If-None-Match': first.headers['ETag']})
+        by_date = self.client.get(f'/api/session/{self.session_id}',
+                                  headers={'If-Modified-Since': first.headers['Last-Modified']})
+        self.assertEqual(by_etag.status_code, 304)
+        self.assertEqual(by_date.status_code, 304)
+        self.assertEqual(by_etag.data, b'')
+    
+    def test_live_session_served_from_memory(self):
+        """Test that a live session is served without a file and changes its ETag per turn"""
+        self.client.post('/api/chat', json={'message': 'engineer', 'session_id': self.session_id})
+        first = self.client.get(f'/api/session/{self.session_id}')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.get_json()['role'], 'engineer')
+        self.assertFalse((Path(self.temp_dir.name) / f"{self.session_id}.json").exists())
+        
+        unchanged = self.client.get(f'/api/session/{self.session_id}', headers={'If-None-Match': first.headers['ETag']})
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertNotIn('Last-Modified', first.headers)
+        
+        with patch('app.LLMService.evaluate_answer', return_value={}):
+            self.client.post('/api/chat', json={'message': 'I shipped a caching layer', 'session_id': self.session_id})
+            app_module.wait_for_evaluations(self.session_id, timeout=5)
+        changed = self.client.get(f'/api/session/{self.session_id}', headers={'If-None-Match': first.headers['ETag']})
+        self.assertEqual(changed.status_code, 200)
+        
+        # An If-Modified-Since from an earlier copy never turns a live session into a 304
+        stale = self.client.get(f'/api/session/{self.session_id}',
+                                headers={'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'})
+        self.assertEqual(stale.status_code, 200)
+    
+    def test_asgi_not_modified(self):
+        """Test conditional requests through the ASGI handler"""
+        import asgi
+        self.write_file('engineer')
+        etag = self.client.get(f'/api/session/{self.session_id}').headers['ETag']
+        sent = []
+        
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        
+        async def send(message):
+            sent.append(message)
+        
+        scope = {'type': 'http', 'method': 'GET', 'path': f'/api/session/{self.session_id}',
+                 'headers': [(b'if-none-match', etag.encode())], 'query_string': b''}
+        asyncio.run(asgi.application(scope, receive, send))
+        self.assertEqual(sent[0]['status'], 304)
+
+class TestSessionCatalog(unittest.TestCase):
+    """Test the session catalog index and /api/sessions"""
+    
+    def setUp(self):
+        import tempfile
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self.temp_dir.name)
+        patcher = patch.object(app_module, 'DATA_DIR', self.data_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.catalog = app_module.SessionCatalog()
+        catalog_patcher = patch.object(app_module, 'catalog', self.catalog)
+        catalog_patcher.start()
+        self.addCleanup(catalog_patcher.stop)
+        self.client = app_module.app.test_client()
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def document(self, session_id, role, started_at, scores):
+        return {
+            'sessionId': session_id,
+            'role': role,
+            'mode': 'interview',
+            'startedAt': started_at,
+            'events': [{'speaker': 'user', 'text': 'answer', 'eval': {'overall': score}} for score in scores],
+            'aggregatedFeedback': {}
+        }
+    
+    def write_existing(self, session_id, *args):
+        """A file written outside the app, which only a scan can find"""
+        with open(self.data_dir / f"{session_id}.json", 'w', encoding='utf-8') as f:
+            json.dump(self.document(session_id, *args), f)
+    
+    def test_scan_and_filters(self):
+        """Test that existing files are indexed and can be filtered"""
+        self.write_existing('session_1', 'engineer', '2025-01-10T09:00:00', [80, 60])
+        self.write_existing('session_2', 'sales', '2025-01-11T09:00:00', [40])
+        self.write_existing('session_3', 'engineer', '2025-02-01T09:00:00', [])
+        
+        data = self.client.get('/api/sessions').get_json()
+        self.assertEqual(data['total'], 3)
+        self.assertEqual([s['sessionId'] for s in data['sessions']], ['session_3', 'session_2', 'session_1'])
+        self.assertEqual(data['sessions'][2]['answered'], 2)
+        self.assertEqual(data['sessions'][2]['averageScore'], 70)
+        
+        by_role = self.client.get('/api/sessions?role=engineer').get_json()
+        self.assertEqual(by_role['total'], 2)
+        by_score = self.client.get('/api/sessions?min_score=50').get_json()
+        self.assertEqual([s['sessionId'] for s in by_score['sessions']], ['session_1'])
+        by_date = self.client.get('/api/sessions?from=2025-01-11&to=2025-01-31').get_json()
+        self.assertEqual([s['sessionId'] for s in by_date['sessions']], ['session_2'])
+        page = self.client.get('/api/sessions?limit=1&offset=1').get_json()
+        self.assertEqual([s['sessionId'] for s in page['sessions']], ['session_2'])
+        self.assertEqual(page['total'], 3)
+    
+    def test_writes_update_index(self):
+        """Test that saved sessions are indexed without a rescan"""
+        self.catalog.scan()
+        app_module._write_session_document('session_4', self.document('session_4', 'retail', '2025-03-01T10:00:00', [90]))
+        
+        data = self.client.get('/api/sessions?role=retail').get_json()
+        self.assertEqual(data['sessions'][0]['averageScore'], 90)
+    
+    def test_rescan_is_incremental(self):
+        """Test that a rescan only re-reads changed files and drops deleted ones"""
+        self.write_existing('session_1', 'engineer', '2025-01-10T09:00:00', [80])
+        self.write_existing('session_2', 'sales', '2025-01-11T09:00:00', [40])
+        self.assertEqual(self.catalog.scan(), {'indexed': 2, 'removed': 0, 'files': 2})
+        
+        self.write_existing('session_2', 'sales', '2025-01-11T09:00:00', [40, 100])
+        (self.data_dir / 'session_1.json').unlink()
+        self.assertEqual(self.catalog.scan(), {'indexed': 1, 'removed': 1, 'files': 1})
+        self.assertEqual(self.catalog.query()['sessions'][0]['averageScore'], 70)
+    
+    def test_skips_other_json_and_indexes_journals(self):
+        """Test that non-session JSON is not listed and journal sessions are"""
+        self.write_existing('session_1', 'engineer', '2025-01-10T09:00:00', [80])
+        with open(self.data_dir / 'fast_scorer.json', 'w', encoding='utf-8') as f:
+            json.dump({'features': [], 'weights': [[0.0]]}, f)
+        with open(self.data_dir / 'session_2.jsonl', 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'sessionId': 'session_2', 'role': 'sales', 'mode': 'interview',
+                                'startedAt': '2025-01-11T09:00:00'}) + "\n")
+            f.write(json.dumps({'speaker': 'user', 'text': 'answer', 'eval': {'overall': 50}}) + "\n")
+        
+        data = self.client.get('/api/sessions').get_json()
+        self.assertEqual([s['sessionId'] for s in data['sessions']], ['session_2', 'session_1'])
+        self.assertEqual(data['sessions'][0]['averageScore'], 50)
+        
+        # A later journal line is picked up by the next scan
+        with open(self.data_dir / 'session_2.jsonl', 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'speaker': 'user', 'text': 'answer', 'eval': {'overall': 70}}) + "\n")
+        self.assertEqual(self.catalog.scan(), {'indexed': 1, 'removed': 0, 'files': 2})
+        self.assertEqual(self.catalog.query(role='sales')['sessions'][0]['answered'], 2)
+    
+    def test_invalid_parameters(self):
+        """Test that malformed filters are rejected"""
+        self.assertEqual(self.client.get('/api/sessions?min_score=high').status_code, 400)
+        self.assertEqual(self.client.get('/api/sessions?to=2025-13-01').status_code, 400)
+
+class TestSessionJournal(unittest.TestCase):
+    """Test journal-mode session persistence"""
+    
+    EVAL = {
+        "scores": {"communication": 4, "technical": 3, "examples": 3},
+        "overall": 70,
+        "should_followup": False,
+        "followup_question": "",
+        "feedback": ["Clear"]
+    }
+    
+    def setUp(self):
+        import tempfile
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.session_id = "test_journal_session"
+        for target, value in [('DATA_DIR', Path(self.temp_dir.name)), ('SESSION_JOURNAL', True)]:
+            patcher = patch.object(app_module, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        evaluate_patcher = patch('app.LLMService.evaluate_answer', return_value=self.EVAL)
+        evaluate_patcher.start()
+        self.addCleanup(evaluate_patcher.stop)
+        self.client = app_module.app.test_client()
+    
+    def tearDown(self):
+        app_module.interview_sessions.pop(self.session_id, None)
+        self.temp_dir.cleanup()
+    
+    def chat(self, message):
+        self.client.post('/api/chat', json={'message': message, 'session_id': self.session_id})
+        app_module.wait_for_evaluations(self.session_id, timeout=5)
+    
+    def journal_lines(self):
+        with open(Path(self.temp_dir.name) / f"{self.session_id}.jsonl", 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+    
+    def test_each_turn_appended(self):
+        """Test that each turn adds one record instead of rewriting the file"""
+        self.chat('engineer')
+        self.assertEqual(len(self.journal_lines()), 3)  # header, user, assistant
+        
+        self.chat('I profile the service and fix the slowest database query first')
+        records = self.journal_lines()
+        events = [r for r in records if 'speaker' in r]
+        
+        self.assertEqual(len(events), 4)
+        self.assertEqual(set(events[2].keys()) - {'eval'}, {'time', 'speaker', 'text'})
+        self.assertTrue(any(r.get('eval') == self.EVAL for r in records))
+        self.assertFalse((Path(self.temp_dir.name) / f"{self.session_id}.json").exists())
+    
+    def test_get_session_and_compaction(self):
+        """Test that the journal and the compacted file serve the same document"""
+        self.chat('engineer')
+        self.chat('I profile the service and fix the slowest database query first')
+        from_journal = self.client.get(f'/api/session/{self.session_id}').get_json()
+        
+        self.client.post('/api/reset', json={'session_id': self.session_id})
+        from_file = self.client.get(f'/api/session/{self.session_id}').get_json()
+        
+        self.assertFalse((Path(self.temp_dir.name) / f"{self.session_id}.jsonl").exists())
+        self.assertEqual(from_journal, from_file)
+        self.assertEqual(from_file['role'], 'engineer')
+        self.assertEqual(from_file['events'][2]['eval'], self.EVAL)
+    
+    def test_summary_scored_eval_is_journaled(self):
+        """Test that an eval attached by the feedback summary reaches the journal"""
+        self.chat('engineer')
+        with patch('app.submit_evaluation'):
+            self.chat('I profile the service and fix the slowest database query first')
+        self.assertFalse(any('eval' in r for r in self.journal_lines()))
+        
+        with patch.object(app_module.agent.llm_service, 'evaluate_answers_batch', return_value=[self.EVAL]):
+            session = app_module.interview_sessions.get(self.session_id)
+            app_module.generate_feedback_summary(session, self.session_id)
+        
+        self.assertIn({"turn": 2, "eval": self.EVAL}, self.journal_lines())
+        self.client.post('/api/reset', json={'session_id': self.session_id})
+        from_file = self.client.get(f'/api/session/{self.session_id}').get_json()
+        self.assertEqual(from_file['events'][2]['eval'], self.EVAL)
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,148 @@
+"""
+Offline training for the fast-path scorer of Interview Practice Partner
+Fits FastPathScorer on the LLM evaluations stored in session files, measures
+how often it agrees with the LLM on held-out sessions and writes the model to
+FAST_SCORER_PATH, where the app picks it up on its next start.
+
+Run with: python trainFastScorer.py --data-dir data --threshold 0.9 --report fast_scorer_report.json
+"""
+import argparse
+import json
+import random
+from pathlib import Path
+
+import numpy as np
+
+import app as interview_app
+from rescoreSessions import scored_answers
+
+REPORT_THRESHOLDS = (0.6, 0.7, 0.8, 0.9, 0.95, 0.99)
+
+def is_llm_evaluation(eval_data: dict) -> bool:
+    """Only LLM scores are labels; fallback, heuristic and fast-path evaluations are not"""
+    if not isinstance(eval_data, dict) or 'scorer' in eval_data:
+        return False
+    # Default evaluations saved before they were tagged
+    return eval_data.get('feedback') != ["Evaluation temporarily unavailable"]
+
+def load_sessions(data_dir: Path, pattern: str = 'session_*.json', log=print) -> dict:
+    """File name -> [(answer, role, eval_data)] for every LLM-scored answer"""
+    sessions = {}
+    for path in sorted(data_dir.glob(pattern)):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                document = json.load(f)
+        except (OSError, ValueError) as e:
+            log(f"Skipping unreadable {path.name}: {e}")
+            continue
+        samples = []
+        for index, _, answer in scored_answers(document):
+            eval_data = document['events'][index]['eval']
+            if not is_llm_evaluation(eval_data):
+                continue
+            try:
+                eval_data = interview_app.LLMService._validate_evaluation(dict(eval_data, scores=dict(eval_data['scores'])))
+            except (ValueError, TypeError, KeyError, AttributeError):
+                continue
+            samples.append((answer, document.get('role'), eval_data))
+        if samples:
+            sessions[path.name] = samples
+    return sessions
+
+def split_sessions(sessions: dict, validation_fraction: float, seed: int = 0):
+    """Hold out whole sessions so answers from one interview never land on both sides"""
+    names = sorted(sessions)
+    random.Random(seed).shuffle(names)
+    held_out = set(names[:round(len(names) * validation_fraction)])
+    train = [sample for name in names if name not in held_out for sample in sessions[name]]
+    validation = [sample for name in names if name in held_out for sample in sessions[name]]
+    return train, validation
+
+def agreement(model: interview_app.FastPathScorer, samples: list, thresholds=REPORT_THRESHOLDS) -> dict:
+    """How the fast path compares with the LLM scores at each confidence threshold"""
+    predictions = [model.predict(answer, role) for answer, role, _ in samples]
+    actual_bands = [model.BANDS[model.band(eval_data['overall'])] for _, _, eval_data in samples]
+    report = {
+        'samples': len(samples),
+        'band_accuracy': round(float(np.mean([
+            band == actual for (_, band, _), actual in zip(predictions, actual_bands)
+        ])), 4) if samples else None,
+        'thresholds': []
+    }
+    for threshold in thresholds:
+        covered = [
+            (predicted, eval_data, band == actual)
+            for (predicted, band, confidence), actual, (_, _, eval_data) in zip(predictions, actual_bands, samples)
+            if band != 'medium' and confidence >= threshold
+        ]
+        row = {'threshold': threshold, 'coverage': round(len(covered) / len(samples), 4) if samples else 0.0}
+        if covered:
+            row['band_agreement'] = round(float(np.mean([agrees for _, _, agrees in covered])), 4)
+            row['overall_mae'] = round(float(np.mean([
+                abs(predicted['overall'] - eval_data['overall']) for predicted, eval_data, _ in covered
+            ])), 2)
+            row['scores_within_one'] = round(float(np.mean([
+                all(abs(predicted['scores'][key] - eval_data['scores'].get(key, 0)) <= 1
+                    for key in model.TARGETS[:3])
+                for predicted, eval_data, _ in covered
+            ])), 4)
+        report['thresholds'].append(row)
+    return report
+
+def train(data_dir: Path, output: Path, pattern: str = 'session_*.json', threshold: float = None,
+          validation_fraction: float = 0.2, seed: int = 0, min_samples: int = 50, log=print) -> dict:
+    """Fit on the training sessions, report agreement on the held-out ones and save the model"""
+    threshold = interview_app.FAST_SCORER_THRESHOLD if threshold is None else threshold
+    sessions = load_sessions(data_dir, pattern, log)
+    train_samples, validation_samples = split_sessions(sessions, validation_fraction, seed)
+    if len(train_samples) < min_samples:
+        raise ValueError(f"Only {len(train_samples)} LLM-scored training answers in {data_dir} "
+                         f"(need {min_samples}); nothing was written")
+
+    model = interview_app.FastPathScorer.fit(train_samples, threshold=threshold)
+    thresholds = sorted(set(REPORT_THRESHOLDS) | {threshold})
+    report = {
+        'sessions': len(sessions),
+        'train_samples': len(train_samples),
+        'threshold': threshold,
+        'training': agreement(model, train_samples, thresholds),
+        'validation': agreement(model, validation_samples, thresholds),
+    }
+    model.metadata['report'] = report
+    model.save(output)
+    log(f"Wrote {output}")
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the fast-path scorer on stored LLM evaluations")
+    parser.add_argument('--data-dir', default='data', help='Directory with session files')
+    parser.add_argument('--pattern', default='session_*.json', help='Glob for session files in --data-dir')
+    parser.add_argument('--output', default=str(interview_app.FAST_SCORER_PATH), help='Model file to write')
+    parser.add_argument('--threshold', type=float, default=None,
+                        help='Confidence threshold to report on (default: FAST_SCORER_THRESHOLD)')
+    parser.add_argument('--validation-fraction', type=float, default=0.2, help='Share of sessions held out')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the session split')
+    parser.add_argument('--min-samples', type=int, default=50, help='Minimum LLM-scored training answers')
+    parser.add_argument('--report', default=None, help='Also write the agreement report to this JSON file')
+    args = parser.parse_args()
+
+    try:
+        report = train(Path(args.data_dir), Path(args.output), args.pattern, args.threshold,
+                       args.validation_fraction, args.seed, args.min_samples)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    validation = report['validation']
+    print(f"{report['train_samples']} training / {validation['samples']} validation answers "
+          f"from {report['sessions']} sessions; band accuracy {validation['band_accuracy']}")
+    for row in validation['thresholds']:
+        print(f"  threshold {row['threshold']}: skips LLM for {row['coverage']:.0%}, "
+              f"band agreement {row.get('band_agreement')}, overall MAE {row.get('overall_mae')}")
+
+if __name__ == '__main__':
+    main()